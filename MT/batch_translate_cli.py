@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Offline Batch Translation CLI
+แปลไฟล์ขนาดใหญ่แบบไม่โต้ตอบด้วย worker หลายโปรเซส
+
+- อ่านประโยคจากไฟล์หรือ stdin (ข้อความหนึ่งประโยคต่อบรรทัด หรือ JSONL)
+- แต่ละ worker โหลดโมเดลครั้งเดียวแล้วแปลทีละ chunk ด้วย BatchingTranslator
+- คิวมีขนาดจำกัดและจำกัดจำนวน chunk ที่ค้างอยู่ (backpressure)
+  หน่วยความจำจึงคงที่ไม่ว่าไฟล์จะใหญ่แค่ไหน
+- เขียนผลตามลำดับเดิมของ input (reorder buffer) และแสดงความเร็วทาง stderr
+- บันทึก checkpoint เป็นระยะ รันซ้ำด้วย --resume จะทำต่อจากจุดที่ค้าง
+
+Usage:
+    python batch_translate_cli.py Helsinki-NLP/opus-mt-en-th -i input.txt -o output.txt --workers 4
+    cat input.jsonl | python batch_translate_cli.py ./tiny-marian --format jsonl -o out.jsonl
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+
+
+def _worker(model, task_queue, result_queue, options):
+    """worker process: โหลดโมเดลครั้งเดียวแล้วแปล chunk จาก task_queue จนกว่าจะได้ None"""
+    try:
+        import warnings
+
+        import torch
+        from transformers.utils import logging
+
+        from batch_translation import BatchingTranslator
+        from model_registry import get_translation_pipeline
+
+        logging.set_verbosity_error()
+        warnings.filterwarnings("ignore")
+        if options['threads']:
+            torch.set_num_threads(options['threads'])
+        translator = BatchingTranslator(
+            get_translation_pipeline(model, device=options['device']),
+            max_tokens=options['max_tokens'],
+            **options['generate_kwargs'],
+        )
+    except Exception:
+        result_queue.put(('error', None, traceback.format_exc()))
+        return
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            return
+        chunk_id, texts = task
+        try:
+            # บรรทัดว่างไม่ต้องส่งเข้าโมเดล
+            indices = [i for i, text in enumerate(texts) if text.strip()]
+            translations = [''] * len(texts)
+            for i, translation in zip(indices, translator.translate([texts[i] for i in indices])):
+                translations[i] = translation
+            result_queue.put(('result', chunk_id, translations))
+        except Exception:
+            result_queue.put(('error', chunk_id, traceback.format_exc()))
+            return
+
+
+def iter_records(stream, input_format='text', field='text'):
+    """อ่าน input ทีละบรรทัด คืน (ข้อความที่จะแปล, record เดิม)"""
+    for line in stream:
+        line = line.rstrip('\n')
+        if input_format == 'jsonl':
+            record = json.loads(line) if line.strip() else {}
+            yield record.get(field, ''), record
+        else:
+            yield line, line
+
+
+def format_output(record, translation, output_format='text', output_field='translation'):
+    """แปลงผลหนึ่งรายการเป็นบรรทัดของ output"""
+    if output_format == 'jsonl':
+        if not isinstance(record, dict):
+            record = {'source': record}
+        return json.dumps({**record, output_field: translation}, ensure_ascii=False) + '\n'
+    return ' '.join(translation.splitlines()) + '\n'
+
+
+class Checkpoint:
+    """
+    checkpoint ของงานแปล: จำนวนบรรทัด input ที่เขียนผลแล้ว และขนาดไฟล์ output ณ จุดนั้น
+
+    Args:
+        path (str): ไฟล์ checkpoint (JSON)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lines_done = 0
+        self.output_bytes = 0
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.lines_done = state['lines_done']
+            self.output_bytes = state['output_bytes']
+        return self
+
+    def save(self, lines_done, output_bytes):
+        self.lines_done = lines_done
+        self.output_bytes = output_bytes
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'lines_done': lines_done, 'output_bytes': output_bytes, 'saved_at': time.time()}, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def translate_stream(records, write, model, workers=2, chunk_size=64, max_in_flight=None,
+                     on_chunk=None, threads=None, device=-1, max_tokens=4096, **generate_kwargs):
+    """
+    แปล records ด้วย worker หลายโปรเซสแล้วส่งผลให้ write ตามลำดับเดิม
+
+    Args:
+        records (iterable): (ข้อความ, record) จาก iter_records
+        write (callable): write(record, translation) เรียกตามลำดับของ input
+        model (str): ชื่อโมเดลหรือพาธในเครื่อง
+        workers (int): จำนวน worker process
+        chunk_size (int): จำนวนประโยคต่องานที่ส่งให้ worker
+        max_in_flight (int): จำนวน chunk สูงสุดที่ค้างอยู่ (รวมที่รอเขียน) ค่าเริ่มต้น workers * 4
+        on_chunk (callable): on_chunk(lines_done) เรียกหลังเขียนแต่ละ chunk (เช่นบันทึก checkpoint)
+        threads (int): จำนวน thread ของ PyTorch ต่อ worker (None = CPU / workers)
+        device: อุปกรณ์ของ pipeline
+        max_tokens (int): งบ token ต่อ batch ของ BatchingTranslator
+        **generate_kwargs: พารามิเตอร์ generate (เช่น num_beams)
+
+    Returns:
+        int: จำนวนประโยคที่แปล
+    """
+    if max_in_flight is None:
+        max_in_flight = workers * 4
+    if threads is None:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+    options = {'threads': threads, 'device': device, 'max_tokens': max_tokens,
+               'generate_kwargs': generate_kwargs}
+
+    task_queue = multiprocessing.Queue(maxsize=workers * 2)
+    result_queue = multiprocessing.Queue(maxsize=max_in_flight)
+    # จำกัด chunk ที่ค้างอยู่ทั้งหมด reorder buffer จึงไม่โตเกิน max_in_flight
+    in_flight = threading.BoundedSemaphore(max_in_flight)
+    stop = threading.Event()
+    pending_records = {}
+
+    processes = [
+        multiprocessing.Process(target=_worker, args=(model, task_queue, result_queue, options), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def feed():
+        chunk_id = 0
+        try:
+            chunk = []
+            for record in records:
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    if not submit(chunk_id, chunk):
+                        return
+                    chunk_id, chunk = chunk_id + 1, []
+            if chunk and submit(chunk_id, chunk):
+                chunk_id += 1
+            result_queue.put(('input_done', chunk_id, None))
+        except Exception:
+            result_queue.put(('error', None, traceback.format_exc()))
+        finally:
+            for _ in processes:
+                _put_unless_stopped(task_queue, None, stop)
+
+    def submit(chunk_id, chunk):
+        while not in_flight.acquire(timeout=0.5):
+            if stop.is_set():
+                return False
+        pending_records[chunk_id] = [record for _, record in chunk]
+        return _put_unless_stopped(task_queue, (chunk_id, [text for text, _ in chunk]), stop)
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+
+    done = {}
+    next_chunk = 0
+    total_chunks = None
+    lines_done = 0
+    try:
+        while total_chunks is None or next_chunk < total_chunks:
+            try:
+                kind, chunk_id, payload = result_queue.get(timeout=1.0)
+            except queue.Empty:
+                dead = [p for p in processes if not p.is_alive() and p.exitcode not in (0, None)]
+                if dead:
+                    raise RuntimeError(f"worker หยุดทำงานกะทันหัน (exit code {dead[0].exitcode})")
+                continue
+
+            if kind == 'error':
+                raise RuntimeError(f"เกิดข้อผิดพลาดใน worker:\n{payload}")
+            if kind == 'input_done':
+                total_chunks = chunk_id
+                continue
+
+            done[chunk_id] = payload
+            while next_chunk in done:
+                translations = done.pop(next_chunk)
+                for record, translation in zip(pending_records.pop(next_chunk), translations):
+                    write(record, translation)
+                lines_done += len(translations)
+                next_chunk += 1
+                in_flight.release()
+                if on_chunk is not None:
+                    on_chunk(lines_done)
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+    return lines_done
+
+
+def _put_unless_stopped(target_queue, item, stop):
+    while not stop.is_set():
+        try:
+            target_queue.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+class _Progress:
+    """แสดงจำนวนประโยคและความเร็ว (ประโยค/วินาที) ทาง stderr"""
+
+    def __init__(self, interval=1.0, offset=0):
+        self.interval = interval
+        self.offset = offset
+        self.start_time = time.perf_counter()
+        self.last_report = 0.0
+
+    def update(self, lines_done, final=False):
+        now = time.perf_counter()
+        if not final and now - self.last_report < self.interval:
+            return
+        self.last_report = now
+        elapsed = now - self.start_time
+        rate = lines_done / elapsed if elapsed > 0 else 0.0
+        end = '\n' if final else ''
+        print(f"\r{self.offset + lines_done:,} ประโยค  {rate:,.1f} ประโยค/วินาที", end=end,
+              file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="แปลไฟล์ขนาดใหญ่ด้วย worker หลายโปรเซส")
+    parser.add_argument('model', help="ชื่อโมเดลหรือพาธในเครื่อง")
+    parser.add_argument('-i', '--input', default='-', help="ไฟล์ input ('-' = stdin)")
+    parser.add_argument('-o', '--output', default='-', help="ไฟล์ output ('-' = stdout)")
+    parser.add_argument('--format', choices=['text', 'jsonl'], default='text')
+    parser.add_argument('--field', default='text', help="ฟิลด์ข้อความของ JSONL")
+    parser.add_argument('--output-field', default='translation', help="ฟิลด์คำแปลใน JSONL output")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=None, help="จำนวน thread ของ PyTorch ต่อ worker")
+    parser.add_argument('--chunk-size', type=int, default=64)
+    parser.add_argument('--max-tokens', type=int, default=4096)
+    parser.add_argument('--num-beams', type=int, default=None)
+    parser.add_argument('--checkpoint', default=None,
+                        help="ไฟล์ checkpoint (ค่าเริ่มต้น <output>.ckpt)")
+    parser.add_argument('--checkpoint-every', type=int, default=10, help="บันทึก checkpoint ทุกกี่ chunk")
+    parser.add_argument('--resume', action='store_true', help="ทำต่อจาก checkpoint")
+    args = parser.parse_args(argv)
+
+    if args.resume and args.output == '-':
+        parser.error("--resume ต้องใช้กับ --output ที่เป็นไฟล์")
+
+    generate_kwargs = {}
+    if args.num_beams is not None:
+        generate_kwargs['num_beams'] = args.num_beams
+
+    checkpoint = None
+    if args.output != '-':
+        checkpoint = Checkpoint(args.checkpoint or args.output + '.ckpt')
+        if args.resume:
+            if not os.path.exists(checkpoint.path) and os.path.exists(args.output) \
+                    and os.path.getsize(args.output) > 0:
+                # ไม่มี checkpoint (งานเสร็จแล้ว หรือพาธผิด) ห้ามตัดไฟล์ output ที่มีอยู่ทิ้ง
+                parser.error(f"--resume: ไม่พบ checkpoint {checkpoint.path} แต่ไฟล์ {args.output} "
+                             "มีข้อมูลอยู่แล้ว (งานอาจเสร็จแล้ว) ลบไฟล์หรือรันใหม่โดยไม่ใช้ --resume")
+            checkpoint.load()
+
+    input_stream = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    if args.output == '-':
+        output = sys.stdout.buffer
+    elif args.resume and os.path.exists(args.output):
+        # ตัดผลที่เขียนหลัง checkpoint ล่าสุดทิ้ง แล้วเขียนต่อ
+        output = open(args.output, 'r+b')
+        output.truncate(checkpoint.output_bytes)
+        output.seek(checkpoint.output_bytes)
+    else:
+        output = open(args.output, 'wb')
+        if checkpoint is not None:
+            checkpoint.lines_done = checkpoint.output_bytes = 0
+
+    skip = checkpoint.lines_done if checkpoint is not None else 0
+    records = iter_records(input_stream, args.format, args.field)
+    for _ in range(skip):
+        if next(records, None) is None:
+            break
+
+    progress = _Progress(offset=skip)
+    chunks_written = [0]
+
+    def write(record, translation):
+        output.write(format_output(record, translation, args.format, args.output_field).encode('utf-8'))
+
+    def on_chunk(lines_done):
+        progress.update(lines_done)
+        chunks_written[0] += 1
+        if checkpoint is not None and chunks_written[0] % args.checkpoint_every == 0:
+            output.flush()
+            os.fsync(output.fileno())
+            checkpoint.save(skip + lines_done, output.tell())
+
+    try:
+        lines_done = translate_stream(
+            records, write, args.model,
+            workers=args.workers, chunk_size=args.chunk_size, threads=args.threads,
+            max_tokens=args.max_tokens, on_chunk=on_chunk, **generate_kwargs,
+        )
+        output.flush()
+        progress.update(lines_done, final=True)
+        if checkpoint is not None:
+            checkpoint.remove()
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output is not sys.stdout.buffer:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
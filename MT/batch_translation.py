@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Length-bucketed Dynamic Batching
+การแปลแบบ batch ที่จัดกลุ่มประโยคตามความยาว
+
+ปัญหาของการส่ง list ของประโยคเข้า pipeline ตรงๆ คือประโยคสั้นถูก pad
+ให้ยาวเท่าประโยคที่ยาวที่สุดใน batch เดียวกัน ทำให้เสียการคำนวณไปกับ padding
+
+BatchingTranslator จะ:
+1. นับจำนวน token ของแต่ละประโยคด้วย tokenizer ของโมเดล
+2. เรียงประโยคตามความยาว แล้วสร้าง batch ภายใต้งบ max_tokens
+   (จำนวนประโยค x ความยาวที่ยาวที่สุดใน batch) แทนการกำหนดจำนวนประโยคตายตัว
+3. แปลแต่ละ batch แล้วคืนผลตามลำดับเดิม
+"""
+
+import time
+
+
+class BatchingTranslator:
+    """
+    ตัวแปลที่จัด batch ตามความยาวของประโยค
+
+    Args:
+        translator: translation pipeline ของ transformers (ต้องมี .tokenizer)
+        max_tokens (int): งบจำนวน token ต่อ batch (รวม padding)
+        max_batch_size (int): จำนวนประโยคสูงสุดต่อ batch
+        **generate_kwargs: พารามิเตอร์ที่ส่งต่อให้ pipeline (เช่น num_beams)
+    """
+
+    def __init__(self, translator, max_tokens=4096, max_batch_size=64, **generate_kwargs):
+        self.translator = translator
+        self.tokenizer = translator.tokenizer
+        self.max_tokens = max_tokens
+        self.max_batch_size = max_batch_size
+        self.generate_kwargs = generate_kwargs
+
+    def token_lengths(self, texts):
+        """จำนวน token ของแต่ละประโยค (รวม special tokens)"""
+        encoded = self.tokenizer(list(texts), truncation=True)
+        return [len(ids) for ids in encoded['input_ids']]
+
+    def make_batches(self, lengths):
+        """
+        จัดกลุ่ม index ของประโยคเป็น batch ภายใต้งบ max_tokens
+
+        Returns:
+            list: รายการ batch แต่ละ batch เป็น list ของ index (เรียงจากยาวไปสั้น)
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+        batches = []
+        batch = []
+        batch_max = 0
+        for i in order:
+            longest = max(batch_max, lengths[i])
+            if batch and ((len(batch) + 1) * longest > self.max_tokens or len(batch) >= self.max_batch_size):
+                batches.append(batch)
+                batch, longest = [], lengths[i]
+            batch.append(i)
+            batch_max = longest
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def iter_batches(self, texts, in_order=False):
+        """
+        แปลทีละ batch และคืนผลทันทีที่แต่ละ batch เสร็จ
+
+        Args:
+            in_order (bool): แปล batch ที่มีประโยคแรกสุดก่อน (batch ยังจัดตามความยาวเหมือนเดิม)
+                สำหรับงาน streaming ที่ต้องส่งผลออกตามลำดับ ไม่เช่นนั้นแปลจาก batch ที่ยาวที่สุด
+
+        Yields:
+            tuple: (list ของ index, list ของคำแปล)
+        """
+        texts = list(texts)
+        if not texts:
+            return
+        batches = self.make_batches(self.token_lengths(texts))
+        if in_order:
+            batches.sort(key=min)
+        for batch in batches:
+            batch_texts = [texts[i] for i in batch]
+            outputs = self.translator(batch_texts, batch_size=len(batch_texts), **self.generate_kwargs)
+            yield batch, [output['translation_text'] for output in outputs]
+
+    def translate(self, texts):
+        """แปลหลายประโยคแล้วคืนผลตามลำดับเดิม"""
+        texts = list(texts)
+        results = [None] * len(texts)
+        for batch, translations in self.iter_batches(texts):
+            for i, translation in zip(batch, translations):
+                results[i] = translation
+        return results
+
+    def __call__(self, texts):
+        return self.translate(texts)
+
+
+def padding_ratio(lengths, batches):
+    """สัดส่วน token ที่เป็น padding เมื่อ pad ทุกประโยคใน batch ให้ยาวเท่าประโยคที่ยาวที่สุด"""
+    real = sum(lengths)
+    padded = sum(max(lengths[i] for i in batch) * len(batch) for batch in batches)
+    return (padded - real) / padded if padded else 0.0
+
+
+def benchmark_batching(translator, texts, naive_batch_size=8, max_tokens=1024, repeats=3):
+    """
+    เปรียบเทียบ throughput ระหว่างการส่งประโยคตามลำดับเดิม (naive) กับ BatchingTranslator
+
+    Args:
+        translator: translation pipeline
+        texts (list): ประโยคทดสอบ (ควรมีความยาวหลากหลาย)
+        naive_batch_size (int): batch_size ของวิธี naive
+        max_tokens (int): งบ token ต่อ batch ของ BatchingTranslator
+        repeats (int): จำนวนรอบที่วัด (ใช้ค่าที่ดีที่สุด)
+
+    Returns:
+        dict: เวลา, sentences/sec และสัดส่วน padding ของทั้งสองวิธี
+    """
+    batching = BatchingTranslator(translator, max_tokens=max_tokens, max_batch_size=max(naive_batch_size, 64))
+    lengths = batching.token_lengths(texts)
+    naive_batches = [list(range(i, min(i + naive_batch_size, len(texts))))
+                     for i in range(0, len(texts), naive_batch_size)]
+    bucketed_batches = batching.make_batches(lengths)
+
+    # warm-up เพื่อไม่ให้นับเวลาเริ่มต้นครั้งแรก
+    translator(texts[:1])
+
+    def best_time(func):
+        best = None
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start_time
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    naive_seconds = best_time(lambda: translator(texts, batch_size=naive_batch_size))
+    bucketed_seconds = best_time(lambda: batching.translate(texts))
+
+    return {
+        'sentences': len(texts),
+        'naive': {
+            'seconds': naive_seconds,
+            'sentences_per_sec': len(texts) / naive_seconds,
+            'batches': len(naive_batches),
+            'padding_ratio': padding_ratio(lengths, naive_batches),
+        },
+        'bucketed': {
+            'seconds': bucketed_seconds,
+            'sentences_per_sec': len(texts) / bucketed_seconds,
+            'batches': len(bucketed_batches),
+            'padding_ratio': padding_ratio(lengths, bucketed_batches),
+        },
+        'speedup': naive_seconds / bucketed_seconds,
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import random
+    import sys
+    import tempfile
+
+    from transformers.utils import logging
+
+    from model_registry import get_translation_pipeline
+    from tiny_marian import SAMPLE_CORPUS, build_tiny_marian
+
+    logging.set_verbosity_error()
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else build_tiny_marian(tempfile.mkdtemp(prefix='tiny-marian-'))
+    translator = get_translation_pipeline(model_dir)
+
+    # ประโยคทดสอบความยาวหลากหลาย (1-8 ประโยคตัวอย่างต่อกัน)
+    rng = random.Random(0)
+    english = [text for text in SAMPLE_CORPUS if text.isascii()]
+    texts = [' '.join(rng.choice(english) for _ in range(rng.randint(1, 8))) for _ in range(128)]
+
+    print(json.dumps(benchmark_batching(translator, texts), indent=2))
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Translation Benchmark Harness
+วัด latency/throughput ของการแปลแยกตามช่วง และ sweep การตั้งค่า
+
+แยกการวัดเป็น 3 ช่วงเพื่อไม่ให้เวลาโหลดปนกับเวลาแปล:
+1. cold load: เวลา import library และเวลาโหลด pipeline (วัดในโปรเซสใหม่ที่ยังไม่ได้ import torch)
+2. first call: การแปลครั้งแรก (รวม warm-up ภายในของ PyTorch)
+3. steady state: วัดซ้ำหลัง warm-up สำหรับทุกชุดของ batch size x ความยาว input x beam
+
+รายงาน p50/p95/p99 latency, sentences/sec, generated tokens/sec และหน่วยความจำเป็น JSON
+(steady state รายงาน RSS ที่เพิ่มขึ้นระหว่างชุดนั้น เพราะ peak RSS ของโปรเซสไม่ลดลง
+จึงบอกได้เฉพาะค่าสูงสุดของทุกชุดที่วัดมาก่อน)
+เปรียบเทียบกับผลครั้งก่อน (--compare) เพื่อตรวจหา regression ได้
+
+Usage:
+    python benchmark_harness.py                       # สร้างโมเดลขนาดเล็กในเครื่องแล้ววัด
+    python benchmark_harness.py ./tiny-marian --batch-sizes 1,8 --lengths 16,64 --beams 1,4 -o result.json
+    python benchmark_harness.py ./tiny-marian --compare result.json
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from tiny_marian import SAMPLE_CORPUS
+
+
+def peak_rss_mb():
+    """หน่วยความจำสูงสุดที่โปรเซสเคยใช้ (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux รายงานเป็น KB, macOS รายงานเป็น byte
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def current_rss_mb():
+    """หน่วยความจำที่โปรเซสใช้อยู่ตอนนี้ (MB) อ่านจาก /proc (ระบบอื่นใช้ peak RSS แทน)"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except OSError:
+        return peak_rss_mb()
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def percentile(values, q):
+    """percentile แบบ linear interpolation"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def make_input(tokenizer, target_tokens, corpus=SAMPLE_CORPUS):
+    """สร้างประโยคที่มีจำนวน token ประมาณ target_tokens จากประโยคตัวอย่าง"""
+    words = ' '.join(text for text in corpus if text.isascii()).split()
+    text = words[0]
+    i = 1
+    while len(tokenizer(text)['input_ids']) < target_tokens:
+        text += ' ' + words[i % len(words)]
+        i += 1
+    return text
+
+
+def measure_cold_load(model, loader=None):
+    """
+    วัดเวลา import และเวลาโหลด pipeline ในโปรเซสปัจจุบัน
+    (import_seconds เป็น cold จริงเฉพาะเมื่อยังไม่เคย import torch ดู measure_cold_load_subprocess)
+
+    Returns:
+        tuple: (pipeline, dict ของเวลา)
+    """
+    start_time = time.perf_counter()
+    import torch  # noqa: F401
+    from transformers import pipeline
+    import_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    if loader is not None:
+        translator = loader(model)
+    else:
+        translator = pipeline('translation', model=model)
+    load_seconds = time.perf_counter() - start_time
+
+    return translator, {
+        'import_seconds': import_seconds,
+        'load_seconds': load_seconds,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def measure_cold_load_subprocess(model, quantize=False, threads=None):
+    """
+    วัด cold load ในโปรเซส Python ใหม่ (ยังไม่ได้ import torch/transformers และไม่มีแคชของโปรเซสนี้)
+
+    Returns:
+        dict: import_seconds, load_seconds, peak_rss_mb ของโปรเซสใหม่
+    """
+    command = [sys.executable, os.path.abspath(__file__), model, '--cold-load-only']
+    if quantize:
+        command.append('--quantize')
+    if threads:
+        command += ['--threads', str(threads)]
+    completed = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_first_call(translator, text):
+    start_time = time.perf_counter()
+    translator(text)
+    return {'first_call_seconds': time.perf_counter() - start_time, 'peak_rss_mb': peak_rss_mb()}
+
+
+def measure_steady_state(translator, batch_size, input_tokens, num_beams, iterations=20, warmup=3):
+    """
+    วัดการแปลซ้ำด้วยการตั้งค่าหนึ่งชุด
+
+    Args:
+        translator: translation pipeline
+        batch_size (int): จำนวนประโยคต่อการเรียก
+        input_tokens (int): ความยาว input โดยประมาณ (token)
+        num_beams (int): จำนวน beam
+        iterations (int): จำนวนครั้งที่วัด
+        warmup (int): จำนวนครั้งที่รันก่อนวัด (ไม่นับ)
+    """
+    tokenizer = translator.tokenizer
+    text = make_input(tokenizer, input_tokens)
+    batch = [text] * batch_size
+
+    rss_before = current_rss_mb()
+    rss_max = rss_before
+    for _ in range(warmup):
+        translator(batch, batch_size=batch_size, num_beams=num_beams)
+        rss_max = max(rss_max, current_rss_mb())
+
+    latencies = []
+    generated_tokens = 0
+    for _ in range(iterations):
+        start_time = time.perf_counter()
+        outputs = translator(batch, batch_size=batch_size, num_beams=num_beams)
+        latencies.append(time.perf_counter() - start_time)
+        rss_max = max(rss_max, current_rss_mb())
+        translations = [output['translation_text'] for output in outputs]
+        generated_tokens += sum(len(ids) for ids in tokenizer(text_target=translations)['input_ids'])
+
+    total_seconds = sum(latencies)
+    return {
+        'batch_size': batch_size,
+        'input_tokens': len(tokenizer(text)['input_ids']),
+        'num_beams': num_beams,
+        'iterations': iterations,
+        'latency_p50_ms': 1000 * percentile(latencies, 50),
+        'latency_p95_ms': 1000 * percentile(latencies, 95),
+        'latency_p99_ms': 1000 * percentile(latencies, 99),
+        'sentences_per_sec': batch_size * iterations / total_seconds,
+        'generated_tokens_per_sec': generated_tokens / total_seconds,
+        # RSS ที่เพิ่มขึ้นสูงสุดระหว่างชุดนี้ (สุ่มวัดหลังแต่ละการเรียก)
+        'rss_mb': rss_before,
+        'rss_growth_mb': rss_max - rss_before,
+    }
+
+
+def run_benchmark(model, batch_sizes=(1, 8), lengths=(16, 64), beams=(1, 4),
+                  iterations=20, warmup=3, loader=None, quantize=False, threads=None):
+    """
+    วัดทุกช่วงและ sweep ทุกชุดการตั้งค่า
+
+    Args:
+        model (str): ชื่อโมเดลหรือพาธในเครื่อง
+        batch_sizes, lengths, beams: ค่าที่ sweep
+        iterations (int): จำนวนครั้งที่วัดต่อชุด
+        warmup (int): จำนวนครั้ง warm-up ต่อชุด
+        loader (callable): loader(model) ที่คืน pipeline (เช่นโหลดแบบ quantized)
+        quantize, threads: การตั้งค่าเดียวกับ loader สำหรับวัด cold load ในโปรเซสใหม่
+
+    Returns:
+        dict: ผลที่บันทึกเป็น JSON ได้
+    """
+    import platform
+
+    # วัด cold load ก่อน import torch ในโปรเซสนี้ และวัดในโปรเซสใหม่จึงไม่ขึ้นกับสิ่งที่โหลดไว้แล้ว
+    cold = measure_cold_load_subprocess(model, quantize, threads)
+
+    import torch
+    import transformers
+
+    translator, _ = measure_cold_load(model, loader)
+    first = measure_first_call(translator, make_input(translator.tokenizer, lengths[0]))
+
+    runs = []
+    for batch_size in batch_sizes:
+        for input_tokens in lengths:
+            for num_beams in beams:
+                runs.append(measure_steady_state(translator, batch_size, input_tokens, num_beams,
+                                                 iterations, warmup))
+
+    return {
+        'model': model,
+        'environment': {
+            'python': platform.python_version(),
+            'torch': torch.__version__,
+            'transformers': transformers.__version__,
+            'torch_threads': torch.get_num_threads(),
+            'machine': platform.machine(),
+        },
+        'cold': cold,
+        'first_call': first,
+        'steady_state': runs,
+    }
+
+
+def compare_results(current, baseline, tolerance=0.10):
+    """
+    เปรียบเทียบกับผลครั้งก่อน
+
+    Args:
+        current, baseline (dict): ผลจาก run_benchmark
+        tolerance (float): สัดส่วนที่ยอมให้ช้าลงได้ก่อนนับเป็น regression
+
+    Returns:
+        list: รายการ regression (ชุดการตั้งค่า, metric, ค่าเดิม, ค่าใหม่)
+    """
+    def key(run):
+        return run['batch_size'], run['num_beams'], run['input_tokens']
+
+    baseline_runs = {key(run): run for run in baseline['steady_state']}
+    regressions = []
+    for run in current['steady_state']:
+        old = baseline_runs.get(key(run))
+        if old is None:
+            continue
+        if run['latency_p50_ms'] > old['latency_p50_ms'] * (1 + tolerance):
+            regressions.append({'config': key(run), 'metric': 'latency_p50_ms',
+                                'baseline': old['latency_p50_ms'], 'current': run['latency_p50_ms']})
+        if run['sentences_per_sec'] < old['sentences_per_sec'] * (1 - tolerance):
+            regressions.append({'config': key(run), 'metric': 'sentences_per_sec',
+                                'baseline': old['sentences_per_sec'], 'current': run['sentences_per_sec']})
+    return regressions
+
+
+def _int_list(value):
+    return [int(item) for item in value.split(',') if item]
+
+
+def _make_loader(quantize, threads):
+    if not (quantize or threads):
+        return None
+    from cpu_inference import InferenceConfig, load_cpu_pipeline
+
+    config = InferenceConfig(quantize=quantize, intra_op_threads=threads)
+
+    def loader(name):
+        return load_cpu_pipeline(name, config)
+    return loader
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="วัด latency/throughput ของการแปล")
+    parser.add_argument('model', nargs='?', default=None,
+                        help="ชื่อโมเดลหรือพาธ (ไม่ระบุ = สร้างโมเดลขนาดเล็กในเครื่อง)")
+    parser.add_argument('--batch-sizes', type=_int_list, default=[1, 8])
+    parser.add_argument('--lengths', type=_int_list, default=[16, 64], help="ความยาว input (token)")
+    parser.add_argument('--beams', type=_int_list, default=[1, 4])
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--quantize', action='store_true', help="ใช้ dynamic int8 quantization")
+    parser.add_argument('--threads', type=int, default=None, help="จำนวน thread ของ PyTorch")
+    parser.add_argument('-o', '--output', default=None, help="บันทึกผลเป็นไฟล์ JSON")
+    parser.add_argument('--compare', default=None, help="ไฟล์ JSON ของผลครั้งก่อน")
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    parser.add_argument('--cold-load-only', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.cold_load_only:
+        # โปรเซสลูกของ measure_cold_load_subprocess: วัดแล้วพิมพ์ผลเป็น JSON บรรทัดเดียว
+        _, cold = measure_cold_load(args.model, _make_loader(args.quantize, args.threads))
+        print(json.dumps(cold))
+        return
+
+    import tempfile
+    import warnings
+
+    from transformers.utils import logging
+
+    logging.set_verbosity_error()
+    warnings.filterwarnings("ignore")
+
+    model = args.model
+    if model is None:
+        from tiny_marian import build_tiny_marian
+        model = build_tiny_marian(tempfile.mkdtemp(prefix='tiny-marian-'))
+
+    result = run_benchmark(model, args.batch_sizes, args.lengths, args.beams,
+                           args.iterations, args.warmup, _make_loader(args.quantize, args.threads),
+                           args.quantize, args.threads)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            result['regressions'] = compare_results(result, json.load(f), args.tolerance)
+
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if result.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+CPU-optimized Inference
+โหมดการแปลที่ปรับให้เหมาะกับ CPU
+
+- Dynamic int8 quantization: แปลง nn.Linear เป็น int8 (น้ำหนักถูก quantize ล่วงหน้า
+  ส่วน activation ถูก quantize ตอนรัน) ลดขนาดโมเดลและเร่งการคูณเมทริกซ์บน CPU
+- กำหนดจำนวน thread ของ PyTorch (intra-op / inter-op)
+- ลดค่าใช้จ่ายของการ decode ด้วย greedy decoding หรือลดจำนวน beam
+
+โหลดผ่าน ModelRegistry จึงโหลดแต่ละการตั้งค่าเพียงครั้งเดียวต่อโปรเซส
+มี benchmark เทียบกับ fp32 ทั้ง latency, throughput, ขนาดโมเดล (state_dict) และคุณภาพ (BLEU/chrF)
+หน่วยความจำของโปรเซส (RSS) วัดด้วย benchmark_harness
+"""
+
+import io
+import time
+import warnings
+
+QUANTIZED_DTYPE = 'qint8'
+
+
+class InferenceConfig:
+    """
+    การตั้งค่าการแปลบน CPU
+
+    Args:
+        quantize (bool): ใช้ dynamic int8 quantization กับ nn.Linear
+        intra_op_threads (int): จำนวน thread ภายใน operator (None = ค่าเริ่มต้นของ PyTorch)
+        inter_op_threads (int): จำนวน thread ระหว่าง operator (ตั้งได้ครั้งเดียวต่อโปรเซส)
+        num_beams (int): จำนวน beam (None = ค่าของโมเดล)
+        greedy (bool): ใช้ greedy decoding (num_beams=1)
+        max_new_tokens (int): จำนวน token สูงสุดที่สร้าง (None = ค่าของโมเดล)
+    """
+
+    def __init__(self, quantize=False, intra_op_threads=None, inter_op_threads=None,
+                 num_beams=None, greedy=False, max_new_tokens=None):
+        self.quantize = quantize
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.num_beams = 1 if greedy else num_beams
+        self.max_new_tokens = max_new_tokens
+
+    def __repr__(self):
+        return (f"InferenceConfig(quantize={self.quantize}, intra_op_threads={self.intra_op_threads}, "
+                f"inter_op_threads={self.inter_op_threads}, num_beams={self.num_beams}, "
+                f"max_new_tokens={self.max_new_tokens})")
+
+    @property
+    def dtype(self):
+        """dtype ที่ใช้เป็นส่วนหนึ่งของ key ใน ModelRegistry"""
+        return QUANTIZED_DTYPE if self.quantize else None
+
+    def generate_kwargs(self):
+        """พารามิเตอร์ generate ที่ส่งให้ pipeline ทุกครั้งที่แปล"""
+        kwargs = {}
+        if self.num_beams is not None:
+            kwargs['num_beams'] = self.num_beams
+        if self.max_new_tokens is not None:
+            kwargs['max_new_tokens'] = self.max_new_tokens
+        return kwargs
+
+    def apply_threads(self):
+        """ตั้งค่าจำนวน thread ของ PyTorch (มีผลทั้งโปรเซส)"""
+        import torch
+
+        if self.intra_op_threads:
+            torch.set_num_threads(self.intra_op_threads)
+        if self.inter_op_threads:
+            try:
+                torch.set_num_interop_threads(self.inter_op_threads)
+            except RuntimeError:
+                # ตั้งได้ก่อนเริ่มงานแบบขนานครั้งแรกเท่านั้น
+                warnings.warn("ตั้งค่า inter_op_threads ไม่ได้ เพราะ PyTorch เริ่มทำงานแบบขนานไปแล้ว")
+
+
+def quantize_model(model):
+    """คืนโมเดลที่ nn.Linear ถูกแปลงเป็น dynamic int8"""
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+
+    with warnings.catch_warnings():
+        # API quantization ของ torch.ao แจ้งเตือนว่าจะย้ายไป torchao
+        warnings.simplefilter('ignore')
+        return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _cpu_loader(model, task, device, dtype, **pipeline_kwargs):
+    """loader สำหรับ ModelRegistry: โหลดโมเดล fp32 แล้ว quantize ถ้า dtype เป็น qint8"""
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+    model_obj = AutoModelForSeq2SeqLM.from_pretrained(model)
+    model_obj.eval()
+    if dtype == QUANTIZED_DTYPE:
+        model_obj = quantize_model(model_obj)
+    tokenizer = AutoTokenizer.from_pretrained(model)
+    return pipeline(task, model=model_obj, tokenizer=tokenizer, device=device, **pipeline_kwargs)
+
+
+def load_cpu_pipeline(model, config=None):
+    """โหลด translation pipeline ตามการตั้งค่าโดยไม่ผ่าน registry (เช่นเพื่อวัดเวลาโหลด)"""
+    config = config or InferenceConfig()
+    config.apply_threads()
+    return _cpu_loader(model, 'translation', -1, config.dtype)
+
+
+def get_cpu_translation_pipeline(model, config=None, registry=None):
+    """
+    คืน translation pipeline ตามการตั้งค่า CPU (โหลดครั้งเดียวต่อโปรเซส)
+
+    Args:
+        model (str): ชื่อโมเดลหรือพาธในเครื่อง
+        config (InferenceConfig): การตั้งค่า (None = fp32 ค่าเริ่มต้น)
+        registry (ModelRegistry): registry ที่ใช้ (None = registry กลาง)
+    """
+    from model_registry import get_registry
+
+    config = config or InferenceConfig()
+    config.apply_threads()
+    registry = registry or get_registry()
+    return registry.get_pipeline(model, 'translation', -1, config.dtype, loader=_cpu_loader)
+
+
+def serialized_model_bytes(model):
+    """ขนาดของ state_dict เมื่อบันทึก (นับน้ำหนัก int8 ที่ pack ไว้ใน quantized Linear ด้วย)"""
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def benchmark_inference(model, configs, texts, references, lang='en', batch_size=16, repeats=3):
+    """
+    เปรียบเทียบการตั้งค่าต่างๆ กับ fp32 (config แรกถือเป็น baseline)
+
+    Args:
+        model (str): ชื่อโมเดลหรือพาธในเครื่อง
+        configs (dict): {ชื่อ: InferenceConfig}
+        texts (list): ประโยคทดสอบ (ชุดคงที่)
+        references (list): คำแปลอ้างอิงของ texts
+        lang (str): ภาษาปลายทาง (สำหรับ BLEU)
+        batch_size (int): batch size สำหรับวัด throughput
+        repeats (int): จำนวนรอบวัด throughput (ใช้ค่าที่ดีที่สุด)
+
+    Returns:
+        dict: {ชื่อ: latency (p50/p95 ms), sentences/sec, model_size_mb, BLEU, chrF,
+               ค่าต่างจาก baseline และความตรงกับผล baseline}
+        model_size_mb คือขนาด state_dict เมื่อบันทึก (serialized_model_bytes) ไม่ใช่หน่วยความจำของโปรเซส
+
+    intra_op_threads ถูกคืนค่าเดิมก่อนแต่ละการตั้งค่าและเมื่อจบ จึงไม่ติดไปยังการตั้งค่าถัดไป
+    (inter_op_threads ตั้งได้ครั้งเดียวต่อโปรเซส จึงคืนค่าไม่ได้)
+    """
+    import torch
+
+    from evaluation import evaluate
+    from model_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    results = {}
+    baseline = None
+    baseline_outputs = None
+    default_threads = torch.get_num_threads()
+    try:
+        for name, config in configs.items():
+            torch.set_num_threads(default_threads)
+            row, outputs = _benchmark_config(model, config, registry, texts, references, lang,
+                                             batch_size, repeats)
+            if baseline is None:
+                baseline, baseline_outputs = row, outputs
+            else:
+                agreement = evaluate(outputs, baseline_outputs, lang=lang, workers=1)
+                row.update({
+                    'speedup': row['sentences_per_sec'] / baseline['sentences_per_sec'],
+                    'size_ratio': row['model_size_mb'] / baseline['model_size_mb'],
+                    'bleu_delta': row['bleu'] - baseline['bleu'],
+                    'chrf_delta': row['chrf'] - baseline['chrf'],
+                    'chrf_vs_baseline_output': agreement['chrf'],
+                })
+            results[name] = row
+    finally:
+        torch.set_num_threads(default_threads)
+    return results
+
+
+def _benchmark_config(model, config, registry, texts, references, lang, batch_size, repeats):
+    """วัดการตั้งค่าเดียว คืน (แถวผล, คำแปล)"""
+    from evaluation import evaluate
+
+    translator = get_cpu_translation_pipeline(model, config, registry)
+    generate_kwargs = config.generate_kwargs()
+    translator(texts[:1], **generate_kwargs)  # warm-up
+
+    latencies = []
+    for text in texts:
+        start_time = time.perf_counter()
+        translator(text, **generate_kwargs)
+        latencies.append(time.perf_counter() - start_time)
+
+    best = None
+    outputs = None
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        outputs = translator(texts, batch_size=batch_size, **generate_kwargs)
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    outputs = [output['translation_text'] for output in outputs]
+
+    quality = evaluate(outputs, references, lang=lang, workers=1)
+    row = {
+        'config': repr(config),
+        'latency_p50_ms': 1000 * _percentile(latencies, 50),
+        'latency_p95_ms': 1000 * _percentile(latencies, 95),
+        'sentences_per_sec': len(texts) / best,
+        'model_size_mb': serialized_model_bytes(translator.model) / (1024 * 1024),
+        'bleu': quality['bleu']['score'],
+        'chrf': quality['chrf'],
+    }
+    return row, outputs
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    import tempfile
+
+    from transformers.utils import logging
+
+    from tiny_marian import SAMPLE_CORPUS, build_tiny_marian
+
+    logging.set_verbosity_error()
+    warnings.filterwarnings("ignore")
+    # โมเดลขนาดเล็กแต่ใหญ่พอให้เห็นผลของ quantization
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else build_tiny_marian(
+        tempfile.mkdtemp(prefix='tiny-marian-'), d_model=256, layers=2)
+
+    english = [text for text in SAMPLE_CORPUS if text.isascii()]
+    texts = [' '.join(english[(i + j) % len(english)] for j in range(1 + i % 3)) for i in range(32)]
+    # โมเดลสุ่มแปลไม่ได้จริง ใช้ประโยคต้นทางเป็น reference เพื่อให้ชุดทดสอบคงที่
+    references = texts
+
+    configs = {
+        'fp32': InferenceConfig(),
+        'int8': InferenceConfig(quantize=True),
+        'int8_greedy': InferenceConfig(quantize=True, greedy=True),
+    }
+    print(json.dumps(benchmark_inference(model_dir, configs, texts, references), indent=2))
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Long-document Translation
+การแปลเอกสารยาวด้วยการแบ่งประโยคและส่งผลลัพธ์ทีละส่วน (streaming)
+
+ขั้นตอน:
+1. แบ่งเอกสารเป็นย่อหน้า (บรรทัดว่าง) และแบ่งย่อหน้าเป็นประโยค
+   - ภาษาไทย: sent_tokenize ของ PyThaiNLP และตัดประโยคที่ยาวเกินที่ขอบคำ
+     (ภาษาไทยไม่มีช่องว่างระหว่างคำ) ด้วย word_tokenizer ที่ส่งเข้ามา เช่น segment_text
+     ของ CustomWordSegmenter ใน WS ค่าเริ่มต้นคือ word_tokenize engine='newmm'
+     (engine เริ่มต้นของ ThaiTextAnalysisSystem) ตัวแบ่งคำของ WS แบ่งระดับคำเท่านั้น
+     การแบ่งประโยคจึงยังใช้ sent_tokenize และสคริปต์ใน MT รันแยกจาก WS จึงรับเป็น callable
+     แทนการ import โมดูลของ WS โดยตรง
+   - ภาษาอังกฤษ: กฎเครื่องหมายวรรคตอน (. ! ? ตามด้วยช่องว่าง)
+2. อ่านประโยคทีละหน้าต่าง (window) เพื่อจำกัดหน่วยความจำ แล้วแปลด้วย
+   BatchingTranslator ซึ่งจัด batch ตามความยาว
+3. ส่งคำแปลออกตามลำดับทันทีที่ batch ที่เกี่ยวข้องแปลเสร็จ พร้อมตำแหน่ง
+   (ย่อหน้า, offset) ของประโยคต้นทางสำหรับประกอบเอกสารกลับ
+"""
+
+import re
+from collections import namedtuple
+
+# ตำแหน่งของประโยคในเอกสารต้นฉบับ
+SentenceSpan = namedtuple('SentenceSpan', ['paragraph', 'start', 'end', 'text'])
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+_ENGLISH_SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+(?=["\'(\[]?[A-Z0-9])')
+_ENGLISH_ABBREVIATIONS = {'mr.', 'mrs.', 'ms.', 'dr.', 'prof.', 'st.', 'vs.', 'etc.', 'e.g.', 'i.e.', 'no.'}
+
+
+def iter_paragraphs(text):
+    """แบ่งเอกสารเป็นย่อหน้า คืน (start, end) ของแต่ละย่อหน้าที่ไม่ว่าง"""
+    start = 0
+    for match in _PARAGRAPH_BREAK.finditer(text):
+        if text[start:match.start()].strip():
+            yield start, match.start()
+        start = match.end()
+    if text[start:].strip():
+        yield start, len(text)
+
+
+def _english_sentence_bounds(text):
+    start = 0
+    for match in _ENGLISH_SENTENCE_END.finditer(text):
+        # ไม่ตัดหลังคำย่อ เช่น "Dr. Smith"
+        last_word = text[start:match.start()].rsplit(None, 1)[-1].lower()
+        if last_word in _ENGLISH_ABBREVIATIONS:
+            continue
+        yield start, match.start()
+        start = match.end()
+    yield start, len(text)
+
+
+def _thai_sentence_bounds(text):
+    try:
+        from pythainlp.tokenize import sent_tokenize
+        sentences = sent_tokenize(text)
+    except ImportError:
+        # ไม่มี PyThaiNLP: ใช้ช่องว่างซึ่งมักใช้คั่นประโยคในภาษาไทย
+        sentences = text.split()
+
+    # หา offset ของแต่ละประโยคในข้อความต้นฉบับ
+    position = 0
+    missing = False
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        start = text.find(sentence, position)
+        if start < 0:
+            # tokenizer ปรับข้อความจนหาไม่พบตรงตัว: ใช้ช่วงระหว่างประโยคที่พบแทน ไม่ทิ้งข้อความ
+            missing = True
+            continue
+        if missing and start > position:
+            yield position, start
+        missing = False
+        position = start + len(sentence)
+        yield start, position
+    if missing and position < len(text):
+        yield position, len(text)
+
+
+def _default_thai_tokenizer():
+    try:
+        from pythainlp.tokenize import word_tokenize
+    except ImportError:
+        return None
+    return lambda text: word_tokenize(text, engine='newmm')
+
+
+def _word_boundaries(text, lang, word_tokenizer=None):
+    """ตำแหน่งที่ตัดได้ภายในประโยค (ขอบคำ)"""
+    if lang == 'th':
+        word_tokenizer = word_tokenizer or _default_thai_tokenizer()
+        if word_tokenizer is not None:
+            # หาตำแหน่งของแต่ละคำในข้อความ (ตัวแบ่งคำบางตัวตัดช่องว่างทิ้ง)
+            position = 0
+            for token in word_tokenizer(text):
+                start = text.find(token, position) if token else -1
+                if start < 0:
+                    continue
+                position = start + len(token)
+                yield position
+            if position < len(text):
+                yield len(text)
+            return
+    for match in re.finditer(r'[\s,;:]+', text):
+        yield match.end()
+    yield len(text)
+
+
+def _chunk_long_sentence(text, start, end, lang, max_chars, word_tokenizer=None):
+    """ตัดประโยคที่ยาวเกิน max_chars ที่ขอบคำ (เพื่อไม่ให้เกินความยาวสูงสุดของโมเดล)"""
+    if end - start <= max_chars:
+        yield start, end
+        return
+    chunk_start = start
+    last_boundary = None
+    for boundary in _word_boundaries(text[start:end], lang, word_tokenizer):
+        boundary += start
+        if boundary - chunk_start > max_chars and last_boundary and last_boundary > chunk_start:
+            yield chunk_start, last_boundary
+            chunk_start = last_boundary
+        last_boundary = boundary
+    if chunk_start < end:
+        yield chunk_start, end
+
+
+def split_sentences(text, lang='en', max_chars=400, word_tokenizer=None):
+    """
+    แบ่งเอกสารเป็นประโยคพร้อมตำแหน่ง
+
+    Args:
+        text (str): เอกสาร
+        lang (str): 'th' หรือ 'en'
+        max_chars (int): ความยาวสูงสุดของประโยค (ประโยคที่ยาวกว่าจะถูกตัดที่ขอบคำ)
+        word_tokenizer (callable): ตัวแบ่งคำภาษาไทย รับข้อความคืน list ของคำ
+            (เช่น CustomWordSegmenter().segment_text) None = word_tokenize engine='newmm'
+
+    Yields:
+        SentenceSpan: (paragraph, start, end, text) โดย start/end เป็น offset ในเอกสาร
+    """
+    sentence_bounds = _thai_sentence_bounds if lang == 'th' else _english_sentence_bounds
+    for paragraph, (para_start, para_end) in enumerate(iter_paragraphs(text)):
+        paragraph_text = text[para_start:para_end]
+        for start, end in sentence_bounds(paragraph_text):
+            # ตัดช่องว่างหัวท้ายออกจากช่วงของประโยค
+            while start < end and paragraph_text[start].isspace():
+                start += 1
+            while end > start and paragraph_text[end - 1].isspace():
+                end -= 1
+            if start == end:
+                continue
+            for chunk_start, chunk_end in _chunk_long_sentence(paragraph_text, start, end, lang, max_chars,
+                                                               word_tokenizer):
+                while chunk_start < chunk_end and paragraph_text[chunk_start].isspace():
+                    chunk_start += 1
+                while chunk_end > chunk_start and paragraph_text[chunk_end - 1].isspace():
+                    chunk_end -= 1
+                if chunk_start < chunk_end:
+                    yield SentenceSpan(paragraph, para_start + chunk_start, para_start + chunk_end,
+                                       paragraph_text[chunk_start:chunk_end])
+
+
+def translate_document_stream(text, translator, source_lang='en', window_size=64, max_chars=400,
+                              word_tokenizer=None):
+    """
+    แปลเอกสารยาวและส่งคำแปลออกตามลำดับทันทีที่แปลเสร็จ
+
+    Args:
+        text (str): เอกสารต้นฉบับ
+        translator: BatchingTranslator หรือ translation pipeline
+        source_lang (str): ภาษาต้นทาง 'th' หรือ 'en'
+        window_size (int): จำนวนประโยคที่อ่านเข้าหน่วยความจำต่อรอบ
+        max_chars (int): ความยาวสูงสุดของแต่ละประโยค
+        word_tokenizer (callable): ตัวแบ่งคำภาษาไทยสำหรับตัดประโยคยาว (ดู split_sentences)
+
+    Yields:
+        tuple: (SentenceSpan, คำแปล) เรียงตามลำดับในเอกสาร
+    """
+    from batch_translation import BatchingTranslator
+
+    if not isinstance(translator, BatchingTranslator):
+        translator = BatchingTranslator(translator)
+
+    window = []
+    for span in split_sentences(text, source_lang, max_chars, word_tokenizer):
+        window.append(span)
+        if len(window) >= window_size:
+            yield from _translate_window(window, translator)
+            window = []
+    if window:
+        yield from _translate_window(window, translator)
+
+
+def _translate_window(window, translator):
+    """แปลประโยคในหน้าต่าง แล้วส่งผลออกตามลำดับเมื่อประโยคก่อนหน้าแปลเสร็จครบ"""
+    done = [None] * len(window)
+    next_index = 0
+    # แปล batch ที่มีประโยคแรกสุดก่อน ประโยคแรกจึงออกหลัง batch แรก ไม่ใช่หลังทั้งหน้าต่าง
+    for batch, translations in translator.iter_batches([span.text for span in window], in_order=True):
+        for i, translation in zip(batch, translations):
+            done[i] = translation
+        while next_index < len(window) and done[next_index] is not None:
+            yield window[next_index], done[next_index]
+            done[next_index] = None
+            next_index += 1
+
+
+def reassemble(translated_spans, sentence_joiner=' ', paragraph_joiner='\n\n'):
+    """
+    ประกอบคำแปลกลับเป็นเอกสารตามโครงสร้างย่อหน้าเดิม
+
+    Args:
+        translated_spans (iterable): (SentenceSpan, คำแปล) จาก translate_document_stream
+        sentence_joiner (str): ตัวคั่นประโยคในย่อหน้า
+        paragraph_joiner (str): ตัวคั่นย่อหน้า
+    """
+    paragraphs = []
+    current_paragraph = None
+    for span, translation in translated_spans:
+        if span.paragraph != current_paragraph:
+            paragraphs.append([])
+            current_paragraph = span.paragraph
+        paragraphs[-1].append(translation)
+    return paragraph_joiner.join(sentence_joiner.join(sentences) for sentences in paragraphs)
+
+
+def translate_document(text, translator, source_lang='en', **kwargs):
+    """แปลเอกสารทั้งฉบับแล้วคืนเป็น string"""
+    return reassemble(translate_document_stream(text, translator, source_lang, **kwargs))
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+
+    from transformers.utils import logging
+
+    from model_registry import get_translation_pipeline
+    from tiny_marian import build_tiny_marian
+
+    logging.set_verbosity_error()
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else build_tiny_marian(tempfile.mkdtemp(prefix='tiny-marian-'))
+    translator = get_translation_pipeline(model_dir)
+
+    paragraph = ("Machine translation has improved dramatically. Neural models now handle long "
+                 "documents! But they still have a maximum input length. So we split documents "
+                 "into sentences first?")
+    document = "\n\n".join([paragraph] * 20)
+
+    start_time = time.perf_counter()
+    first_output = None
+    count = 0
+    for span, translation in translate_document_stream(document, translator, window_size=16):
+        if first_output is None:
+            first_output = time.perf_counter() - start_time
+        count += 1
+    total = time.perf_counter() - start_time
+    print(f"ประโยค: {count}, time-to-first-output: {first_output:.3f}s, ทั้งหมด: {total:.3f}s")
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Translation Evaluation
+การประเมินคุณภาพการแปลระดับ corpus ด้วย BLEU และ chrF
+
+- BLEU: n-gram 1-4 พร้อม brevity penalty คำนวณจากสถิติรวมทั้ง corpus
+  (ไม่ใช่ค่าเฉลี่ยของคะแนนรายประโยค)
+- chrF: F-score (beta=2) ของ character n-gram 1-6 โดยไม่นับช่องว่าง
+- ภาษาไทยไม่มีช่องว่างระหว่างคำ จึงแยกคำด้วย PyThaiNLP ก่อนคำนวณ BLEU
+  (แคชผลในหน่วยความจำ และใช้ SegmentationCache ของ WS บนดิสก์ได้)
+- นับ n-gram ด้วย hash: ถ้ามี NumPy จะ hash n-gram ของทั้ง corpus เป็นเลข 64 บิต
+  แล้วนับด้วยการเรียงลำดับแบบ vectorized (ไม่มี NumPy หรือมีหลาย reference
+  ใช้ Counter รายประโยค)
+- ชุดทดสอบขนาดใหญ่จะแบ่งเป็นส่วนแล้วคำนวณสถิติขนานกันหลายโปรเซส
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+BLEU_ORDER = 4
+CHRF_ORDER = 6
+CHRF_BETA = 2
+
+# ต่ำกว่านี้คำนวณในโปรเซสเดียว (ค่าใช้จ่ายในการสร้างโปรเซสไม่คุ้ม)
+_PARALLEL_THRESHOLD = 5000
+
+_LATIN_TOKEN = re.compile(r'\w+|[^\w\s]')
+
+# ค่าคงที่ของ polynomial hash และการผสม id ประโยคเข้ากับ hash ของ n-gram
+_HASH_BASE = 0x100000001B3
+_SENTENCE_MIX = 0x9E3779B97F4A7C15
+
+
+@lru_cache(maxsize=200_000)
+def _thai_tokens(text, engine):
+    from pythainlp.tokenize import word_tokenize
+
+    return tuple(token for token in word_tokenize(text, engine=engine, keep_whitespace=False)
+                 if not token.isspace())
+
+
+def tokenize(text, lang='en', engine='newmm'):
+    """
+    แยกคำสำหรับ BLEU
+
+    Args:
+        text (str): ประโยค
+        lang (str): 'th' ใช้ word_tokenize ของ PyThaiNLP, ภาษาอื่นแยกคำและเครื่องหมายวรรคตอน
+        engine (str): engine ของ PyThaiNLP
+
+    Returns:
+        tuple: คำ
+    """
+    if lang == 'th':
+        return _thai_tokens(text, engine)
+    return tuple(_LATIN_TOKEN.findall(text))
+
+
+def segment_corpus(texts, lang='en', engine='newmm', cache=None):
+    """
+    แยกคำทั้ง corpus (ใช้แคชบนดิสก์ถ้ากำหนด)
+
+    Args:
+        texts (list): ประโยค
+        lang (str): ภาษา
+        engine (str): engine ของ PyThaiNLP
+        cache: SegmentationCache จาก WS/segmentation_cache.py (หรือ object ที่มี tokenize_many)
+    """
+    if lang == 'th' and cache is not None:
+        import pythainlp
+
+        token_lists = cache.tokenize_many(
+            texts,
+            lambda text: list(_thai_tokens(text, engine)),
+            engine=f'pythainlp:{engine}',
+            version=pythainlp.__version__,
+        )
+        return [tuple(tokens) for tokens in token_lists]
+    return [tokenize(text, lang, engine) for text in texts]
+
+
+def _ngrams(tokens, n):
+    return Counter(zip(*[tokens[i:] for i in range(n)]))
+
+
+def _char_ngrams(text, n):
+    return Counter(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def _bleu_stats(hyp_tokens, ref_token_lists, max_order):
+    """[hyp_len, ref_len, match_1..n, total_1..n] ของหนึ่งประโยค"""
+    hyp_len = len(hyp_tokens)
+    # ความยาวอ้างอิงที่ใกล้ที่สุด (เท่ากันเลือกสั้นกว่า)
+    ref_len = min((abs(len(ref) - hyp_len), len(ref)) for ref in ref_token_lists)[1]
+
+    matches = []
+    totals = []
+    for n in range(1, max_order + 1):
+        hyp_counts = _ngrams(hyp_tokens, n)
+        ref_counts = _ngrams(ref_token_lists[0], n)
+        for ref in ref_token_lists[1:]:
+            ref_counts |= _ngrams(ref, n)
+        matches.append(sum((hyp_counts & ref_counts).values()))
+        totals.append(max(hyp_len - n + 1, 0))
+    return [hyp_len, ref_len] + matches + totals
+
+
+def _chrf_stats(hyp, refs, max_order):
+    """[match_n, hyp_n, ref_n] สำหรับ n = 1..max_order (เลือก reference ที่ได้คะแนนสูงสุด)"""
+    hyp = ''.join(hyp.split())
+    hyp_counts = [_char_ngrams(hyp, n) for n in range(1, max_order + 1)]
+
+    best_stats, best_score = None, -1.0
+    for ref in refs:
+        ref = ''.join(ref.split())
+        stats = []
+        for n, hyp_ngrams in enumerate(hyp_counts, 1):
+            ref_ngrams = _char_ngrams(ref, n)
+            stats += [sum((hyp_ngrams & ref_ngrams).values()),
+                      sum(hyp_ngrams.values()), sum(ref_ngrams.values())]
+        score = chrf_from_stats(stats, max_order) if len(refs) > 1 else 0.0
+        if score > best_score:
+            best_stats, best_score = stats, score
+    return best_stats
+
+
+def _add_stats(total, stats):
+    for i, value in enumerate(stats):
+        total[i] += value
+
+
+def _hashed_overlap(hyp_ids, hyp_lengths, ref_ids, ref_lengths, max_order):
+    """
+    นับ n-gram ที่ตรงกันของทั้ง corpus แบบ vectorized (หนึ่ง reference ต่อประโยค)
+
+    Args:
+        hyp_ids, ref_ids: numpy array (uint64) ของ id ที่ต่อกันทุกประโยค
+        hyp_lengths, ref_lengths: numpy array ความยาวของแต่ละประโยค
+        max_order (int): n สูงสุด
+
+    Returns:
+        list: (match, hyp_total, ref_total) ของ n = 1..max_order รวมทั้ง corpus
+    """
+    import numpy as np
+
+    base = np.uint64(_HASH_BASE)
+
+    def prepare(ids, lengths):
+        # id ประโยคของแต่ละตำแหน่ง และจำนวนตัวที่เหลือจนจบประโยค
+        sentence = np.repeat(np.arange(len(lengths), dtype=np.uint64), lengths)
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        remaining = np.repeat(lengths, lengths) - (np.arange(len(ids)) - starts)
+        return sentence * np.uint64(_SENTENCE_MIX), remaining
+
+    def count(hashes, salts, remaining, n):
+        valid = remaining[:len(hashes)] >= n
+        return np.unique(hashes[valid] ^ salts[:len(hashes)][valid], return_counts=True)
+
+    hyp_salts, hyp_remaining = prepare(hyp_ids, hyp_lengths)
+    ref_salts, ref_remaining = prepare(ref_ids, ref_lengths)
+    hyp_hashes, ref_hashes = hyp_ids, ref_ids
+
+    stats = []
+    for n in range(1, max_order + 1):
+        if n > 1:
+            # rolling hash: hash ของ n-gram จาก hash ของ (n-1)-gram
+            hyp_hashes = hyp_hashes[:-1] * base + hyp_ids[n - 1:]
+            ref_hashes = ref_hashes[:-1] * base + ref_ids[n - 1:]
+        hyp_keys, hyp_counts = count(hyp_hashes, hyp_salts, hyp_remaining, n)
+        ref_keys, ref_counts = count(ref_hashes, ref_salts, ref_remaining, n)
+
+        match = 0
+        if len(hyp_keys) and len(ref_keys):
+            index = np.minimum(np.searchsorted(ref_keys, hyp_keys), len(ref_keys) - 1)
+            found = ref_keys[index] == hyp_keys
+            match = int(np.minimum(hyp_counts[found], ref_counts[index[found]]).sum())
+        stats.append((match, int(hyp_counts.sum()), int(ref_counts.sum())))
+    return stats
+
+
+def _char_arrays(texts):
+    import numpy as np
+
+    texts = [''.join(text.split()) for text in texts]
+    codes = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    return codes, np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+
+
+def _token_arrays(token_lists, vocab):
+    import numpy as np
+
+    ids = [vocab.setdefault(token, len(vocab) + 1) for tokens in token_lists for token in tokens]
+    return (np.array(ids, dtype=np.uint64),
+            np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists)))
+
+
+def _vectorized_stats(hypotheses, references, hyp_tokens, ref_tokens, bleu_order, chrf_order):
+    """สถิติรวมของ BLEU/chrF ด้วย _hashed_overlap (หนึ่ง reference ต่อประโยค)"""
+    bleu_total = [0] * (2 + 2 * bleu_order)
+    chrf_total = []
+    if bleu_order:
+        vocab = {}
+        hyp_ids, hyp_lengths = _token_arrays(hyp_tokens, vocab)
+        ref_ids, ref_lengths = _token_arrays(ref_tokens, vocab)
+        overlap = _hashed_overlap(hyp_ids, hyp_lengths, ref_ids, ref_lengths, bleu_order)
+        bleu_total = ([int(hyp_lengths.sum()), int(ref_lengths.sum())]
+                      + [match for match, _, _ in overlap] + [total for _, total, _ in overlap])
+    if chrf_order:
+        hyp_codes, hyp_lengths = _char_arrays(hypotheses)
+        ref_codes, ref_lengths = _char_arrays(references)
+        for stats in _hashed_overlap(hyp_codes, hyp_lengths, ref_codes, ref_lengths, chrf_order):
+            chrf_total.extend(stats)
+    return bleu_total, chrf_total
+
+
+def _corpus_stats_chunk(args):
+    """คำนวณสถิติรวมของส่วนหนึ่งของ corpus (รันใน worker process)"""
+    hypotheses, references, hyp_tokens, ref_tokens, lang, engine, bleu_order, chrf_order = args
+
+    if bleu_order and hyp_tokens is None:
+        hyp_tokens = [tokenize(hyp, lang, engine) for hyp in hypotheses]
+        ref_tokens = [[tokenize(ref, lang, engine) for ref in refs] for refs in references]
+
+    if all(len(refs) == 1 for refs in references):
+        try:
+            return _vectorized_stats(
+                hypotheses, [refs[0] for refs in references],
+                hyp_tokens, [refs[0] for refs in ref_tokens] if bleu_order else None,
+                bleu_order, chrf_order,
+            )
+        except ImportError:
+            pass
+
+    bleu_total = [0] * (2 + 2 * bleu_order)
+    chrf_total = [0] * (3 * chrf_order)
+    for i, (hyp, refs) in enumerate(zip(hypotheses, references)):
+        if bleu_order:
+            _add_stats(bleu_total, _bleu_stats(hyp_tokens[i], ref_tokens[i], bleu_order))
+        if chrf_order:
+            _add_stats(chrf_total, _chrf_stats(hyp, refs, chrf_order))
+    return bleu_total, chrf_total
+
+
+def bleu_from_stats(stats, max_order=BLEU_ORDER, smooth=False):
+    """
+    คำนวณ BLEU จากสถิติรวม
+
+    Returns:
+        dict: score (0-100), precisions, bp, ratio, hyp_len, ref_len
+    """
+    hyp_len, ref_len = stats[0], stats[1]
+    matches = stats[2:2 + max_order]
+    totals = stats[2 + max_order:2 + 2 * max_order]
+
+    precisions = []
+    for n, (match, total) in enumerate(zip(matches, totals), 1):
+        if smooth and n > 1:
+            # add-one smoothing สำหรับคะแนนระดับประโยค
+            precisions.append((match + 1) / (total + 1))
+        else:
+            precisions.append(match / total if total else 0.0)
+
+    if hyp_len == 0 or min(precisions) == 0:
+        score = 0.0
+    else:
+        log_precision = sum(math.log(p) for p in precisions) / max_order
+        score = math.exp(log_precision)
+
+    bp = 1.0 if hyp_len > ref_len else (math.exp(1 - ref_len / hyp_len) if hyp_len else 0.0)
+    return {
+        'score': 100 * bp * score,
+        'precisions': [100 * p for p in precisions],
+        'bp': bp,
+        'ratio': hyp_len / ref_len if ref_len else 0.0,
+        'hyp_len': hyp_len,
+        'ref_len': ref_len,
+    }
+
+
+def chrf_from_stats(stats, max_order=CHRF_ORDER, beta=CHRF_BETA):
+    """คำนวณ chrF (0-100) จากสถิติรวม โดยเฉลี่ย precision/recall ของทุก n ก่อนรวมเป็น F-score"""
+    precision = recall = 0.0
+    orders = 0
+    for n in range(max_order):
+        match, hyp_total, ref_total = stats[3 * n:3 * n + 3]
+        if hyp_total == 0 and ref_total == 0:
+            continue
+        precision += match / hyp_total if hyp_total else 0.0
+        recall += match / ref_total if ref_total else 0.0
+        orders += 1
+    if not orders:
+        return 0.0
+    precision /= orders
+    recall /= orders
+    if precision + recall == 0:
+        return 0.0
+    beta2 = beta ** 2
+    return 100 * (1 + beta2) * precision * recall / (beta2 * precision + recall)
+
+
+def _normalize_references(references):
+    return [[ref] if isinstance(ref, str) else list(ref) for ref in references]
+
+
+def evaluate(hypotheses, references, lang='en', metrics=('bleu', 'chrf'), engine='newmm',
+             cache=None, workers=None, chunk_size=2000):
+    """
+    ประเมินคุณภาพการแปลระดับ corpus
+
+    Args:
+        hypotheses (list): คำแปลจากระบบ
+        references (list): คำแปลอ้างอิง (str หรือ list ของ str ต่อประโยคสำหรับหลาย reference)
+        lang (str): ภาษาปลายทาง ('th' จะแยกคำด้วย PyThaiNLP)
+        metrics (tuple): 'bleu' และ/หรือ 'chrf'
+        engine (str): engine แยกคำภาษาไทย
+        cache: SegmentationCache สำหรับแยกคำภาษาไทยล่วงหน้าพร้อมแคชบนดิสก์
+        workers (int): จำนวนโปรเซส (None = จำนวน CPU, 1 = ไม่ขนาน)
+        chunk_size (int): จำนวนประโยคต่อส่วนที่ส่งให้แต่ละโปรเซส
+
+    Returns:
+        dict: {'bleu': {...}, 'chrf': float, 'sentences': int}
+    """
+    hypotheses = list(hypotheses)
+    references = _normalize_references(references)
+    if len(hypotheses) != len(references):
+        raise ValueError("จำนวนคำแปลและคำแปลอ้างอิงไม่เท่ากัน")
+
+    bleu_order = BLEU_ORDER if 'bleu' in metrics else 0
+    chrf_order = CHRF_ORDER if 'chrf' in metrics else 0
+
+    # แยกคำล่วงหน้าผ่านแคชบนดิสก์ในโปรเซสหลัก (worker ได้รับเฉพาะผลแยกคำ)
+    hyp_tokens = ref_tokens = None
+    if bleu_order and cache is not None and lang == 'th':
+        hyp_tokens = segment_corpus(hypotheses, lang, engine, cache)
+        flat_refs = segment_corpus([ref for refs in references for ref in refs], lang, engine, cache)
+        ref_tokens = []
+        position = 0
+        for refs in references:
+            ref_tokens.append(flat_refs[position:position + len(refs)])
+            position += len(refs)
+
+    chunks = []
+    for start in range(0, len(hypotheses), chunk_size):
+        end = start + chunk_size
+        chunks.append((
+            hypotheses[start:end], references[start:end],
+            hyp_tokens[start:end] if hyp_tokens is not None else None,
+            ref_tokens[start:end] if ref_tokens is not None else None,
+            lang, engine, bleu_order, chrf_order,
+        ))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(chunks) > 1 and len(hypotheses) >= _PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            results = list(executor.map(_corpus_stats_chunk, chunks))
+    else:
+        results = [_corpus_stats_chunk(chunk) for chunk in chunks]
+
+    bleu_total = [0] * (2 + 2 * bleu_order)
+    chrf_total = [0] * (3 * chrf_order)
+    for bleu_stats, chrf_stats in results:
+        _add_stats(bleu_total, bleu_stats)
+        _add_stats(chrf_total, chrf_stats)
+
+    report = {'sentences': len(hypotheses)}
+    if bleu_order:
+        report['bleu'] = bleu_from_stats(bleu_total, bleu_order)
+    if chrf_order:
+        report['chrf'] = chrf_from_stats(chrf_total, chrf_order)
+    return report
+
+
+def corpus_bleu(hypotheses, references, lang='en', **kwargs):
+    """BLEU ระดับ corpus (dict: score, precisions, bp, ...)"""
+    return evaluate(hypotheses, references, lang, metrics=('bleu',), **kwargs)['bleu']
+
+
+def corpus_chrf(hypotheses, references, **kwargs):
+    """chrF ระดับ corpus (0-100)"""
+    return evaluate(hypotheses, references, metrics=('chrf',), **kwargs)['chrf']
+
+
+def sentence_scores(hypothesis, reference, lang='en', engine='newmm'):
+    """BLEU (พร้อม smoothing) และ chrF ของประโยคเดียว สำหรับแสดงผลรายประโยค"""
+    refs = [reference] if isinstance(reference, str) else list(reference)
+    hyp_tokens = tokenize(hypothesis, lang, engine)
+    ref_tokens = [tokenize(ref, lang, engine) for ref in refs]
+    return {
+        'bleu': bleu_from_stats(_bleu_stats(hyp_tokens, ref_tokens, BLEU_ORDER), smooth=True)['score'],
+        'chrf': chrf_from_stats(_chrf_stats(hypothesis, refs, CHRF_ORDER)),
+    }
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    rng = random.Random(0)
+    words = ["การ", "แปล", "ภาษา", "ด้วย", "เครื่อง", "ไพธอน", "เป็น", "ที่", "ดี", "มาก",
+             "วันนี้", "อากาศ", "ผู้ป่วย", "แพทย์", "ตรวจ", "เรียนรู้", "เกี่ยวกับ", "ระบบ"]
+    references = [''.join(rng.choice(words) for _ in range(rng.randint(5, 20))) for _ in range(100_000)]
+    hypotheses = [ref if rng.random() < 0.3 else ''.join(rng.sample(words, 8)) for ref in references]
+
+    start_time = time.perf_counter()
+    report = evaluate(hypotheses, references, lang='th')
+    elapsed = time.perf_counter() - start_time
+    print(f"ประโยค: {report['sentences']:,}  BLEU: {report['bleu']['score']:.2f}  "
+          f"chrF: {report['chrf']:.2f}  เวลา: {elapsed:.2f}s")
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Glossary Matcher
+การป้องกันศัพท์เฉพาะ (glossary) ก่อนแปลด้วย Aho-Corasick ในการสแกนครั้งเดียว
+
+แทนการเรียก str.replace ทีละคำ (O(ขนาด glossary x ความยาวข้อความ)):
+1. compile glossary เป็น automaton ของ Aho-Corasick ครั้งเดียว
+2. protect(): สแกนข้อความครั้งเดียว เลือกคำแบบ leftmost-longest
+   (คำที่เริ่มก่อนชนะ ถ้าเริ่มตำแหน่งเดียวกันเลือกคำที่ยาวกว่า)
+   และตรวจขอบคำสำหรับคำที่ขึ้นต้น/ลงท้ายด้วยอักษรละติน/ตัวเลข
+   (ภาษาไทยไม่มีช่องว่างระหว่างคำจึงไม่ตรวจขอบคำ) แล้วแทนด้วย placeholder สั้นๆ [T0], [T1], ...
+3. restore(): แทน placeholder ด้วยคำแปลใน regex pass เดียว
+4. automaton ถูกแคชตามเวอร์ชันของ glossary จึง compile ใหม่เฉพาะเมื่อ glossary เปลี่ยน
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict, deque
+
+# placeholder ที่โมเดลอาจเติมช่องว่างเข้ามา เช่น "[ T0 ]"
+_PLACEHOLDER_PATTERN = re.compile(r'\[\s*T\s*(\d+)\s*\]')
+
+_COMPILE_CACHE_SIZE = 8
+
+
+def _is_latin_word_char(char):
+    return char.isascii() and (char.isalnum() or char == '_')
+
+
+def _fold_case(text):
+    """แปลงเป็นตัวพิมพ์เล็กโดยคงความยาวเดิม (offset ต้องตรงกับข้อความต้นฉบับ)"""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return ''.join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+
+class GlossaryMatcher:
+    """
+    glossary ที่ compile เป็น Aho-Corasick automaton แล้ว
+
+    Args:
+        glossary (dict): {คำต้นทาง: คำแปล}
+        case_sensitive (bool): แยกตัวพิมพ์เล็ก/ใหญ่หรือไม่
+        word_boundaries (bool): ตรวจขอบคำที่ปลายคำซึ่งเป็นอักษรละติน/ตัวเลข
+    """
+
+    def __init__(self, glossary, case_sensitive=True, word_boundaries=True):
+        self.case_sensitive = case_sensitive
+        self.word_boundaries = word_boundaries
+        self.sources = []
+        self.targets = []
+
+        # state 0 คือ root; _goto[state] = {ตัวอักษร: state ถัดไป}
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [-1]      # id ของคำที่จบพอดีที่ state นี้
+        self._dict_link = [0]    # state ถัดไปในสาย fail ที่มีคำจบ (0 = ไม่มี)
+
+        for source, target in glossary.items():
+            if source:
+                self._add(source, target)
+        self._build_links()
+
+    def __len__(self):
+        return len(self.sources)
+
+    def _add(self, source, target):
+        key = source if self.case_sensitive else _fold_case(source)
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(-1)
+                self._dict_link.append(0)
+            state = next_state
+        if self._output[state] == -1:
+            self._output[state] = len(self.sources)
+            self.sources.append(source)
+            self.targets.append(target)
+        else:
+            # คำซ้ำ (เช่นต่างกันแค่ตัวพิมพ์เมื่อไม่แยกตัวพิมพ์): ใช้คำแปลล่าสุด
+            self.targets[self._output[state]] = target
+
+    def _build_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                self._dict_link[next_state] = fail if self._output[fail] != -1 else self._dict_link[fail]
+                queue.append(next_state)
+
+    def _at_boundary(self, text, start, end, term):
+        if not self.word_boundaries:
+            return True
+        if start > 0 and _is_latin_word_char(term[0]) and _is_latin_word_char(text[start - 1]):
+            return False
+        if end < len(text) and _is_latin_word_char(term[-1]) and _is_latin_word_char(text[end]):
+            return False
+        return True
+
+    def find(self, text):
+        """
+        หาคำใน glossary แบบ leftmost-longest ที่ไม่ซ้อนทับกัน
+
+        Returns:
+            list: (start, end, term_id) เรียงตามตำแหน่ง
+        """
+        haystack = text if self.case_sensitive else _fold_case(text)
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        sources = self.sources
+
+        # คำที่ยาวที่สุดที่เริ่มต้นในแต่ละตำแหน่ง: {start: (end, term_id)}
+        longest = {}
+        state = 0
+        for i, char in enumerate(haystack):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            match_state = state if output[state] != -1 else dict_link[state]
+            while match_state:
+                term_id = output[match_state]
+                end = i + 1
+                start = end - len(sources[term_id])
+                best = longest.get(start)
+                if (best is None or best[0] < end) and self._at_boundary(haystack, start, end, haystack[start:end]):
+                    longest[start] = (end, term_id)
+                match_state = dict_link[match_state]
+
+        matches = []
+        position = 0
+        for start in sorted(longest):
+            if start >= position:
+                end, term_id = longest[start]
+                matches.append((start, end, term_id))
+                position = end
+        return matches
+
+    def protect(self, text):
+        """
+        แทนคำใน glossary ด้วย placeholder ในการสแกนครั้งเดียว
+
+        Returns:
+            tuple: (ข้อความที่ป้องกันแล้ว, list ของ term_id ตามหมายเลข placeholder)
+        """
+        parts = []
+        placeholders = []
+        position = 0
+        for start, end, term_id in self.find(text):
+            parts.append(text[position:start])
+            parts.append(f"[T{len(placeholders)}]")
+            placeholders.append(term_id)
+            position = end
+        if not placeholders:
+            return text, placeholders
+        parts.append(text[position:])
+        return ''.join(parts), placeholders
+
+    def restore(self, text, placeholders):
+        """แทน placeholder ด้วยคำแปลจาก glossary ใน regex pass เดียว"""
+        if not placeholders:
+            return text
+
+        def replace(match):
+            index = int(match.group(1))
+            if index < len(placeholders):
+                return self.targets[placeholders[index]]
+            return match.group(0)
+
+        return _PLACEHOLDER_PATTERN.sub(replace, text)
+
+
+def glossary_version(glossary):
+    """fingerprint ของ glossary (ใช้เป็น key ของแคชเมื่อไม่ได้กำหนดเวอร์ชันเอง)"""
+    digest = hashlib.sha1()
+    for source, target in sorted(glossary.items()):
+        digest.update(source.encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(target.encode('utf-8'))
+        digest.update(b'\x01')
+    return digest.hexdigest()
+
+
+_compiled = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def compile_glossary(glossary, version=None, case_sensitive=True, word_boundaries=True):
+    """
+    คืน GlossaryMatcher ที่ compile แล้ว (แคชตามเวอร์ชันของ glossary)
+
+    Args:
+        glossary (dict): {คำต้นทาง: คำแปล}
+        version: เวอร์ชันของ glossary (None = คำนวณ fingerprint จากเนื้อหา)
+        case_sensitive (bool): แยกตัวพิมพ์เล็ก/ใหญ่หรือไม่
+        word_boundaries (bool): ตรวจขอบคำของอักษรละติน/ตัวเลข
+    """
+    if version is None:
+        version = glossary_version(glossary)
+    key = (version, case_sensitive, word_boundaries)
+
+    with _compiled_lock:
+        matcher = _compiled.get(key)
+        if matcher is not None:
+            _compiled.move_to_end(key)
+            return matcher
+
+    matcher = GlossaryMatcher(glossary, case_sensitive, word_boundaries)
+    with _compiled_lock:
+        _compiled[key] = matcher
+        while len(_compiled) > _COMPILE_CACHE_SIZE:
+            _compiled.popitem(last=False)
+    return matcher
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    glossary = {
+        "blood": "เลือด",
+        "blood pressure": "ความดันโลหิต",
+        "high blood pressure": "ความดันโลหิตสูง",
+        "pressure": "ความดัน",
+        "patient": "ผู้ป่วย",
+        "diagnosis": "การวินิจฉัย",
+    }
+    matcher = compile_glossary(glossary)
+    text = "The patient has high blood pressure; outpatients need a diagnosis."
+    protected, placeholders = matcher.protect(text)
+    print(protected)
+    print(matcher.restore(protected, placeholders))
+
+    # glossary ขนาดใหญ่: เทียบกับการเรียก str.replace ทีละคำ
+    rng = random.Random(0)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    large = {''.join(rng.choice(letters) for _ in range(rng.randint(4, 12))): f"<{i}>" for i in range(50_000)}
+    large.update(glossary)
+    sentence = text * 5
+
+    start_time = time.perf_counter()
+    matcher = compile_glossary(large)
+    compile_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(100):
+        matcher.restore(*matcher.protect(sentence))
+    matcher_seconds = (time.perf_counter() - start_time) / 100
+
+    start_time = time.perf_counter()
+    for _ in range(10):
+        result = sentence
+        for source, target in large.items():
+            result = result.replace(source, f"[TERM_{target}]")
+    replace_seconds = (time.perf_counter() - start_time) / 10
+
+    print(f"glossary {len(large):,} คำ: compile {compile_seconds:.2f}s, "
+          f"Aho-Corasick {matcher_seconds * 1000:.3f} ms/ประโยค, "
+          f"str.replace {replace_seconds * 1000:.3f} ms/ประโยค")
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Translation Model Registry
+ทะเบียนโมเดลกลางของโปรเซส: โหลดแต่ละโมเดลครั้งเดียวแล้วใช้ pipeline ร่วมกัน
+
+- key ของโมเดลคือ (model, task, device, dtype, kwargs อื่นๆ)
+- ถ้ากำหนด max_memory_bytes จะ evict โมเดลที่ใช้ล่าสุดนานที่สุด (LRU)
+  เมื่อขนาดรวมของโมเดลเกินงบประมาณ
+- เก็บเวลาโหลดและขนาดหน่วยความจำของแต่ละโมเดลไว้ดูใน report()
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+def estimate_model_bytes(model):
+    """
+    ประมาณขนาดหน่วยความจำของโมเดล PyTorch จาก parameters และ buffers
+
+    Linear ที่ผ่าน dynamic quantization เก็บน้ำหนัก int8 แบบ pack ไว้นอก parameters()/buffers()
+    จึงนับน้ำหนักและ bias จาก _packed_params ของ module นั้นเพิ่ม
+    """
+    total = 0
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        total += tensor.numel() * tensor.element_size()
+    for module in model.modules():
+        packed = getattr(module, '_packed_params', None)
+        if packed is None or not hasattr(packed, '_weight_bias'):
+            continue
+        for tensor in packed._weight_bias():
+            if tensor is not None:
+                total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class _RegistryEntry:
+    __slots__ = ('pipeline', 'load_seconds', 'resident_bytes', 'hits', 'loaded_at', 'last_used')
+
+    def __init__(self, pipeline, load_seconds, resident_bytes):
+        self.pipeline = pipeline
+        self.load_seconds = load_seconds
+        self.resident_bytes = resident_bytes
+        self.hits = 0
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+
+
+class ModelRegistry:
+    """
+    ทะเบียนโมเดลที่โหลดไว้แล้ว (thread-safe)
+
+    Args:
+        max_memory_bytes (int): งบประมาณหน่วยความจำรวมของโมเดล (None = ไม่จำกัด)
+    """
+
+    def __init__(self, max_memory_bytes=None):
+        self.max_memory_bytes = max_memory_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model, task='translation', device=-1, dtype=None, **pipeline_kwargs):
+        return (model, task, str(device), str(dtype), tuple(sorted(pipeline_kwargs.items())))
+
+    def get_pipeline(self, model, task='translation', device=-1, dtype=None, loader=None, **pipeline_kwargs):
+        """
+        คืน pipeline ที่โหลดไว้แล้ว หรือโหลดใหม่ถ้ายังไม่มี
+
+        Args:
+            model (str): ชื่อโมเดลหรือพาธในเครื่อง
+            task (str): task ของ pipeline
+            device: อุปกรณ์ (-1 = CPU)
+            dtype: torch dtype (เช่น torch.float16) หรือ None
+            loader (callable): ฟังก์ชันโหลดเอง loader(model, task, device, dtype, **kwargs)
+                ใช้แทน transformers.pipeline (เช่นโหลดแบบ quantized)
+            **pipeline_kwargs: พารามิเตอร์อื่นของ pipeline (รวมอยู่ใน key)
+        """
+        key = self.make_key(model, task, device, dtype, **pipeline_kwargs)
+
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry.pipeline
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # โหลดนอก lock หลัก เพื่อไม่ให้ผู้ใช้โมเดลอื่นต้องรอ
+        # แต่ใช้ lock ต่อ key เพื่อไม่ให้โหลดโมเดลเดียวกันซ้ำพร้อมกัน
+        with key_lock:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    return entry.pipeline
+
+            start_time = time.perf_counter()
+            if loader is not None:
+                pipe = loader(model, task, device, dtype, **pipeline_kwargs)
+            else:
+                pipe = self._default_loader(model, task, device, dtype, **pipeline_kwargs)
+            load_seconds = time.perf_counter() - start_time
+
+            model_obj = getattr(pipe, 'model', None)
+            resident_bytes = estimate_model_bytes(model_obj) if model_obj is not None else 0
+
+            with self._lock:
+                entry = _RegistryEntry(pipe, load_seconds, resident_bytes)
+                entry.hits = 1
+                self._entries[key] = entry
+                self._evict_over_budget(keep=key)
+            return pipe
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            entry.last_used = time.time()
+        return entry
+
+    @staticmethod
+    def _default_loader(model, task, device, dtype, **pipeline_kwargs):
+        from transformers import pipeline
+
+        if dtype is not None:
+            pipeline_kwargs['torch_dtype'] = dtype
+        return pipeline(task, model=model, device=device, **pipeline_kwargs)
+
+    def _evict_over_budget(self, keep=None):
+        if self.max_memory_bytes is None:
+            return
+        while self.total_bytes() > self.max_memory_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            del self._entries[oldest]
+            self.evictions += 1
+
+    def total_bytes(self):
+        return sum(entry.resident_bytes for entry in self._entries.values())
+
+    def evict(self, model=None):
+        """ลบโมเดลออกจากทะเบียน (ทุก key ของ model ที่กำหนด หรือทั้งหมดถ้าไม่กำหนด)"""
+        with self._lock:
+            keys = [key for key in self._entries if model is None or key[0] == model]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def report(self):
+        """รายงานเวลาโหลดและขนาดหน่วยความจำของแต่ละโมเดล (เรียงจากใช้ล่าสุด)"""
+        with self._lock:
+            return [
+                {
+                    'model': key[0],
+                    'task': key[1],
+                    'device': key[2],
+                    'dtype': key[3],
+                    'load_seconds': entry.load_seconds,
+                    'resident_mb': entry.resident_bytes / (1024 * 1024),
+                    'hits': entry.hits,
+                }
+                for key, entry in reversed(self._entries.items())
+            ]
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_registry(max_memory_bytes=None):
+    """
+    คืน registry กลางของโปรเซส (สร้างเมื่อเรียกครั้งแรก)
+
+    Args:
+        max_memory_bytes (int): ถ้ากำหนด จะปรับงบประมาณหน่วยความจำของ registry กลาง
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ModelRegistry(max_memory_bytes)
+        elif max_memory_bytes is not None:
+            _default_registry.max_memory_bytes = max_memory_bytes
+        return _default_registry
+
+
+def get_translation_pipeline(model, device=-1, dtype=None, **pipeline_kwargs):
+    """คืน translation pipeline จาก registry กลาง (โหลดครั้งเดียวต่อโปรเซส)"""
+    return get_registry().get_pipeline(model, 'translation', device, dtype, **pipeline_kwargs)
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    from tiny_marian import build_tiny_marian
+
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else build_tiny_marian(tempfile.mkdtemp(prefix='tiny-marian-'))
+
+    registry = get_registry()
+    for _ in range(3):
+        translator = get_translation_pipeline(model_dir)
+        translator("Hello, how are you?")
+
+    for row in registry.report():
+        print(f"{row['model']}: load {row['load_seconds']:.2f}s, "
+              f"{row['resident_mb']:.2f} MB, hits {row['hits']}")
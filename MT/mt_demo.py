@@ -18,10 +18,11 @@ def demo_basic_translation():
     print("=" * 60)
     
     try:
-        from transformers import pipeline
+        from model_registry import get_translation_pipeline
+        from streaming_translation import StreamingTranslator
         
         print("กำลังโหลดโมเดล...")
-        translator = pipeline("translation", model="Helsinki-NLP/opus-mt-en-th")
+        translator = StreamingTranslator(get_translation_pipeline("Helsinki-NLP/opus-mt-en-th"))
         
         test_sentences = [
             "Hello, how are you?",
@@ -31,13 +32,17 @@ def demo_basic_translation():
         ]
         
         for sentence in test_sentences:
-            start_time = time.time()
-            result = translator(sentence)
-            end_time = time.time()
-            
             print(f"EN: {sentence}")
-            print(f"TH: {result[0]['translation_text']}")
-            print(f"Time: {end_time - start_time:.2f} seconds")
+            print("TH: ", end="", flush=True)
+            
+            # แสดงคำแปลทีละส่วนระหว่างที่โมเดลกำลังสร้าง
+            stream = translator.stream(sentence)
+            for chunk in stream:
+                print(chunk, end="", flush=True)
+            print()
+            
+            print(f"Time to first token: {stream.time_to_first_token or 0:.2f} seconds, "
+                  f"total: {stream.total_seconds:.2f} seconds")
             print("-" * 50)
             
     except ImportError:
@@ -53,7 +58,8 @@ def demo_batch_processing():
     print("=" * 60)
     
     try:
-        from transformers import pipeline
+        from model_registry import get_translation_pipeline
+        from batch_translation import BatchingTranslator
         import pandas as pd
         
         # สร้างข้อมูลตัวอย่าง
@@ -66,17 +72,20 @@ def demo_batch_processing():
         ]
         
         print("กำลังโหลดโมเดล...")
-        translator = pipeline("translation", model="facebook/nllb-200-distilled-600M")
+        translator = get_translation_pipeline("facebook/nllb-200-distilled-600M")
+        
+        # จัด batch ตามความยาวของประโยค เพื่อลด padding
+        batching_translator = BatchingTranslator(translator, max_tokens=2048)
         
         print("กำลังแปลข้อมูลแบบ batch...")
         start_time = time.time()
-        results = translator(sample_texts)
+        translations = batching_translator.translate(sample_texts)
         end_time = time.time()
         
         # สร้าง DataFrame
         df = pd.DataFrame({
             'English': sample_texts,
-            'Thai': [result['translation_text'] for result in results]
+            'Thai': translations
         })
         
         print(f"แปลเสร็จสิ้น! ใช้เวลา {end_time - start_time:.2f} วินาที")
@@ -111,35 +120,23 @@ def demo_evaluation():
             "Python เป็นภาษาโปรแกรมมิ่งที่ยอดเยี่ยม"
         ]
         
-        # คำนวณ BLEU score แบบง่าย
-        def simple_bleu(pred, ref):
-            pred_words = pred.split()
-            ref_words = ref.split()
-            
-            # นับคำที่ตรงกัน
-            matches = 0
-            for word in pred_words:
-                if word in ref_words:
-                    matches += 1
-            
-            # คำนวณ precision
-            precision = matches / len(pred_words) if pred_words else 0
-            return precision
-        
+        from evaluation import evaluate, sentence_scores
+
         print("การประเมินคุณภาพการแปล:")
-        total_score = 0
-        
+
         for i, (pred, ref) in enumerate(zip(predictions, references)):
-            score = simple_bleu(pred, ref)
-            total_score += score
-            
+            scores = sentence_scores(pred, ref, lang='th')
+
             print(f"\nประโยคที่ {i+1}:")
             print(f"Prediction: {pred}")
             print(f"Reference:  {ref}")
-            print(f"Simple BLEU: {score:.4f}")
-        
-        avg_score = total_score / len(predictions)
-        print(f"\nคะแนนเฉลี่ย: {avg_score:.4f}")
+            print(f"BLEU: {scores['bleu']:.2f}  chrF: {scores['chrf']:.2f}")
+
+        # คะแนนระดับ corpus (รวมสถิติทุกประโยคก่อนคำนวณ ไม่ใช่ค่าเฉลี่ยรายประโยค)
+        report = evaluate(predictions, references, lang='th')
+        print(f"\nCorpus BLEU: {report['bleu']['score']:.2f} "
+              f"(BP {report['bleu']['bp']:.3f})")
+        print(f"Corpus chrF: {report['chrf']:.2f}")
         
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -151,27 +148,47 @@ def demo_domain_specific():
     print("=" * 60)
     
     try:
-        from transformers import pipeline
+        from model_registry import get_translation_pipeline
+        
+        from cpu_inference import InferenceConfig, get_cpu_translation_pipeline
+        from glossary_matcher import compile_glossary
+        from translation_memory import TranslationMemory, is_servable
         
         class DomainTranslator:
-            def __init__(self, model_name, glossary=None):
-                self.translator = pipeline("translation", model=model_name)
+            def __init__(self, model_name, glossary=None, translation_memory=None, inference_config=None):
+                # inference_config: InferenceConfig สำหรับ CPU (int8, จำนวน thread, greedy)
+                if inference_config is not None:
+                    self.translator = get_cpu_translation_pipeline(model_name, inference_config)
+                    self.generate_kwargs = inference_config.generate_kwargs()
+                else:
+                    self.translator = get_translation_pipeline(model_name)
+                    self.generate_kwargs = {}
                 self.glossary = glossary or {}
+                self.memory = translation_memory
+                # compile glossary เป็น Aho-Corasick ครั้งเดียว (แคชตามเวอร์ชันของ glossary)
+                self.matcher = compile_glossary(self.glossary)
             
             def preprocess(self, text):
-                for source, target in self.glossary.items():
-                    text = text.replace(source, f"[TERM_{target}]")
-                return text
+                """แทนศัพท์เฉพาะด้วย placeholder คืน (ข้อความ, placeholders)"""
+                return self.matcher.protect(text)
             
-            def postprocess(self, text):
-                for source, target in self.glossary.items():
-                    text = text.replace(f"[TERM_{target}]", target)
-                return text
+            def postprocess(self, text, placeholders):
+                return self.matcher.restore(text, placeholders)
             
             def translate(self, text):
-                preprocessed = self.preprocess(text)
-                result = self.translator(preprocessed)[0]['translation_text']
-                return self.postprocess(result)
+                # ตรวจสอบ Translation Memory ก่อนเรียกโมเดล (ใช้เฉพาะ exact หรือ fuzzy ที่ซ่อมแล้ว)
+                if self.memory is not None:
+                    match = self.memory.lookup(text)
+                    if is_servable(match):
+                        return match['translation']
+                
+                preprocessed, placeholders = self.preprocess(text)
+                result = self.translator(preprocessed, **self.generate_kwargs)[0]['translation_text']
+                translation = self.postprocess(result, placeholders)
+                
+                if self.memory is not None:
+                    self.memory.add(text, translation)
+                return translation
         
         # ศัพท์เฉพาะทางการแพทย์
         medical_glossary = {
@@ -185,13 +202,16 @@ def demo_domain_specific():
         print("กำลังโหลดโมเดลสำหรับโดเมนการแพทย์...")
         medical_translator = DomainTranslator(
             "Helsinki-NLP/opus-mt-en-th",
-            medical_glossary
+            medical_glossary,
+            translation_memory=TranslationMemory(),
+            inference_config=InferenceConfig(quantize=True, greedy=True)
         )
         
         medical_texts = [
             "The doctor will provide a diagnosis after examining the patient.",
             "The treatment for these symptoms is very effective.",
-            "The patient should follow the doctor's instructions carefully."
+            "The patient should follow the doctor's instructions carefully.",
+            "The doctor will provide a diagnosis after examining the patient."
         ]
         
         print("ผลการแปลเฉพาะโดเมนการแพทย์:")
@@ -200,12 +220,35 @@ def demo_domain_specific():
             print(f"EN: {text}")
             print(f"TH: {translation}")
             print("-" * 50)
+        
+        hit_rates = medical_translator.memory.hit_rates()
+        print(f"Translation Memory hit rate: {hit_rates['total']:.0%} "
+              f"(exact {hit_rates['exact']:.0%}, fuzzy {hit_rates['fuzzy']:.0%})")
             
     except ImportError:
         print("Error: กรุณาติดตั้ง transformers library")
     except Exception as e:
         print(f"Error: {str(e)}")
 
+def demo_model_registry():
+    """Demo 5: สถิติโมเดลที่โหลดไว้ใน Registry"""
+    print("=" * 60)
+    print("Demo 5: สถิติโมเดลที่โหลดไว้ใน Registry")
+    print("=" * 60)
+    
+    from model_registry import get_registry
+    
+    report = get_registry().report()
+    if not report:
+        print("ยังไม่มีโมเดลที่โหลดไว้ ลองรัน Demo 1, 2 หรือ 4 ก่อน")
+        return
+    
+    for row in report:
+        print(f"Model: {row['model']} ({row['task']}, device={row['device']})")
+        print(f"  เวลาโหลด: {row['load_seconds']:.2f} วินาที")
+        print(f"  ขนาดในหน่วยความจำ: {row['resident_mb']:.1f} MB")
+        print(f"  จำนวนครั้งที่ใช้: {row['hits']}")
+
 def main():
     """ฟังก์ชันหลักสำหรับรันการ demo ทั้งหมด"""
     print("🌐 Machine Translation Demo")
@@ -216,7 +259,8 @@ def main():
         ("การแปลภาษาพื้นฐาน", demo_basic_translation),
         ("การประมวลผลแบบ Batch", demo_batch_processing),
         ("การประเมินคุณภาพการแปล", demo_evaluation),
-        ("การแปลเฉพาะโดเมน", demo_domain_specific)
+        ("การแปลเฉพาะโดเมน", demo_domain_specific),
+        ("สถิติโมเดลที่โหลดไว้", demo_model_registry)
     ]
     
     while True:
@@ -226,7 +270,7 @@ def main():
         print("0. ออกจากโปรแกรม")
         
         try:
-            choice = int(input("\nกรุณาเลือก (0-4): "))
+            choice = int(input(f"\nกรุณาเลือก (0-{len(demos)}): "))
             
             if choice == 0:
                 print("ขอบคุณที่ใช้งาน!")
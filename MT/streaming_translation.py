@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Streaming Translation
+การแปลแบบแสดงผลทีละส่วนระหว่างที่ decoder กำลังสร้าง token
+
+- ใช้ TextIteratorStreamer ของ transformers: model.generate รันใน thread แยก
+  และส่งข้อความที่ decode แล้วออกมาทีละส่วน
+- ยกเลิกได้ (เช่น client ตัดการเชื่อมต่อ) ผ่าน StoppingCriteria ที่ตรวจ Event
+  ทุก step ของการ decode จึงหยุดใช้ CPU ทันทีไม่ต้องรอจนแปลจบ
+- ใช้ได้ทั้ง generator ปกติ (for ... in) และ async iterator (async for ... in)
+- แยกเวลาจนได้ token แรก (time-to-first-token) ออกจากเวลารวม
+"""
+
+import asyncio
+import threading
+import time
+
+_END = object()
+
+
+def _make_cancel_criteria(event):
+    """StoppingCriteria ที่หยุดการ generate เมื่อ event ถูก set"""
+    import torch
+    from transformers import StoppingCriteria
+
+    class CancelCriteria(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return torch.full((input_ids.shape[0],), event.is_set(), dtype=torch.bool,
+                              device=input_ids.device)
+
+    return CancelCriteria()
+
+
+class TranslationStream:
+    """
+    ผลการแปลหนึ่งประโยคแบบ streaming (iterate ได้ครั้งเดียว)
+
+    Attributes:
+        text (str): ข้อความที่ได้รับแล้วทั้งหมด
+        time_to_first_token (float): วินาทีจนได้ข้อความส่วนแรก
+        total_seconds (float): วินาทีจนแปลจบ (หรือถูกยกเลิก)
+        cancelled (bool): ถูกยกเลิกก่อนแปลจบหรือไม่
+    """
+
+    def __init__(self, model, tokenizer, text, generate_kwargs, timeout=None):
+        from transformers import StoppingCriteriaList, TextIteratorStreamer
+
+        self.text = ''
+        self.chunks = 0
+        self.time_to_first_token = None
+        self.total_seconds = None
+        self.cancelled = False
+        self._cancel_event = threading.Event()
+        self._error = None
+        self._start_time = time.perf_counter()
+
+        self._streamer = TextIteratorStreamer(tokenizer, skip_special_tokens=True, timeout=timeout)
+        inputs = tokenizer([text], return_tensors='pt', truncation=True)
+        kwargs = dict(inputs, streamer=self._streamer,
+                      stopping_criteria=StoppingCriteriaList([_make_cancel_criteria(self._cancel_event)]),
+                      **generate_kwargs)
+        self._thread = threading.Thread(target=self._generate, args=(model, kwargs), daemon=True)
+        self._thread.start()
+
+    def _generate(self, model, kwargs):
+        try:
+            model.generate(**kwargs)
+        except Exception as e:
+            self._error = e
+            # ปลด iterator ที่รออยู่
+            self._streamer.end()
+
+    def cancel(self):
+        """ยกเลิกการแปล (decoder จะหยุดที่ step ถัดไป)"""
+        if self.total_seconds is None:
+            self.cancelled = True
+        self._cancel_event.set()
+
+    def _next_chunk(self):
+        """คืนข้อความส่วนถัดไป หรือ _END เมื่อแปลจบ"""
+        for chunk in self._streamer:
+            if not chunk:
+                continue
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - self._start_time
+            self.text += chunk
+            self.chunks += 1
+            return chunk
+        self._finish()
+        return _END
+
+    def _finish(self):
+        self._thread.join()
+        if self.total_seconds is None:
+            self.total_seconds = time.perf_counter() - self._start_time
+        if self._error is not None:
+            raise self._error
+
+    def __iter__(self):
+        try:
+            while True:
+                chunk = self._next_chunk()
+                if chunk is _END:
+                    return
+                yield chunk
+        finally:
+            # ผู้ใช้หยุด iterate กลางทาง (เช่น client ตัดการเชื่อมต่อ)
+            if self.total_seconds is None:
+                self.cancel()
+                self._finish()
+
+    async def __aiter__(self):
+        try:
+            while True:
+                # รอ streamer ใน thread pool เพื่อไม่ให้ block event loop
+                chunk = await asyncio.to_thread(self._next_chunk)
+                if chunk is _END:
+                    return
+                yield chunk
+        finally:
+            if self.total_seconds is None:
+                self.cancel()
+                await asyncio.to_thread(self._finish)
+
+    def stats(self):
+        return {
+            'time_to_first_token': self.time_to_first_token,
+            'total_seconds': self.total_seconds,
+            'chunks': self.chunks,
+            'cancelled': self.cancelled,
+        }
+
+
+class StreamingTranslator:
+    """
+    ตัวแปลแบบ streaming
+
+    Args:
+        translator: translation pipeline (ใช้ .model และ .tokenizer)
+        timeout (float): เวลารอข้อความส่วนถัดไปสูงสุด (None = ไม่จำกัด)
+        **generate_kwargs: พารามิเตอร์ generate (เช่น max_new_tokens)
+            streaming ใช้ได้กับ greedy/sampling เท่านั้น (num_beams=1)
+    """
+
+    def __init__(self, translator, timeout=None, **generate_kwargs):
+        if generate_kwargs.get('num_beams', 1) != 1:
+            raise ValueError("streaming ไม่รองรับ beam search (ต้องใช้ num_beams=1)")
+        self.model = translator.model
+        self.tokenizer = translator.tokenizer
+        self.timeout = timeout
+        self.generate_kwargs = {**generate_kwargs, 'num_beams': 1}
+
+    def stream(self, text):
+        """
+        เริ่มแปลแบบ streaming
+
+        Returns:
+            TranslationStream: ใช้ได้ทั้ง ``for chunk in stream`` และ ``async for chunk in stream``
+        """
+        return TranslationStream(self.model, self.tokenizer, text, self.generate_kwargs, self.timeout)
+
+    def translate(self, text):
+        """แปลทั้งประโยค (ไม่ streaming) คืน (คำแปล, สถิติเวลา)"""
+        stream = self.stream(text)
+        for _ in stream:
+            pass
+        return stream.text, stream.stats()
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import warnings
+
+    from transformers.utils import logging
+
+    from model_registry import get_translation_pipeline
+    from tiny_marian import build_tiny_marian
+
+    logging.set_verbosity_error()
+    warnings.filterwarnings("ignore")
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else build_tiny_marian(
+        tempfile.mkdtemp(prefix='tiny-marian-'), max_length=128)
+
+    translator = StreamingTranslator(get_translation_pipeline(model_dir))
+    sentence = "Machine learning algorithms can process vast amounts of data."
+
+    # generator
+    stream = translator.stream(sentence)
+    for chunk in stream:
+        print(chunk, end='', flush=True)
+    print()
+    print(stream.stats())
+
+    # ยกเลิกหลังได้ 3 ส่วน
+    stream = translator.stream(sentence)
+    for i, chunk in enumerate(stream):
+        if i == 2:
+            break
+    print("ยกเลิก:", stream.stats())
+
+    # async iterator
+    async def consume():
+        stream = translator.stream(sentence)
+        async for chunk in stream:
+            pass
+        return stream.stats()
+
+    print("async:", asyncio.run(consume()))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tiny Marian Model Builder
+สร้างโมเดล Marian ขนาดเล็กมาก (น้ำหนักสุ่ม) ไว้ในเครื่อง สำหรับทดสอบและ benchmark
+โดยไม่ต้องดาวน์โหลดโมเดลจริงจาก Hugging Face Hub
+
+โมเดลนี้แปลไม่ได้จริง (ผลลัพธ์เป็นคำสุ่ม) แต่มีโครงสร้างและ tokenizer
+เหมือน Helsinki-NLP/opus-mt-* ทุกประการ จึงใช้วัดความเร็วและทดสอบ pipeline ได้
+
+Usage:
+    python tiny_marian.py ./tiny-marian
+"""
+
+import json
+import os
+
+SAMPLE_CORPUS = [
+    "Hello, how are you?",
+    "I love learning about machine translation.",
+    "Python is a great programming language.",
+    "The weather is beautiful today.",
+    "Artificial intelligence is transforming industries.",
+    "Machine learning algorithms can process vast amounts of data.",
+    "Natural language processing enables computers to understand human language.",
+    "The doctor will provide a diagnosis after examining the patient.",
+    "The treatment for these symptoms is very effective.",
+    "สวัสดี คุณสบายดีไหม",
+    "ฉันรักการเรียนรู้เกี่ยวกับการแปลภาษาด้วยเครื่อง",
+    "ไพธอนเป็นภาษาการเขียนโปรแกรมที่ดี",
+    "วันนี้อากาศดีมาก",
+    "แพทย์จะให้การวินิจฉัยหลังจากตรวจผู้ป่วย",
+]
+
+
+def build_tiny_marian(output_dir, vocab_size=256, d_model=32, layers=1, max_length=32, seed=0):
+    """
+    สร้างโมเดล Marian ขนาดเล็กพร้อม tokenizer แล้วบันทึกลงโฟลเดอร์
+
+    Args:
+        output_dir (str): โฟลเดอร์ปลายทาง (ใช้กับ pipeline(model=output_dir) ได้ทันที)
+        vocab_size (int): ขนาด vocabulary ของ SentencePiece
+        d_model (int): ขนาด hidden state
+        layers (int): จำนวน layer ของ encoder และ decoder
+        max_length (int): ความยาวสูงสุดของผลลัพธ์ตอน generate
+        seed (int): seed สำหรับการสุ่มน้ำหนัก
+
+    Returns:
+        str: output_dir
+    """
+    import sentencepiece as spm
+    import torch
+    from transformers import MarianConfig, MarianMTModel, MarianTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    # ฝึก SentencePiece จากประโยคตัวอย่าง (ใช้ร่วมกันทั้งฝั่งต้นทางและปลายทาง)
+    corpus_path = os.path.join(output_dir, 'corpus.txt')
+    with open(corpus_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(SAMPLE_CORPUS * 4))
+    model_prefix = os.path.join(output_dir, 'spm')
+    spm.SentencePieceTrainer.train(
+        input=corpus_path, model_prefix=model_prefix, vocab_size=vocab_size,
+        model_type='unigram', hard_vocab_limit=False, character_coverage=1.0,
+        unk_id=1, eos_id=0, bos_id=-1, pad_id=-1, minloglevel=2,
+    )
+    for name in ('source.spm', 'target.spm'):
+        with open(model_prefix + '.model', 'rb') as src, open(os.path.join(output_dir, name), 'wb') as dst:
+            dst.write(src.read())
+
+    processor = spm.SentencePieceProcessor(model_file=model_prefix + '.model')
+    vocab = {processor.id_to_piece(i): i for i in range(processor.get_piece_size())}
+    vocab['<pad>'] = len(vocab)
+    with open(os.path.join(output_dir, 'vocab.json'), 'w', encoding='utf-8') as f:
+        json.dump(vocab, f, ensure_ascii=False)
+    for suffix in ('.model', '.vocab'):
+        os.remove(model_prefix + suffix)
+    os.remove(corpus_path)
+
+    tokenizer = MarianTokenizer(
+        source_spm=os.path.join(output_dir, 'source.spm'),
+        target_spm=os.path.join(output_dir, 'target.spm'),
+        vocab=os.path.join(output_dir, 'vocab.json'),
+    )
+
+    pad_id = vocab['<pad>']
+    config = MarianConfig(
+        vocab_size=len(vocab),
+        d_model=d_model,
+        encoder_layers=layers,
+        decoder_layers=layers,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=d_model * 2,
+        decoder_ffn_dim=d_model * 2,
+        max_position_embeddings=256,
+        pad_token_id=pad_id,
+        eos_token_id=vocab['</s>'],
+        decoder_start_token_id=pad_id,
+        forced_eos_token_id=vocab['</s>'],
+    )
+
+    torch.manual_seed(seed)
+    model = MarianMTModel(config)
+    model.generation_config.max_length = max_length
+    model.generation_config.num_beams = 1
+    model.eval()
+
+    model.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    return output_dir
+
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[1] if len(sys.argv) > 1 else 'tiny-marian'
+    path = build_tiny_marian(target)
+    print(f"สร้างโมเดลขนาดเล็กที่: {path}")
+
+    from transformers import pipeline
+
+    translator = pipeline("translation", model=path)
+    print(translator("Hello, how are you?"))
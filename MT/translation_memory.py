@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Translation Memory
+หน่วยความจำการแปล (TM) ที่ตรวจสอบก่อนเรียกโมเดล
+
+- Exact match: ค้นหาจาก hash index (dict) ของประโยคต้นทางที่ normalize แล้ว
+- Fuzzy match: ค้นหาผู้สมัครจาก MinHash + LSH บน character n-gram
+  แล้วยืนยันด้วยค่าความคล้าย (difflib) ที่ต้องไม่ต่ำกว่า threshold
+- Repair: ปรับคำแปลของประโยคที่คล้ายกันให้ตรงกับประโยคใหม่
+  (ค่าเริ่มต้น 'numbers' แทนที่ตัวเลขที่ต่างกัน เช่น "5 mg" -> "10 mg")
+- ผลที่ใช้เป็นคำแปลได้ทันทีมีเฉพาะ 'exact' และ 'repaired' ส่วน fuzzy match ที่ซ่อมไม่ได้
+  เป็นเพียงคำแนะนำ ('fuzzy') เพราะประโยคที่ต่างกันเล็กน้อยอาจมีความหมายตรงข้าม
+  (เช่น "should not take" กับ "should take" คล้ายกัน 0.96)
+- บันทึกลงไฟล์ JSONL แบบต่อท้าย และมีสถิติ hit rate
+"""
+
+import difflib
+import json
+import os
+import re
+import zlib
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_NUMBER_PATTERN = re.compile(r'\d+(?:[.,]\d+)*')
+
+
+def normalize_source(text):
+    """normalize ประโยคต้นทางสำหรับ exact match (ตัดช่องว่างส่วนเกิน)"""
+    return ' '.join(text.split())
+
+
+class MinHashLSH:
+    """
+    ดัชนี MinHash + LSH สำหรับหาประโยคที่คล้ายกันบน character n-gram
+
+    Args:
+        ngram (int): ขนาด n-gram ของตัวอักษร
+        bands (int): จำนวน band ของ LSH
+        rows (int): จำนวนแถวต่อ band (num_perm = bands * rows)
+        seed (int): seed ของ hash functions
+    """
+
+    def __init__(self, ngram=3, bands=16, rows=4, seed=1):
+        import random
+
+        self.ngram = ngram
+        self.bands = bands
+        self.rows = rows
+        rng = random.Random(seed)
+        num_perm = bands * rows
+        self._params = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._buckets = {}
+
+    def _shingles(self, text):
+        text = text.lower()
+        n = self.ngram
+        if len(text) <= n:
+            return {text}
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def signature(self, text):
+        hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in self._shingles(text)]
+        return [
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self._params
+        ]
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, tuple(signature[band * rows:(band + 1) * rows])
+
+    def add(self, item_id, text):
+        for key in self._band_keys(self.signature(text)):
+            self._buckets.setdefault(key, []).append(item_id)
+
+    def query(self, text):
+        """คืน id ของผู้สมัครที่อยู่ใน bucket เดียวกันอย่างน้อยหนึ่ง band"""
+        candidates = set()
+        for key in self._band_keys(self.signature(text)):
+            candidates.update(self._buckets.get(key, ()))
+        return candidates
+
+
+def repair_numbers(source, match_source, match_target):
+    """
+    ซ่อมคำแปลเมื่อประโยคต่างกันเฉพาะตัวเลข
+
+    Returns:
+        str: คำแปลที่แทนที่ตัวเลขแล้ว หรือ None ถ้าซ่อมไม่ได้
+    """
+    new_numbers = _NUMBER_PATTERN.findall(source)
+    old_numbers = _NUMBER_PATTERN.findall(match_source)
+    if len(new_numbers) != len(old_numbers):
+        return None
+    if _NUMBER_PATTERN.sub('#', source) != _NUMBER_PATTERN.sub('#', match_source):
+        return None
+    if _NUMBER_PATTERN.findall(match_target) != old_numbers:
+        return None
+
+    replacements = iter(new_numbers)
+    return _NUMBER_PATTERN.sub(lambda match: next(replacements), match_target)
+
+
+class TranslationMemory:
+    """
+    หน่วยความจำการแปลพร้อม exact และ fuzzy match
+
+    Args:
+        path (str): ไฟล์ JSONL สำหรับบันทึก (None = อยู่ในหน่วยความจำอย่างเดียว)
+        fuzzy_threshold (float): ค่าความคล้ายขั้นต่ำ (0-1) ของ fuzzy match
+        repair: None, 'numbers' หรือฟังก์ชัน repair(source, match_source, match_target)
+        require_repair (bool): True = fuzzy match ที่ซ่อมไม่ได้ถือว่าไม่พบ
+            False = คืนเป็นคำแนะนำ (match 'fuzzy') ให้ผู้เรียกตัดสินใจเอง
+    """
+
+    def __init__(self, path=None, fuzzy_threshold=0.9, repair='numbers', require_repair=True):
+        self.path = path
+        self.fuzzy_threshold = fuzzy_threshold
+        self.repair = repair_numbers if repair == 'numbers' else repair
+        self.require_repair = require_repair
+
+        self.sources = []
+        self.targets = []
+        self.exact_index = {}
+        self.fuzzy_index = MinHashLSH()
+        # fuzzy_hits = fuzzy match ที่ซ่อมแล้ว, misses รวม suggestions (ยังต้องแปลด้วยโมเดล)
+        self.stats = {'lookups': 0, 'exact_hits': 0, 'fuzzy_hits': 0, 'suggestions': 0, 'misses': 0}
+
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def __len__(self):
+        return len(self.sources)
+
+    def _load(self, path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    record = json.loads(line)
+                    self._index(record['source'], record['target'])
+
+    def _index(self, source, target):
+        key = normalize_source(source)
+        if key in self.exact_index:
+            self.targets[self.exact_index[key]] = target
+            return False
+        item_id = len(self.sources)
+        self.sources.append(key)
+        self.targets.append(target)
+        self.exact_index[key] = item_id
+        self.fuzzy_index.add(item_id, key)
+        return True
+
+    def add(self, source, target):
+        """เพิ่มคู่ประโยคเข้า TM และต่อท้ายไฟล์ (ถ้ากำหนด path)"""
+        self.add_many([(source, target)])
+
+    def add_many(self, pairs):
+        """เพิ่มคู่ประโยคหลายคู่พร้อมกัน"""
+        records = []
+        for source, target in pairs:
+            self._index(source, target)
+            records.append(json.dumps({'source': source, 'target': target}, ensure_ascii=False))
+        if self.path and records:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(records) + '\n')
+
+    def lookup(self, source, fuzzy=True):
+        """
+        ค้นหาคำแปลจาก TM
+
+        Returns:
+            dict: {'translation', 'match', 'score', 'matched_source'} หรือ None ถ้าไม่พบ
+                match: 'exact' หรือ 'repaired' = ใช้เป็นคำแปลได้
+                       'fuzzy' = คำแปลของประโยคที่คล้ายกัน (เฉพาะ require_repair=False)
+                       ต้องให้ผู้เรียกยืนยันก่อนใช้ (ดู is_servable)
+        """
+        self.stats['lookups'] += 1
+        key = normalize_source(source)
+
+        item_id = self.exact_index.get(key)
+        if item_id is not None:
+            self.stats['exact_hits'] += 1
+            return {'translation': self.targets[item_id], 'match': 'exact',
+                    'score': 1.0, 'matched_source': key}
+
+        if fuzzy:
+            match = self._fuzzy_lookup(key)
+            if match is not None:
+                if match['match'] == 'repaired':
+                    self.stats['fuzzy_hits'] += 1
+                    return match
+                if not self.require_repair:
+                    self.stats['suggestions'] += 1
+                    self.stats['misses'] += 1
+                    return match
+
+        self.stats['misses'] += 1
+        return None
+
+    def _fuzzy_lookup(self, key):
+        best_id, best_score = None, 0.0
+        for item_id in self.fuzzy_index.query(key):
+            matcher = difflib.SequenceMatcher(None, key, self.sources[item_id], autojunk=False)
+            if matcher.real_quick_ratio() < self.fuzzy_threshold or matcher.quick_ratio() < self.fuzzy_threshold:
+                continue
+            score = matcher.ratio()
+            if score > best_score:
+                best_id, best_score = item_id, score
+
+        if best_id is None or best_score < self.fuzzy_threshold:
+            return None
+
+        translation = self.targets[best_id]
+        kind = 'fuzzy'
+        if self.repair is not None:
+            repaired = self.repair(key, self.sources[best_id], translation)
+            if repaired is not None:
+                translation, kind = repaired, 'repaired'
+
+        return {'translation': translation, 'match': kind,
+                'score': best_score, 'matched_source': self.sources[best_id]}
+
+    def hit_rates(self):
+        """อัตราการพบใน TM ที่ใช้เป็นคำแปลได้ ('fuzzy' = fuzzy match ที่ซ่อมแล้ว)"""
+        lookups = self.stats['lookups']
+        if not lookups:
+            return {'exact': 0.0, 'fuzzy': 0.0, 'total': 0.0}
+        return {
+            'exact': self.stats['exact_hits'] / lookups,
+            'fuzzy': self.stats['fuzzy_hits'] / lookups,
+            'total': (self.stats['exact_hits'] + self.stats['fuzzy_hits']) / lookups,
+        }
+
+    def compact(self):
+        """เขียนไฟล์ใหม่ให้เหลือหนึ่งบรรทัดต่อประโยคต้นทาง"""
+        if not self.path:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for source, target in zip(self.sources, self.targets):
+                f.write(json.dumps({'source': source, 'target': target}, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.path)
+
+
+def is_servable(match):
+    """ผลจาก lookup ใช้เป็นคำแปลได้โดยไม่ต้องยืนยันหรือไม่"""
+    return match is not None and match['match'] in ('exact', 'repaired')
+
+
+class TMTranslator:
+    """
+    ตัวแปลที่ตรวจสอบ Translation Memory ก่อนเรียกโมเดล
+
+    Args:
+        translator: translation pipeline หรือฟังก์ชันรับ list ของ str คืน list ของ str
+        memory (TranslationMemory): หน่วยความจำการแปล
+        fuzzy (bool): ใช้ fuzzy match หรือไม่
+        learn (bool): เพิ่มผลการแปลจากโมเดลเข้า TM อัตโนมัติ
+    """
+
+    def __init__(self, translator, memory=None, fuzzy=True, learn=True):
+        self.translator = translator
+        self.memory = memory if memory is not None else TranslationMemory()
+        self.fuzzy = fuzzy
+        self.learn = learn
+        self.model_calls = 0
+
+    def _translate_with_model(self, texts):
+        self.model_calls += len(texts)
+        outputs = self.translator(texts)
+        return [
+            output['translation_text'] if isinstance(output, dict) else output
+            for output in outputs
+        ]
+
+    def translate(self, text):
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts):
+        """แปลหลายประโยค ส่งเฉพาะประโยคที่ไม่พบใน TM ไปยังโมเดลใน batch เดียว"""
+        results = [None] * len(texts)
+        pending = {}
+        for i, text in enumerate(texts):
+            match = self.memory.lookup(text, fuzzy=self.fuzzy)
+            if is_servable(match):
+                results[i] = match['translation']
+            else:
+                pending.setdefault(normalize_source(text), []).append(i)
+
+        if pending:
+            sources = list(pending)
+            translations = self._translate_with_model(sources)
+            for source, translation in zip(sources, translations):
+                for i in pending[source]:
+                    results[i] = translation
+            if self.learn:
+                self.memory.add_many(zip(sources, translations))
+
+        return results
+
+
+if __name__ == "__main__":
+    memory = TranslationMemory()
+    memory.add("The patient should take 5 mg of the medicine twice a day.",
+               "ผู้ป่วยควรรับประทานยา 5 mg วันละสองครั้ง")
+
+    queries = [
+        "The patient should take 5 mg of the medicine twice a day.",
+        "The patient should take 10 mg of the medicine twice a day.",
+        "The patient should not take 5 mg of the medicine twice a day.",
+        "The weather is beautiful today.",
+    ]
+    for query in queries:
+        match = memory.lookup(query)
+        if match:
+            print(f"[{match['match']} {match['score']:.2f}] {query} -> {match['translation']}")
+        else:
+            print(f"[miss] {query}")
+    print(f"Hit rates: {memory.hit_rates()}")
@@ -0,0 +1,358 @@
+# เครื่องมือ: inverted index สำหรับค้นหาในประวัติการวิเคราะห์
+
+"""
+ค้นหาประวัติการวิเคราะห์โดยไม่ต้องไล่ดูทุกผลลัพธ์
+
+- inverted index: คำ -> posting list ของ (id ของผลการวิเคราะห์, ตำแหน่งของคำ)
+  posting list เก็บเป็น bytearray แบบ varint + delta (id และตำแหน่งเก็บเป็นผลต่างจากค่าก่อนหน้า)
+  id เพิ่มขึ้นเสมอ จึงต่อท้ายได้ทันทีเมื่อมีผลใหม่ (incremental)
+- ดัชนีรอง: เวลา (เรียงตาม timestamp ค้นช่วงด้วย bisect) และ engine (posting list แบบเดียวกัน)
+- คำค้น: คำที่คั่นด้วยช่องว่าง = AND, OR, -คำ = NOT, "วลี" = คำติดกันตามลำดับ
+- เรียงผลด้วย TF-IDF
+
+คำที่เป็นช่องว่างไม่ถูกนับตำแหน่ง วลีจึงข้ามช่องว่างระหว่างคำได้
+"""
+
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+
+_QUERY_TOKEN = re.compile(r'(-?)"([^"]*)"|(\S+)')
+
+
+def _append_varint(data, value):
+    while value >= 0x80:
+        data.append((value & 0x7F) | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def _iter_varints(data):
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = 0
+            shift = 0
+
+
+class PostingList:
+    """
+    posting list แบบบีบอัด: (delta ของ id, จำนวนตำแหน่ง, delta ของตำแหน่ง...) ต่อกัน
+
+    Args:
+        positions (bool): เก็บตำแหน่งของคำด้วยหรือไม่
+    """
+
+    __slots__ = ('data', 'last_id', 'count', 'positions')
+
+    def __init__(self, positions=True):
+        self.data = bytearray()
+        self.last_id = -1
+        self.count = 0
+        self.positions = positions
+
+    def append(self, doc_id, positions=()):
+        if doc_id <= self.last_id:
+            raise ValueError("id ต้องเพิ่มขึ้นเสมอ")
+        _append_varint(self.data, doc_id - self.last_id)
+        self.last_id = doc_id
+        self.count += 1
+        if self.positions:
+            _append_varint(self.data, len(positions))
+            previous = 0
+            for position in positions:
+                _append_varint(self.data, position - previous)
+                previous = position
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        """คืน (id, รายการตำแหน่ง) เรียงตาม id"""
+        values = _iter_varints(self.data)
+        doc_id = -1
+        for delta in values:
+            doc_id += delta
+            positions = []
+            if self.positions:
+                position = 0
+                for _ in range(next(values)):
+                    position += next(values)
+                    positions.append(position)
+            yield doc_id, positions
+
+    def ids(self):
+        return [doc_id for doc_id, _ in self]
+
+
+class AnalysisIndex:
+    """
+    ดัชนีของผลการวิเคราะห์ (ผลลัพธ์ของ analyze_single_text)
+
+    Args:
+        documents (list): list ที่เก็บผลการวิเคราะห์ (เช่น analysis_history) id = index ใน list
+            None = ดัชนีเก็บ list ของตัวเอง
+        tokenizer (callable): ใช้แยกคำของวลีที่ไม่มีช่องว่าง (เช่นวลีภาษาไทย)
+    """
+
+    def __init__(self, documents=None, tokenizer=None):
+        self.documents = [] if documents is None else documents
+        self.tokenizer = tokenizer
+        self.postings = {}
+        self.engines = {}
+        self.doc_lengths = {}
+        self._by_time = []
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    # ----- การเพิ่มข้อมูล -----
+
+    def add(self, result, doc_id=None):
+        """
+        เพิ่มผลการวิเคราะห์เข้าดัชนี
+
+        Args:
+            result (dict): ผลของ analyze_single_text
+            doc_id (int): index ของผลใน documents (None = ต่อท้าย documents)
+
+        Returns:
+            int: id ของผล (None ถ้าเป็นผลที่ผิดพลาด)
+        """
+        if 'error' in result:
+            return None
+        if doc_id is None:
+            doc_id = len(self.documents)
+            self.documents.append(result)
+
+        positions = {}
+        position = 0
+        for token in result['tokens']:
+            if token.isspace():
+                continue
+            positions.setdefault(token.lower(), []).append(position)
+            position += 1
+
+        for token, token_positions in positions.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = PostingList()
+            posting.append(doc_id, token_positions)
+
+        engine = result['engine_used']
+        if engine not in self.engines:
+            self.engines[engine] = PostingList(positions=False)
+        self.engines[engine].append(doc_id)
+        insort(self._by_time, (result['timestamp'], doc_id))
+        self.doc_lengths[doc_id] = position
+        return doc_id
+
+    def rebuild(self):
+        """สร้างดัชนีใหม่จาก documents ทั้งหมด"""
+        self.postings.clear()
+        self.engines.clear()
+        self.doc_lengths.clear()
+        self._by_time.clear()
+        for doc_id, result in enumerate(self.documents):
+            self.add(result, doc_id)
+
+    # ----- การค้นหาพื้นฐาน -----
+
+    def documents_with(self, token):
+        """id ของผลที่มีคำนี้"""
+        posting = self.postings.get(token.lower())
+        return set(posting.ids()) if posting is not None else set()
+
+    def phrase(self, tokens):
+        """id ของผลที่มีคำเรียงติดกันตามลำดับ"""
+        tokens = [token.lower() for token in tokens if not token.isspace()]
+        if not tokens:
+            return set()
+        if any(token not in self.postings for token in tokens):
+            return set()
+        if len(tokens) == 1:
+            return self.documents_with(tokens[0])
+
+        # ค้นจากคำที่มีผลน้อยที่สุดก่อน
+        candidates = None
+        for token in sorted(set(tokens), key=lambda token: len(self.postings[token])):
+            ids = self.documents_with(token)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+
+        positions = [
+            {doc_id: set(doc_positions) for doc_id, doc_positions in self.postings[token]
+             if doc_id in candidates}
+            for token in tokens
+        ]
+        matches = set()
+        for doc_id in candidates:
+            first = positions[0][doc_id]
+            if any(all(start + offset in positions[offset][doc_id] for offset in range(1, len(tokens)))
+                   for start in first):
+                matches.add(doc_id)
+        return matches
+
+    def filter_ids(self, engine=None, since=None, until=None):
+        """
+        id ที่ตรงกับ engine และช่วงเวลา (None = ทั้งหมด)
+
+        Args:
+            since, until (str): timestamp แบบ ISO (เทียบแบบข้อความ), until ไม่รวมค่าที่เท่ากัน
+        """
+        if since is None and until is None:
+            ids = set(self.doc_lengths)
+        else:
+            start = 0 if since is None else bisect_left(self._by_time, (since, -1))
+            end = len(self._by_time) if until is None else bisect_left(self._by_time, (until, -1))
+            ids = {doc_id for _, doc_id in self._by_time[start:end]}
+        if engine is not None:
+            posting = self.engines.get(engine)
+            ids &= set(posting.ids()) if posting is not None else set()
+        return ids
+
+    # ----- คำค้น -----
+
+    def _term_ids(self, term, is_phrase):
+        if not is_phrase:
+            return self.documents_with(term)
+        tokens = term.split()
+        if len(tokens) == 1 and self.tokenizer is not None:
+            tokens = self.tokenizer(term)
+        return self.phrase(tokens)
+
+    def parse_query(self, query):
+        """
+        แยกคำค้นเป็นกลุ่ม OR ของเงื่อนไข AND
+
+        Returns:
+            list: [(คำที่ต้องมี, คำที่ต้องไม่มี)] แต่ละคำเป็น (ข้อความ, เป็นวลีหรือไม่)
+        """
+        groups = [([], [])]
+        for match in _QUERY_TOKEN.finditer(query):
+            negated, phrase, word = match.groups()
+            if word == 'OR':
+                groups.append(([], []))
+                continue
+            if phrase is not None:
+                term = (phrase, True)
+            elif word.startswith('-') and len(word) > 1:
+                negated, term = '-', (word[1:], False)
+            else:
+                term = (word, False)
+            groups[-1][1 if negated else 0].append(term)
+        return [group for group in groups if group[0] or group[1]]
+
+    def search(self, query, engine=None, since=None, until=None, rank=True, limit=None):
+        """
+        ค้นหาด้วยคำค้นแบบ boolean/วลี
+
+        Args:
+            query (str): เช่น 'โรงเรียน นักเรียน', 'ข้าวผัด OR ส้มตำ', '"ภาษา ธรรมชาติ" -ฉัน'
+            engine (str): กรองเฉพาะผลของ engine นี้
+            since, until (str): กรองตามช่วง timestamp
+            rank (bool): เรียงด้วย TF-IDF (False = เรียงตาม id)
+            limit (int): จำนวนผลสูงสุด
+
+        Returns:
+            list: (id, คะแนน) เรียงจากคะแนนมากไปน้อย
+        """
+        # ไม่มีตัวกรอง: เริ่มจาก id ของคำค้นโดยตรง ไม่สร้างเซตของทุกผล
+        unfiltered = engine is None and since is None and until is None
+        allowed = None if unfiltered else self.filter_ids(engine, since, until)
+        matches = set()
+        query_tokens = []
+        for required, excluded in self.parse_query(query):
+            ids = None if allowed is None else set(allowed)
+            for term, is_phrase in sorted(required, key=lambda item: item[1]):
+                term_ids = self._term_ids(term, is_phrase)
+                ids = term_ids if ids is None else ids & term_ids
+                if not ids:
+                    break
+            if ids is None:
+                # มีแต่คำที่ต้องไม่มี: เริ่มจากทุกผล
+                ids = set(self.doc_lengths)
+            for term, is_phrase in excluded:
+                ids -= self._term_ids(term, is_phrase)
+            matches |= ids
+            for term, is_phrase in required:
+                query_tokens.extend(term.split() if is_phrase else [term])
+
+        if not rank:
+            hits = [(doc_id, 0.0) for doc_id in sorted(matches)]
+        else:
+            hits = self.rank_tfidf(query_tokens, matches)
+        return hits[:limit] if limit is not None else hits
+
+    def rank_tfidf(self, tokens, candidates=None, limit=None):
+        """
+        เรียงผลด้วย TF-IDF: ผลรวมของ (tf / จำนวนคำของผล) * log(1 + N / df)
+
+        Args:
+            tokens (list): คำค้น
+            candidates (set): id ที่ต้องการเรียง (None = ทุกผลที่มีคำค้นอย่างน้อยหนึ่งคำ)
+        """
+        total = len(self.doc_lengths) or 1
+        scores = Counter()
+        for token in set(token.lower() for token in tokens):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            idf = math.log(1 + total / len(posting))
+            for doc_id, positions in posting:
+                if candidates is None or doc_id in candidates:
+                    scores[doc_id] += len(positions) / (self.doc_lengths[doc_id] or 1) * idf
+        if candidates is not None:
+            for doc_id in candidates:
+                scores.setdefault(doc_id, 0.0)
+        hits = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return hits[:limit] if limit is not None else hits
+
+    def top_words(self, n=20, engine=None, since=None, until=None):
+        """คำสำคัญที่พบบ่อยที่สุดในผลที่ตรงกับ engine/ช่วงเวลา"""
+        frequency = Counter()
+        for doc_id in self.filter_ids(engine, since, until):
+            frequency.update(self.documents[doc_id]['statistics']['word_frequency'])
+        return frequency.most_common(n)
+
+    def stats(self):
+        """ขนาดของดัชนี"""
+        postings = sum(len(posting) for posting in self.postings.values())
+        return {
+            'documents': len(self.doc_lengths),
+            'vocabulary': len(self.postings),
+            'postings': postings,
+            'posting_bytes': sum(len(posting.data) for posting in self.postings.values()),
+            'engines': {engine: len(posting) for engine, posting in self.engines.items()},
+        }
+
+
+# ตัวอย่างการใช้งาน
+if __name__ == "__main__":
+    from project_thai_text_analyzer import ThaiTextAnalysisSystem
+
+    analyzer = ThaiTextAnalysisSystem(index_history=True)
+    texts = [
+        "นักเรียนไปโรงเรียนเพื่อเรียนหนังสือทุกวัน",
+        "วันนี้อากาศดีมากเหมาะสำหรับการเดินทางท่องเที่ยว",
+        "การประมวลผลภาษาธรรมชาติเป็นสาขาที่น่าสนใจและมีประโยชน์",
+        "ฉันชอบกินข้าวผัดและส้มตำมากที่สุด",
+        "ครูสอนนักเรียนในโรงเรียน ครูเป็นคนดี",
+    ]
+    for text in texts:
+        analyzer.analyze_single_text(text)
+    analyzer.analyze_single_text("นักเรียนชอบกินข้าวผัด", engine='longest')
+
+    for query in ['นักเรียน', 'นักเรียน -ครู', 'ข้าวผัด OR ท่องเที่ยว', '"ไป โรงเรียน"', '"ภาษาธรรมชาติ"']:
+        hits = analyzer.search_history(query)
+        print(f"{query!r}:", [(result['original_text'], round(score, 3)) for result, score in hits])
+
+    print("engine longest:", analyzer.history_index.top_words(5, engine='longest'))
+    print(analyzer.history_index.stats())
@@ -0,0 +1,286 @@
+# เครื่องมือ: ผลการวิเคราะห์แบบกะทัดรัด (__slots__) ที่คำนวณสถิติเมื่อเรียกใช้
+
+"""
+AnalysisResult: ผลของ ThaiTextAnalysisSystem.analyze_text
+
+แทน dict ซ้อนขนาดใหญ่ของ analyze_single_text:
+- ใช้ __slots__ ไม่มี __dict__ ต่อ object
+- เก็บ processed_text เฉพาะเมื่อต่างจาก original_text
+- TextStatistics คำนวณแต่ละค่าเมื่อถูกอ่านครั้งแรกแล้วจำไว้ (memoize)
+  ผู้ที่อ่านแค่ word_count จึงไม่ต้องสกัดคำสำคัญหรือสร้าง Counter
+- fields= กำหนดชุดสถิติที่ต้องการ: to_dict() และการวนลูปให้เฉพาะค่าเหล่านี้
+
+ทั้งสองคลาสเป็น Mapping (อ่านได้ด้วย result['statistics']['word_count'], dict(result),
+'error' in result) โค้ดเดิมที่ใช้ผลแบบ dict จึงใช้ต่อได้ และ to_dict() คืน dict รูปแบบเดิม
+"""
+
+import re
+from collections import Counter
+from collections.abc import Mapping
+
+from token_spans import TokenSpans
+
+STATISTICS_FIELDS = (
+    'character_count',
+    'word_count',
+    'content_word_count',
+    'stopword_count',
+    'unique_words',
+    'unique_content_words',
+    'avg_word_length',
+    'content_ratio',
+    'word_frequency',
+    'stopwords_found',
+)
+
+RESULT_FIELDS = ('timestamp', 'original_text', 'processed_text', 'engine_used', 'tokens',
+                 'statistics', 'pos_analysis')
+
+
+def extract_content_words(tokens, stopwords):
+    """
+    สกัดคำสำคัญ (ไม่รวม stopwords และคำที่ไม่สำคัญ)
+
+    Returns:
+        tuple: (คำสำคัญ, stopwords ที่พบ)
+    """
+    content_words = []
+    stopwords_found = []
+
+    for token in tokens:
+        token = token.strip()
+        if not token:
+            continue
+
+        if token in stopwords:
+            stopwords_found.append(token)
+        elif len(token) > 1 and not re.match(r'^[0-9\W]+$', token):
+            content_words.append(token)
+
+    return content_words, stopwords_found
+
+
+def validate_fields(fields):
+    """ตรวจชื่อสถิติใน fields แล้วคืนเป็น tuple ตามลำดับของ STATISTICS_FIELDS (None = ทั้งหมด)"""
+    if fields is None:
+        return STATISTICS_FIELDS
+    if isinstance(fields, str):
+        fields = (fields,)
+    unknown = set(fields) - set(STATISTICS_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown statistics fields: {sorted(unknown)}")
+    return tuple(field for field in STATISTICS_FIELDS if field in fields)
+
+
+class TextStatistics(Mapping):
+    """
+    สถิติของข้อความที่คำนวณเมื่อถูกอ่านครั้งแรก
+
+    Args:
+        character_count (int): จำนวนตัวอักษรของข้อความ
+        tokens (list | TokenSpans): รายการคำ (ไม่คัดลอก) ถ้าเป็น TokenSpans
+            word_count และ avg_word_length คำนวณจากขอบคำโดยตรง
+        stopwords (frozenset): stopwords ที่ใช้แยกคำสำคัญ (ไม่คัดลอก แชร์ระหว่างผลทั้งหมด)
+        fields (iterable): สถิติที่ต้องการ (None = ทั้งหมด)
+    """
+
+    __slots__ = ('character_count', 'word_count', 'fields', '_tokens', '_stopwords',
+                 '_content_words', '_stopwords_found', '_unique_words',
+                 '_unique_content_words', '_avg_word_length', '_word_frequency')
+
+    def __init__(self, character_count, tokens, stopwords, fields=None):
+        self.character_count = character_count
+        self.word_count = len(tokens)
+        self.fields = validate_fields(fields)
+        self._tokens = tokens
+        self._stopwords = stopwords
+        self._content_words = None
+        self._stopwords_found = None
+        self._unique_words = None
+        self._unique_content_words = None
+        self._avg_word_length = None
+        self._word_frequency = None
+
+    def _split_words(self):
+        if self._content_words is None:
+            self._content_words, self._stopwords_found = extract_content_words(self._tokens, self._stopwords)
+        return self._content_words
+
+    # ----- pickle -----
+
+    def __getstate__(self):
+        # แยกคำสำคัญก่อน แล้วไม่ pickle ชุด stopwords ที่แชร์กันไปกับทุกผล
+        self._split_words()
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state['_stopwords'] = None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @property
+    def content_word_count(self):
+        return len(self._split_words())
+
+    @property
+    def stopwords_found(self):
+        self._split_words()
+        return self._stopwords_found
+
+    @property
+    def stopword_count(self):
+        return len(self.stopwords_found)
+
+    @property
+    def unique_words(self):
+        if self._unique_words is None:
+            self._unique_words = len(set(self._tokens))
+        return self._unique_words
+
+    @property
+    def unique_content_words(self):
+        if self._unique_content_words is None:
+            self._unique_content_words = len(set(self._split_words()))
+        return self._unique_content_words
+
+    @property
+    def avg_word_length(self):
+        if self._avg_word_length is None:
+            tokens = self._tokens
+            if isinstance(tokens, TokenSpans):
+                self._avg_word_length = tokens.avg_word_length
+            else:
+                self._avg_word_length = sum(len(token) for token in tokens) / len(tokens) if tokens else 0
+        return self._avg_word_length
+
+    @property
+    def content_ratio(self):
+        return self.content_word_count / self.word_count if self.word_count else 0
+
+    @property
+    def word_frequency(self):
+        if self._word_frequency is None:
+            self._word_frequency = Counter(self._split_words())
+        return self._word_frequency
+
+    # ----- Mapping -----
+
+    def __getitem__(self, key):
+        # อ่านได้ทุกสถิติ fields มีผลเฉพาะกับการวนลูปและ to_dict()
+        if key not in STATISTICS_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def to_dict(self, fields=None):
+        """dict ของสถิติใน fields (คำนวณเฉพาะค่าเหล่านี้) fields= ใช้แทน self.fields ได้"""
+        return {field: getattr(self, field) for field in (self.fields if fields is None else validate_fields(fields))}
+
+    def __repr__(self):
+        computed = {'character_count': self.character_count, 'word_count': self.word_count}
+        return f"TextStatistics({computed}, fields={list(self.fields)})"
+
+
+class AnalysisResult(Mapping):
+    """
+    ผลการวิเคราะห์ข้อความหนึ่งข้อความ
+
+    Attributes:
+        timestamp, original_text, processed_text, engine_used, pos_analysis
+        tokens (list | TokenSpans): รายการคำ หรือขอบคำบน processed_text (analyze_text(spans=True))
+        statistics (TextStatistics): สถิติแบบ lazy
+    """
+
+    __slots__ = ('timestamp', 'original_text', '_processed_text', 'engine_used', 'tokens',
+                 'statistics', 'pos_analysis')
+
+    def __init__(self, timestamp, original_text, processed_text, engine_used, tokens,
+                 statistics, pos_analysis=None):
+        self.timestamp = timestamp
+        self.original_text = original_text
+        # ไม่เก็บสำเนาซ้ำถ้าข้อความไม่เปลี่ยนหลัง preprocess
+        self._processed_text = None if processed_text == original_text else processed_text
+        self.engine_used = engine_used
+        self.tokens = tokens
+        self.statistics = statistics
+        self.pos_analysis = pos_analysis
+
+    @property
+    def processed_text(self):
+        return self.original_text if self._processed_text is None else self._processed_text
+
+    def __getitem__(self, key):
+        if key not in RESULT_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(RESULT_FIELDS)
+
+    def __len__(self):
+        return len(RESULT_FIELDS)
+
+    def to_dict(self, fields=None):
+        """dict รูปแบบเดียวกับผลของ analyze_single_text (fields ดู TextStatistics.to_dict)"""
+        result = {field: getattr(self, field) for field in RESULT_FIELDS}
+        result['statistics'] = self.statistics.to_dict(fields)
+        if isinstance(self.tokens, TokenSpans):
+            result['tokens'] = self.tokens.to_list()
+        return result
+
+    def __repr__(self):
+        return (f"AnalysisResult(engine_used={self.engine_used!r}, word_count={self.statistics.word_count}, "
+                f"text={self.original_text[:30]!r})")
+
+
+def to_serializable(value):
+    """ใช้เป็น default ของ json.dump สำหรับ AnalysisResult/TextStatistics"""
+    if isinstance(value, (AnalysisResult, TextStatistics)):
+        return value.to_dict()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# ตัวอย่างการใช้งาน
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    from project_thai_text_analyzer import ThaiTextAnalysisSystem
+
+    analyzer = ThaiTextAnalysisSystem()
+    texts = ["นักเรียนไปโรงเรียนเพื่อเรียนหนังสือทุกวัน",
+             "การประมวลผลภาษาธรรมชาติเป็นสาขาที่น่าสนใจและมีประโยชน์"] * 2000
+
+    result = analyzer.analyze_text(texts[0], fields=['word_count', 'content_ratio'])
+    print(result, result.statistics.to_dict())
+    print("dict เดิมตรงกัน:",
+          analyzer.analyze_text(texts[0]).to_dict()['statistics']
+          == analyzer.analyze_single_text(texts[0], record_history=False)['statistics'])
+
+    for label, analyze in [
+        ("dict", lambda text: analyzer.analyze_single_text(text, record_history=False)['statistics']['word_count']),
+        ("AnalysisResult", lambda text: analyzer.analyze_text(text, record_history=False).statistics.word_count),
+    ]:
+        start_time = time.perf_counter()
+        for text in texts:
+            analyze(text)
+        print(f"{label}: {time.perf_counter() - start_time:.2f}s")
+
+    tracemalloc.start()
+    dicts = [analyzer.analyze_single_text(text, record_history=False) for text in texts[:500]]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    del dicts
+    tracemalloc.stop()
+    tracemalloc.start()
+    objects = [analyzer.analyze_text(text, record_history=False) for text in texts[:500]]
+    object_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"หน่วยความจำ 500 ผล: dict {dict_bytes / 1024:.0f} KB, AnalysisResult {object_bytes / 1024:.0f} KB")
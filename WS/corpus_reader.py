@@ -0,0 +1,193 @@
+# เครื่องมือ: อ่านคลังข้อความขนาดใหญ่ด้วย mmap และแบ่ง shard สำหรับฝึกแบบขนาน
+
+"""
+อ่านคลังข้อความ UTF-8 ขนาดใหญ่โดยไม่ต้องโหลดทั้งไฟล์เป็น str
+
+- map ไฟล์เข้าหน่วยความจำด้วย mmap (ระบบปฏิบัติการโหลดเฉพาะหน้าที่อ่าน)
+- แบ่งไฟล์เป็น shard ที่ขอบบรรทัด (byte offset หลัง b'\\n') จึงไม่ตัดกลางตัวอักษร UTF-8
+- decode ทีละบรรทัดเมื่ออ่าน shard เท่านั้น
+- แต่ละ worker นับความถี่คำและ bigram ของ shard ตัวเองแล้วส่งเฉพาะผลนับกลับมา
+  หน่วยความจำจึงขึ้นกับขนาดคำศัพท์ ไม่ใช่ขนาดคลังข้อความ
+
+หมายเหตุ: bigram นับภายในบรรทัดเดียวกันเท่านั้น
+"""
+
+import mmap
+import os
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_SHARD_BYTES = 64 * 1024 * 1024
+
+
+class MmapCorpus:
+    """
+    คลังข้อความที่ map เข้าหน่วยความจำ
+
+    Args:
+        path (str): ไฟล์ข้อความ UTF-8
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._file = open(path, 'rb')
+        # mmap ไฟล์ว่างไม่ได้
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def shards(self, num_shards=None, shard_bytes=DEFAULT_SHARD_BYTES):
+        """
+        แบ่งไฟล์เป็นช่วง byte ที่เริ่มต้นหลังขึ้นบรรทัดใหม่เสมอ
+
+        Args:
+            num_shards (int): จำนวน shard (ถ้ากำหนดจะใช้แทน shard_bytes)
+            shard_bytes (int): ขนาดโดยประมาณของแต่ละ shard
+
+        Returns:
+            list: (start, end) ของแต่ละ shard
+        """
+        if not self.size:
+            return []
+        if num_shards:
+            shard_bytes = max(1, -(-self.size // num_shards))
+
+        bounds = []
+        start = 0
+        while start < self.size:
+            end = start + shard_bytes
+            if end >= self.size:
+                end = self.size
+            else:
+                newline = self._mmap.find(b'\n', end - 1)
+                end = self.size if newline == -1 else newline + 1
+            bounds.append((start, end))
+            start = end
+        return bounds
+
+    def iter_lines(self, start=0, end=None):
+        """decode และคืนทีละบรรทัด (ไม่รวม \\n) ในช่วง byte ที่กำหนด"""
+        if self._mmap is None:
+            return
+        end = self.size if end is None else end
+        buffer = self._mmap
+        position = start
+        while position < end:
+            newline = buffer.find(b'\n', position, end)
+            line_end = end if newline == -1 else newline
+            yield buffer[position:line_end].decode('utf-8', errors='replace').rstrip('\r')
+            position = line_end + 1
+
+
+def count_line(line, word_counts, bigram_counts, delimiter=' '):
+    """นับคำและ bigram ของหนึ่งบรรทัด (กฎเดียวกับ CustomWordSegmenter.train_from_text ซึ่งนับทีละบรรทัดเช่นกัน)"""
+    words = [word.strip().lower() for word in line.split(delimiter)]
+    for word in words:
+        if word:
+            word_counts[word] += 1
+    for word1, word2 in zip(words, words[1:]):
+        if word1 and word2:
+            bigram_counts[(word1, word2)] += 1
+
+
+def count_shard(path, start, end, delimiter=' '):
+    """
+    นับความถี่คำและ bigram ของ shard หนึ่ง (ใช้เป็นงานของ worker process)
+
+    Returns:
+        tuple: (Counter ของคำ, Counter ของ bigram)
+    """
+    word_counts = Counter()
+    bigram_counts = Counter()
+    with MmapCorpus(path) as corpus:
+        for line in corpus.iter_lines(start, end):
+            count_line(line, word_counts, bigram_counts, delimiter)
+    return word_counts, bigram_counts
+
+
+def iter_shard_counts(path, workers=None, shard_bytes=DEFAULT_SHARD_BYTES, delimiter=' '):
+    """
+    นับความถี่ของทุก shard แบบขนาน คืนผลของแต่ละ shard เมื่อเสร็จ
+
+    Args:
+        path (str): ไฟล์คลังข้อความ
+        workers (int): จำนวน worker process (None = จำนวน CPU, 1 = ไม่ขนาน)
+        shard_bytes (int): ขนาดโดยประมาณของแต่ละ shard
+        delimiter (str): ตัวคั่นคำ
+
+    Yields:
+        tuple: (Counter ของคำ, Counter ของ bigram) ของแต่ละ shard
+    """
+    with MmapCorpus(path) as corpus:
+        bounds = corpus.shards(shard_bytes=shard_bytes)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(bounds) <= 1:
+        for start, end in bounds:
+            yield count_shard(path, start, end, delimiter)
+        return
+
+    # จำกัดจำนวน shard ที่ค้างอยู่ ผลนับที่รอ merge จึงไม่สะสมเกิน 2 เท่าของจำนวน worker
+    workers = min(workers, len(bounds))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for start, end in bounds:
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+            pending.append(executor.submit(count_shard, path, start, end, delimiter))
+        while pending:
+            yield pending.popleft().result()
+
+
+def train_segmenter_from_file(segmenter, path, workers=None, shard_bytes=DEFAULT_SHARD_BYTES, delimiter=' '):
+    """
+    ฝึก CustomWordSegmenter จากไฟล์ขนาดใหญ่แบบขนาน แล้ว compile ครั้งเดียวเมื่อเสร็จ
+
+    Returns:
+        dict: จำนวน shard, จำนวนคำ และจำนวน bigram ที่นับได้
+    """
+    shards = 0
+    total_words = 0
+    total_bigrams = 0
+    with segmenter.batch_update():
+        for word_counts, bigram_counts in iter_shard_counts(path, workers, shard_bytes, delimiter):
+            segmenter.merge_counts(word_counts, bigram_counts)
+            shards += 1
+            total_words += sum(word_counts.values())
+            total_bigrams += sum(bigram_counts.values())
+    return {'shards': shards, 'words': total_words, 'bigrams': total_bigrams}
+
+
+# ตัวอย่างการใช้งาน
+if __name__ == "__main__":
+    import random
+    import tempfile
+    import time
+
+    from example_03_custom_segmenter import CustomWordSegmenter
+
+    rng = random.Random(0)
+    vocabulary = ["การ", "เรียน", "ภาษา", "ไทย", "python", "machine", "learning", "ข้อมูล", "ระบบ"]
+    path = os.path.join(tempfile.mkdtemp(), 'corpus.txt')
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(200_000):
+            f.write(' '.join(rng.choice(vocabulary) for _ in range(rng.randint(3, 12))) + '\n')
+
+    segmenter = CustomWordSegmenter()
+    start_time = time.perf_counter()
+    report = train_segmenter_from_file(segmenter, path, shard_bytes=4 * 1024 * 1024)
+    elapsed = time.perf_counter() - start_time
+    print(f"{os.path.getsize(path) / 1e6:.1f} MB: {report} ใน {elapsed:.2f}s")
+    print("คำที่พบบ่อย:", Counter(segmenter.word_frequencies).most_common(3))
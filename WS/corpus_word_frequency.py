@@ -0,0 +1,276 @@
+# เครื่องมือ: รายงานความถี่ของคำจากคลังข้อความขนาดใหญ่ (Out-of-core)
+
+"""
+รายงานความถี่ของคำแบบใช้หน่วยความจำคงที่
+
+แนวคิด:
+- อ่านข้อความจากไฟล์ทีละบรรทัด (ไม่โหลดทั้งคลังเข้าหน่วยความจำ)
+- นับคำในตาราง dict ที่มีขนาดจำกัด เมื่อเต็มจะเรียงลำดับแล้วเขียนลงดิสก์
+  เป็น "sorted run" แล้วเริ่มตารางใหม่
+- รวม run ทั้งหมดแบบ external merge (heapq.merge) ซึ่งอ่านทีละบรรทัด
+  คำเดียวกันจะอยู่ติดกันจึงรวมความถี่ได้ทันที
+- หา top_words ด้วย heap ขนาด k และเขียน frequent_words ลงไฟล์ได้โดยตรง
+
+ผลลัพธ์มีรูปแบบเดียวกับ create_word_frequency_report ในแบบฝึกหัดที่ 2.5
+"""
+
+import heapq
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from itertools import groupby
+from operator import itemgetter
+
+
+class SpillingCounter:
+    """
+    ตัวนับความถี่ที่เขียนข้อมูลลงดิสก์เมื่อจำนวนคำในหน่วยความจำเกินกำหนด
+
+    Args:
+        max_entries (int): จำนวนคำไม่ซ้ำสูงสุดในหน่วยความจำก่อนเขียนลงดิสก์
+        tmp_dir (str): โฟลเดอร์สำหรับไฟล์ run ชั่วคราว
+        merge_fan_in (int): จำนวนไฟล์ run สูงสุดที่เปิดพร้อมกันตอน merge
+    """
+
+    def __init__(self, max_entries=500_000, tmp_dir=None, merge_fan_in=64):
+        self.max_entries = max_entries
+        self.tmp_dir = tmp_dir
+        self.merge_fan_in = max(2, merge_fan_in)
+        self.table = {}
+        self.runs = []
+        self.total = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def update(self, words):
+        """นับคำจาก iterable ของคำ"""
+        table = self.table
+        for word in words:
+            table[word] = table.get(word, 0) + 1
+            self.total += 1
+            if len(table) >= self.max_entries:
+                self.spill()
+                table = self.table
+
+    def spill(self):
+        """เรียงลำดับตารางปัจจุบันแล้วเขียนลงดิสก์เป็น sorted run"""
+        if not self.table:
+            return
+        self._write_run(sorted(self.table.items()))
+        self.table = {}
+        if len(self.runs) >= self.merge_fan_in:
+            self._compact_runs()
+
+    def iter_sorted_counts(self):
+        """
+        คืน (คำ, ความถี่) เรียงตามคำ โดยรวม run บนดิสก์กับตารางในหน่วยความจำ
+
+        ใช้หน่วยความจำเท่ากับจำนวน run (หนึ่งบรรทัดต่อ run) ไม่ขึ้นกับขนาดคลัง
+        """
+        sources = [self._read_run(path) for path in self.runs]
+        sources.append(iter(sorted(self.table.items())))
+        merged = heapq.merge(*sources, key=itemgetter(0))
+        for word, group in groupby(merged, key=itemgetter(0)):
+            yield word, sum(count for _, count in group)
+
+    def most_common(self, k):
+        """หาคำที่มีความถี่สูงสุด k คำด้วย heap ขนาด k"""
+        return heapq.nlargest(k, self.iter_sorted_counts(), key=itemgetter(1))
+
+    def close(self):
+        """ลบไฟล์ run ชั่วคราวทั้งหมด"""
+        for path in self.runs:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.runs = []
+        self.table = {}
+
+    def _write_run(self, items):
+        fd, path = tempfile.mkstemp(prefix='wordfreq_run_', suffix='.jsonl', dir=self.tmp_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for word, count in items:
+                f.write(json.dumps([word, count], ensure_ascii=False))
+                f.write('\n')
+        self.runs.append(path)
+
+    def _read_run(self, path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                word, count = json.loads(line)
+                yield word, count
+
+    def _compact_runs(self):
+        """รวม run ทั้งหมดเป็น run เดียว เพื่อจำกัดจำนวนไฟล์ที่เปิดพร้อมกัน"""
+        old_runs = self.runs
+        sources = [self._read_run(path) for path in old_runs]
+        merged = heapq.merge(*sources, key=itemgetter(0))
+        self.runs = []
+        self._write_run(
+            (word, sum(count for _, count in group))
+            for word, group in groupby(merged, key=itemgetter(0))
+        )
+        for path in old_runs:
+            os.remove(path)
+
+
+def iter_texts_from_files(paths, encoding='utf-8'):
+    """
+    อ่านข้อความจากไฟล์ทีละบรรทัด (ข้ามบรรทัดว่าง)
+
+    Args:
+        paths (list): รายการพาธของไฟล์ข้อความ
+    """
+    for path in paths:
+        with open(path, encoding=encoding) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+
+def create_corpus_word_frequency_report(texts, min_frequency=2, top_k=10,
+                                        max_entries=500_000, tmp_dir=None,
+                                        tokenizer=None, stopwords=None,
+                                        frequent_words_path=None, dedup=None,
+                                        dedup_options=None, dedup_cache_size=10_000):
+    """
+    สร้างรายงานความถี่ของคำจากข้อความจำนวนมากโดยใช้หน่วยความจำคงที่
+
+    Args:
+        texts (iterable): ข้อความ (เช่นจาก iter_texts_from_files)
+        min_frequency (int): ความถี่ขั้นต่ำของ frequent_words
+        top_k (int): จำนวนคำใน top_words
+        max_entries (int): จำนวนคำไม่ซ้ำสูงสุดในหน่วยความจำก่อนเขียนลงดิสก์
+        tmp_dir (str): โฟลเดอร์สำหรับไฟล์ชั่วคราว
+        tokenizer (callable): ฟังก์ชันแยกคำ (ค่าเริ่มต้นคือ word_tokenize engine='newmm')
+        stopwords (set): stopwords ที่ต้องกรองออก (ค่าเริ่มต้นคือ thai_stopwords())
+        frequent_words_path (str): ถ้ากำหนด จะเขียน frequent_words ลงไฟล์ TSV
+            แทนการเก็บเป็น dict (เหมาะกับคลังขนาดใหญ่มาก)
+        dedup (str): ตัดข้อความซ้ำ/เกือบซ้ำแบบ streaming (ดู dedup)
+            'collapsed' = ข้ามข้อความซ้ำ
+            'weighted' = นับคำของตัวแทนอีกครั้งสำหรับข้อความซ้ำแต่ละข้อความ
+        dedup_options (dict): พารามิเตอร์ของ NearDuplicateIndex
+            max_items มีค่าเริ่มต้นเป็น max_entries เพื่อให้หน่วยความจำคงที่ (ข้อความซ้ำที่ห่างกัน
+            เกินจำนวนตัวแทนนี้จะนับเป็นข้อความใหม่) กำหนด None เองถ้ายอมให้ดัชนีโตตามคลัง
+        dedup_cache_size (int): จำนวนผลแยกคำของตัวแทนที่เก็บไว้ในโหมด 'weighted'
+            (ถ้าหลุดจากแคช จะแยกคำข้อความซ้ำนั้นใหม่)
+
+    Returns:
+        dict: total_words, unique_words, frequent_words (หรือ frequent_words_path), top_words
+    """
+    if tokenizer is None:
+        from pythainlp.tokenize import word_tokenize
+
+        def tokenizer(text):
+            return word_tokenize(text, engine='newmm')
+    if stopwords is None:
+        from pythainlp.corpus import thai_stopwords
+        stopwords = thai_stopwords()
+
+    def content_words(text):
+        # กรองเฉพาะคำสำคัญ (ไม่รวม stopwords) แบบเดียวกับแบบฝึกหัด 2.5
+        return [token for token in tokenizer(text) if token not in stopwords and len(token) > 1]
+
+    index = None
+    if dedup is not None:
+        from dedup import MODES, NearDuplicateIndex
+
+        if dedup not in MODES:
+            raise ValueError(f"Unknown dedup mode: {dedup}")
+        index = NearDuplicateIndex(**{'max_items': max_entries, **(dedup_options or {})})
+        cache = OrderedDict()
+
+    with SpillingCounter(max_entries=max_entries, tmp_dir=tmp_dir) as counter:
+        for text in texts:
+            if index is None:
+                counter.update(content_words(text))
+                continue
+
+            item_id, representative = index.add(text)
+            if item_id != representative and dedup == 'collapsed':
+                continue
+            words = cache.get(representative)
+            if words is None:
+                words = content_words(text)
+                if dedup == 'weighted':
+                    cache[representative] = words
+                    if len(cache) > dedup_cache_size:
+                        cache.popitem(last=False)
+            else:
+                cache.move_to_end(representative)
+            counter.update(words)
+        counter.spill()
+
+        unique_words = 0
+        frequent_count = 0
+        frequent_words = {} if frequent_words_path is None else None
+        top_heap = []
+        out = open(frequent_words_path, 'w', encoding='utf-8') if frequent_words_path else None
+        try:
+            # ผ่านข้อมูลที่ merge แล้วรอบเดียว: นับคำไม่ซ้ำ, กรองคำที่พบบ่อย และหา top-k
+            for word, freq in counter.iter_sorted_counts():
+                unique_words += 1
+                if freq >= min_frequency:
+                    frequent_count += 1
+                    if out is not None:
+                        out.write(f"{word}\t{freq}\n")
+                    else:
+                        frequent_words[word] = freq
+                if len(top_heap) < top_k:
+                    heapq.heappush(top_heap, (freq, word))
+                elif top_k and freq > top_heap[0][0]:
+                    heapq.heapreplace(top_heap, (freq, word))
+        finally:
+            if out is not None:
+                out.close()
+
+        report = {
+            'total_words': counter.total,
+            'unique_words': unique_words,
+            'top_words': [(word, freq) for freq, word in sorted(top_heap, key=lambda item: (-item[0], item[1]))],
+        }
+
+    if index is not None:
+        report['deduplication'] = {'mode': dedup, **index.stats()}
+    if frequent_words_path is None:
+        report['frequent_words'] = frequent_words
+    else:
+        report['frequent_words_path'] = frequent_words_path
+        report['frequent_word_count'] = frequent_count
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="รายงานความถี่ของคำจากไฟล์ข้อความขนาดใหญ่")
+    parser.add_argument('files', nargs='+', help="ไฟล์ข้อความ (หนึ่งข้อความต่อบรรทัด)")
+    parser.add_argument('--min-frequency', type=int, default=2)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--max-entries', type=int, default=500_000,
+                        help="จำนวนคำไม่ซ้ำสูงสุดในหน่วยความจำก่อนเขียนลงดิสก์")
+    parser.add_argument('--tmp-dir', default=None)
+    parser.add_argument('--frequent-words-out', default=None,
+                        help="เขียน frequent_words ลงไฟล์ TSV แทนการแสดงผล")
+    args = parser.parse_args()
+
+    report = create_corpus_word_frequency_report(
+        iter_texts_from_files(args.files),
+        min_frequency=args.min_frequency,
+        top_k=args.top_k,
+        max_entries=args.max_entries,
+        tmp_dir=args.tmp_dir,
+        frequent_words_path=args.frequent_words_out,
+    )
+    print(f"จำนวนคำทั้งหมด: {report['total_words']}")
+    print(f"จำนวนคำที่ไม่ซ้ำ: {report['unique_words']}")
+    print(f"คำที่พบบ่อย (top {args.top_k}): {report['top_words']}")
+    if args.frequent_words_out:
+        print(f"บันทึกคำที่พบบ่อย {report['frequent_word_count']} คำลงไฟล์ {args.frequent_words_out}")
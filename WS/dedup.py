@@ -0,0 +1,247 @@
+# เครื่องมือ: ตัดข้อความซ้ำและข้อความที่เกือบซ้ำก่อนวิเคราะห์แบบ batch
+
+"""
+ตัดข้อความซ้ำก่อนวิเคราะห์ แล้วกระจายผลกลับไปยังข้อความที่ซ้ำกัน
+
+- ซ้ำทุกตัวอักษร: hash (SHA-1) ของข้อความที่ normalize แล้ว
+  (ตัวพิมพ์เล็ก, ยุบช่องว่างที่ติดกัน, ตัดช่องว่างหัวท้าย)
+- เกือบซ้ำ (เช่นโพสต์ซ้ำ หรือข้อความสำเร็จรูปที่เปลี่ยนแค่วันที่):
+  MinHash ของ shingle ระดับตัวอักษร + LSH แบ่ง signature เป็น band
+  ข้อความที่ตรงกันอย่างน้อยหนึ่ง band เป็นคู่ที่ต้องตรวจ แล้วยืนยันด้วยความคล้าย
+  (สัดส่วนค่าใน signature ที่ตรงกัน ซึ่งประมาณ Jaccard similarity) ตาม threshold
+
+ข้อความแรกของแต่ละกลุ่มเป็นตัวแทน (representative) เฉพาะตัวแทนเท่านั้นที่ถูกใส่ใน LSH
+ข้อความถัดไปจึงถูกเทียบกับตัวแทนโดยตรง กลุ่มไม่ขยายเป็นลูกโซ่ และใช้แบบ streaming ได้
+กำหนด max_items เพื่อจำกัดหน่วยความจำ: เก็บเฉพาะตัวแทนที่ถูกใช้ล่าสุด (LRU)
+ข้อความที่ซ้ำกับตัวแทนที่ถูกลบไปแล้วจะกลายเป็นตัวแทนใหม่
+
+โหมดการนับผลของข้อความซ้ำ:
+- 'weighted': นับผลของตัวแทนซ้ำตามจำนวนข้อความในกลุ่ม (ผลรวมเท่ากับไม่ตัดซ้ำ)
+- 'collapsed': นับแต่ละกลุ่มครั้งเดียว
+"""
+
+import hashlib
+import re
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+MODES = ('weighted', 'collapsed')
+
+_WHITESPACE = re.compile(r'\s+')
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def normalize_text(text):
+    """normalize ข้อความสำหรับตรวจการซ้ำทุกตัวอักษร"""
+    return _WHITESPACE.sub(' ', text).strip().lower()
+
+
+def exact_key(text):
+    """key ของข้อความซ้ำทุกตัวอักษร"""
+    return hashlib.sha1(normalize_text(text).encode('utf-8')).digest()
+
+
+class NearDuplicateIndex:
+    """
+    ดัชนีสำหรับหาข้อความซ้ำ/เกือบซ้ำแบบ streaming
+
+    Args:
+        threshold (float): ความคล้าย (Jaccard โดยประมาณ) ขั้นต่ำที่นับว่าเกือบซ้ำ
+        num_perm (int): ขนาด signature ของ MinHash
+        bands (int): จำนวน band ของ LSH (num_perm ต้องหารด้วย bands ลงตัว)
+        shingle_size (int): ความยาว shingle (ตัวอักษร)
+        near_duplicates (bool): False = ตรวจเฉพาะข้อความซ้ำทุกตัวอักษร
+        seed (int): seed ของฟังก์ชัน hash
+        max_items (int): จำนวนตัวแทนสูงสุดที่เก็บไว้ (None = ไม่จำกัด)
+    """
+
+    def __init__(self, threshold=0.8, num_perm=64, bands=16, shingle_size=5,
+                 near_duplicates=True, seed=1, max_items=None):
+        if num_perm % bands:
+            raise ValueError("num_perm ต้องหารด้วย bands ลงตัว")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.near_duplicates = near_duplicates
+        self.max_items = max_items
+
+        rng = np.random.default_rng(seed)
+        self._seeds = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        # ตัวคูณต้องเป็นเลขคี่
+        self._multipliers = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64) * 2 + 1
+
+        self.size = 0
+        self.exact_duplicates = 0
+        self.near_duplicate_count = 0
+        self.evicted = 0
+        self._exact = {}
+        self._signatures = {}
+        self._buckets = {}
+        # id ของตัวแทน -> exact key ที่ชี้มาที่ตัวแทนนี้ (เรียงจากใช้ล่าสุดนานที่สุด)
+        self._representatives = OrderedDict()
+
+    def signature(self, text):
+        """MinHash signature ของ shingle ระดับตัวอักษร"""
+        text = normalize_text(text)
+        k = self.shingle_size
+        if len(text) <= k:
+            shingles = {text}
+        else:
+            shingles = {text[i:i + k] for i in range(len(text) - k + 1)}
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        # hash ต่อ permutation: (h xor seed) * ตัวคูณเลขคี่ (mod 2^64) แล้วใช้ 32 บิตบน
+        mixed = ((hashes[:, None] * _MIX) ^ self._seeds) * self._multipliers
+        return (mixed >> np.uint64(32)).min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [(band, signature[band * rows:(band + 1) * rows].tobytes())
+                for band in range(self.bands)]
+
+    def add(self, text):
+        """
+        เพิ่มข้อความ
+
+        Returns:
+            tuple: (id ของข้อความนี้, id ของตัวแทน) ถ้าไม่ซ้ำ id ทั้งสองเท่ากัน
+        """
+        item_id = self.size
+        self.size += 1
+
+        key = exact_key(text)
+        representative = self._exact.get(key)
+        if representative is not None:
+            self.exact_duplicates += 1
+            self._representatives.move_to_end(representative)
+            return item_id, representative
+        self._exact[key] = item_id
+
+        if self.near_duplicates:
+            signature = self.signature(text)
+            band_keys = self._band_keys(signature)
+            candidates = set()
+            for band_key in band_keys:
+                candidates.update(self._buckets.get(band_key, ()))
+            for candidate in sorted(candidates):
+                if np.mean(self._signatures[candidate] == signature) >= self.threshold:
+                    self.near_duplicate_count += 1
+                    # ข้อความซ้ำทุกตัวอักษรของข้อความนี้ไปที่ตัวแทนเดียวกัน
+                    self._exact[key] = candidate
+                    self._representatives[candidate].append(key)
+                    self._representatives.move_to_end(candidate)
+                    return item_id, candidate
+            self._signatures[item_id] = signature
+            for band_key in band_keys:
+                self._buckets.setdefault(band_key, []).append(item_id)
+
+        self._representatives[item_id] = [key]
+        if self.max_items is not None and len(self._representatives) > self.max_items:
+            self._evict()
+        return item_id, item_id
+
+    def _evict(self):
+        """ลบตัวแทนที่ถูกใช้ล่าสุดนานที่สุดออกจากทุกดัชนี"""
+        representative, keys = self._representatives.popitem(last=False)
+        self.evicted += 1
+        for key in keys:
+            if self._exact.get(key) == representative:
+                del self._exact[key]
+        signature = self._signatures.pop(representative, None)
+        if signature is not None:
+            for band_key in self._band_keys(signature):
+                bucket = self._buckets[band_key]
+                bucket.remove(representative)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def stats(self):
+        return {
+            'texts': self.size,
+            'unique': self.size - self.exact_duplicates - self.near_duplicate_count,
+            'exact_duplicates': self.exact_duplicates,
+            'near_duplicates': self.near_duplicate_count,
+            'evicted': self.evicted,
+        }
+
+
+class DedupResult:
+    """
+    ผลการตัดซ้ำของ batch
+
+    Attributes:
+        representatives (list): index ของข้อความที่ต้องวิเคราะห์ (ตามลำดับเดิม)
+        assignment (list): index ของตัวแทนของข้อความแต่ละข้อความ
+        counts (dict): {index ของตัวแทน: จำนวนข้อความในกลุ่ม}
+        stats (dict): จำนวนข้อความ, ข้อความไม่ซ้ำ, ซ้ำทุกตัวอักษร, เกือบซ้ำ
+    """
+
+    __slots__ = ('representatives', 'assignment', 'counts', 'stats')
+
+    def __init__(self, representatives, assignment, counts, stats):
+        self.representatives = representatives
+        self.assignment = assignment
+        self.counts = counts
+        self.stats = stats
+
+    def weight(self, representative, mode='weighted'):
+        """น้ำหนักของผลตัวแทนเมื่อรวมสถิติ"""
+        if mode not in MODES:
+            raise ValueError(f"Unknown dedup mode: {mode}")
+        return self.counts[representative] if mode == 'weighted' else 1
+
+    def fan_out(self, results):
+        """
+        กระจายผลของตัวแทน (ลำดับเดียวกับ representatives) กลับเป็นผลของทุกข้อความ
+        """
+        by_representative = dict(zip(self.representatives, results))
+        return [by_representative[representative] for representative in self.assignment]
+
+
+def deduplicate(texts, **index_options):
+    """
+    หาตัวแทนของข้อความซ้ำ/เกือบซ้ำใน batch
+
+    Args:
+        texts (list): ข้อความ
+        **index_options: พารามิเตอร์ของ NearDuplicateIndex (threshold, num_perm, ...)
+
+    Returns:
+        DedupResult
+    """
+    index = NearDuplicateIndex(**index_options)
+    representatives = []
+    assignment = []
+    counts = {}
+    for position, text in enumerate(texts):
+        _, representative = index.add(text)
+        if representative == position:
+            representatives.append(position)
+        assignment.append(representative)
+        counts[representative] = counts.get(representative, 0) + 1
+    stats = {
+        'texts': len(assignment),
+        'unique': len(representatives),
+        'duplicates': len(assignment) - len(representatives),
+    }
+    return DedupResult(representatives, assignment, counts, {**stats, **index.stats()})
+
+
+# ตัวอย่างการใช้งาน
+if __name__ == "__main__":
+    texts = [
+        "ประกาศ: ปิดปรับปรุงระบบวันที่ 12 มกราคม 2568 เวลา 22:00 น. ขออภัยในความไม่สะดวก",
+        "ประกาศ: ปิดปรับปรุงระบบวันที่ 19 มกราคม 2568 เวลา 22:00 น. ขออภัยในความไม่สะดวก",
+        "วันนี้อากาศดีมาก",
+        "วันนี้อากาศดีมาก ",
+        "ฉันชอบกินข้าวผัดและส้มตำมากที่สุด",
+        "  วันนี้อากาศ  ดีมาก",
+    ]
+    result = deduplicate(texts)
+    print("ตัวแทน:", result.representatives)
+    print("กลุ่ม:", result.assignment)
+    print("สถิติ:", result.stats)
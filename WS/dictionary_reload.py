@@ -0,0 +1,184 @@
+# เครื่องมือ: โหลดพจนานุกรมใหม่อัตโนมัติเมื่อไฟล์เปลี่ยน (hot-reload)
+
+"""
+โหลดพจนานุกรมใหม่ระหว่างที่โปรเซสทำงานอยู่ โดยไม่ต้อง restart
+
+- FileDictionarySource: พจนานุกรมจากไฟล์ข้อความ (หนึ่งคำต่อบรรทัด, บรรทัดที่ขึ้นต้นด้วย # คือคอมเมนต์)
+- DictionaryWatcher: thread เบื้องหลังที่ตรวจ (poll) เวลาแก้ไขและขนาดไฟล์
+  เมื่อไฟล์เปลี่ยนจะอ่านคำใหม่แล้วเรียก on_reload(words) ใน thread เบื้องหลัง
+  ผู้ใช้ (เช่น CustomWordSegmenter หรือ ThaiTextAnalysisSystem) สร้างพจนานุกรมที่ compile แล้ว
+  และสลับแทนตัวเดิมในคำสั่งเดียว งานที่กำลังแยกคำอยู่จึงไม่ต้องหยุดรอ
+- บันทึกเวลาที่ใช้ในการ reload และเวอร์ชันของพจนานุกรมไว้ใน last_reload
+
+แนะนำให้อัปเดตไฟล์ด้วยการเขียนไฟล์ชั่วคราวแล้ว rename ทับ (atomic)
+ถ้าไฟล์เปลี่ยนระหว่างอ่าน จะข้ามรอบนั้นแล้วอ่านใหม่ในรอบถัดไป
+"""
+
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime
+
+
+class FileDictionarySource:
+    """
+    พจนานุกรมจากไฟล์ข้อความ
+
+    Args:
+        path (str): ไฟล์พจนานุกรม (UTF-8 หนึ่งคำต่อบรรทัด)
+        encoding (str): encoding ของไฟล์
+    """
+
+    def __init__(self, path, encoding='utf-8'):
+        self.path = path
+        self.encoding = encoding
+
+    def fingerprint(self):
+        """(inode, mtime, ขนาด) ของไฟล์ ใช้ตรวจว่าไฟล์เปลี่ยนหรือไม่ (None ถ้าไม่มีไฟล์)"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """อ่านคำทั้งหมดจากไฟล์"""
+        words = []
+        with open(self.path, encoding=self.encoding) as f:
+            for line in f:
+                word = line.strip()
+                if word and not word.startswith('#'):
+                    words.append(word)
+        return words
+
+    @staticmethod
+    def version(words):
+        """เวอร์ชันของชุดคำ (hash ของคำที่เรียงแล้ว)"""
+        digest = hashlib.sha1()
+        for word in sorted(set(words)):
+            digest.update(word.encode('utf-8') + b'\x00')
+        return digest.hexdigest()[:16]
+
+
+class DictionaryWatcher:
+    """
+    ตรวจไฟล์พจนานุกรมเป็นระยะและ reload เมื่อเปลี่ยน
+
+    Args:
+        source (FileDictionarySource): แหล่งพจนานุกรม
+        on_reload (callable): on_reload(words) สร้างและสลับพจนานุกรมใหม่
+            คืนเวอร์ชันของพจนานุกรมได้ (None = ใช้ hash ของชุดคำ)
+        interval (float): ระยะเวลาระหว่างการตรวจแต่ละครั้ง (วินาที)
+    """
+
+    def __init__(self, source, on_reload, interval=1.0):
+        self.source = source
+        self.on_reload = on_reload
+        self.interval = interval
+        self.last_reload = None
+        self.last_error = None
+        self.reload_count = 0
+        self._fingerprint = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self, load_now=True):
+        """เริ่ม thread เบื้องหลัง (load_now=True จะโหลดพจนานุกรมทันทีก่อนคืนค่า)"""
+        if load_now:
+            self.check_now()
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='dictionary-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.check_now()
+
+    def check_now(self):
+        """
+        ตรวจไฟล์และ reload ถ้าเปลี่ยน
+
+        Returns:
+            bool: reload หรือไม่
+        """
+        with self._lock:
+            fingerprint = self.source.fingerprint()
+            if fingerprint is None or fingerprint == self._fingerprint:
+                return False
+
+            start_time = time.perf_counter()
+            try:
+                words = self.source.load()
+                if self.source.fingerprint() != fingerprint:
+                    # ไฟล์ถูกเขียนระหว่างอ่าน รอรอบถัดไป
+                    return False
+                version = self.on_reload(words) or self.source.version(words)
+            except Exception as e:
+                # เก็บพจนานุกรมเดิมไว้ใช้ต่อ
+                self.last_error = {'error': str(e), 'at': datetime.now().isoformat()}
+                self._fingerprint = fingerprint
+                return False
+
+            self._fingerprint = fingerprint
+            self.reload_count += 1
+            self.last_error = None
+            self.last_reload = {
+                'version': version,
+                'word_count': len(words),
+                'duration_seconds': time.perf_counter() - start_time,
+                'reloaded_at': datetime.now().isoformat(),
+            }
+            return True
+
+    def stats(self):
+        return {
+            'path': self.source.path,
+            'reload_count': self.reload_count,
+            'last_reload': self.last_reload,
+            'last_error': self.last_error,
+        }
+
+
+def watch_dictionary_file(path, on_reload, interval=1.0):
+    """สร้าง DictionaryWatcher สำหรับไฟล์แล้วเริ่มทำงาน (โหลดครั้งแรกทันที)"""
+    return DictionaryWatcher(FileDictionarySource(path), on_reload, interval).start()
+
+
+# ตัวอย่างการใช้งาน
+if __name__ == "__main__":
+    import tempfile
+
+    from example_03_custom_segmenter import CustomWordSegmenter
+
+    segmenter = CustomWordSegmenter()
+    path = os.path.join(tempfile.mkdtemp(), 'words.txt')
+
+    def write_words(words):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(words) + '\n')
+        os.replace(tmp_path, path)
+
+    write_words(["hello", "world"])
+    with segmenter.watch_dictionary(path, interval=0.1) as watcher:
+        print("ก่อนอัปเดต:", segmenter.segment_text("helloworldpython"), watcher.last_reload)
+
+        write_words(["hello", "world", "python"])
+        time.sleep(0.5)
+        print("หลังอัปเดต:", segmenter.segment_text("helloworldpython"), watcher.last_reload)
@@ -1,43 +1,54 @@
 # ตัวอย่างโค้ด 3: การสร้าง Custom Word Segmenter
 
 import re
+import hashlib
+import threading
+from array import array
 from collections import defaultdict, Counter
+from contextlib import contextmanager
+from types import MappingProxyType
 
-class CustomWordSegmenter:
+class SegmenterSnapshot:
     """
-    Custom Word Segmenter ที่รวมหลายเทคนิค
+    Segmenter ที่ compile แล้ว (อ่านอย่างเดียว)
+
+    เก็บสำเนาของพจนานุกรมและสถิติ ณ เวลาที่ compile ไม่มีเมธอดใดแก้ไขข้อมูล
+    จึงใช้ร่วมกันหลาย thread ได้โดยไม่ต้องใช้ lock
     """
-    
-    def __init__(self):
-        self.dictionary = set()
-        self.word_frequencies = defaultdict(int)
-        self.bigram_frequencies = defaultdict(int)
-        
-    def add_words_to_dictionary(self, words):
-        """เพิ่มคำเข้าพจนานุกรม"""
-        if isinstance(words, str):
-            words = [words]
-        for word in words:
-            self.dictionary.add(word.lower())
-    
-    def train_from_text(self, text, delimiter=' '):
-        """ฝึกโมเดลจากข้อความที่แยกคำแล้ว"""
-        words = text.split(delimiter)
-        
-        # นับความถี่ของคำ
-        for word in words:
-            word = word.strip().lower()
-            if word:
-                self.word_frequencies[word] += 1
-                self.dictionary.add(word)
-        
-        # นับความถี่ของ bigram
-        for i in range(len(words) - 1):
-            word1 = words[i].strip().lower()
-            word2 = words[i + 1].strip().lower()
-            if word1 and word2:
-                self.bigram_frequencies[(word1, word2)] += 1
-    
+
+    __slots__ = ('dictionary', 'word_frequencies', 'bigram_frequencies', 'max_word_length', '_version',
+                 '_lattice_scorer')
+
+    def __init__(self, dictionary, word_frequencies, bigram_frequencies):
+        object.__setattr__(self, 'dictionary', frozenset(dictionary))
+        object.__setattr__(self, 'word_frequencies', MappingProxyType(dict(word_frequencies)))
+        object.__setattr__(self, 'bigram_frequencies', MappingProxyType(dict(bigram_frequencies)))
+        # ความยาวของคำที่ยาวที่สุด ใช้จำกัดช่วงค้นหาใน maximum matching
+        object.__setattr__(self, 'max_word_length', max(map(len, self.dictionary), default=1))
+        object.__setattr__(self, '_version', None)
+        object.__setattr__(self, '_lattice_scorer', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SegmenterSnapshot เป็นแบบอ่านอย่างเดียว")
+
+    @property
+    def version(self):
+        """
+        เวอร์ชันของพจนานุกรมและสถิติ (hash ของเนื้อหา)
+
+        ใช้เป็นส่วนหนึ่งของ key ในแคชผลการแยกคำ เมื่อพจนานุกรมเปลี่ยน เวอร์ชันจะเปลี่ยนตาม
+        """
+        if self._version is None:
+            digest = hashlib.sha1()
+            for word in sorted(self.dictionary):
+                digest.update(word.encode('utf-8') + b'\x00')
+            for word, freq in sorted(self.word_frequencies.items()):
+                digest.update(f"{word}\x01{freq}\x00".encode('utf-8'))
+            for (word1, word2), freq in sorted(self.bigram_frequencies.items()):
+                digest.update(f"{word1}\x02{word2}\x01{freq}\x00".encode('utf-8'))
+            object.__setattr__(self, '_version', digest.hexdigest()[:16])
+        return self._version
+
     def maximum_matching(self, text, direction='forward'):
         """
         Maximum Matching Algorithm
@@ -50,41 +61,52 @@ class CustomWordSegmenter:
             list: รายการคำที่แยกได้
         """
         text = text.lower().strip()
-        tokens = []
+        boundaries = self.matching_boundaries(text, direction)
+        return [text[boundaries[i]:boundaries[i + 1]] for i in range(len(boundaries) - 1)]
+    
+    def matching_boundaries(self, text, direction='forward'):
+        """
+        Maximum Matching ที่คืนขอบคำแทนรายการคำ
+
+        Args:
+            text (str): ข้อความที่ผ่าน lower().strip() แล้ว
+            direction (str): 'forward' หรือ 'backward'
+
+        Returns:
+            array('i'): ขอบคำ [0, ..., len(text)]
+        """
+        dictionary = self.dictionary
+        max_word_length = self.max_word_length
+        n = len(text)
         
         if direction == 'forward':
+            boundaries = array('i', [0])
             i = 0
-            while i < len(text):
-                max_word = ""
-                for j in range(i, len(text)):
-                    temp_word = text[i:j+1]
-                    if temp_word in self.dictionary and len(temp_word) > len(max_word):
-                        max_word = temp_word
-                
-                if max_word:
-                    tokens.append(max_word)
-                    i += len(max_word)
-                else:
-                    tokens.append(text[i])
-                    i += 1
-        
-        elif direction == 'backward':
-            i = len(text) - 1
-            while i >= 0:
-                max_word = ""
-                for j in range(i + 1):
-                    temp_word = text[j:i+1]
-                    if temp_word in self.dictionary and len(temp_word) > len(max_word):
-                        max_word = temp_word
-                
-                if max_word:
-                    tokens.insert(0, max_word)
-                    i -= len(max_word)
-                else:
-                    tokens.insert(0, text[i])
-                    i -= 1
+            while i < n:
+                # ลองจากสั้นไปยาว คำที่พบล่าสุดจึงยาวที่สุด (ไม่พบ = ตัวอักษรเดียว)
+                step = 1
+                for j in range(i + 1, min(n, i + max_word_length) + 1):
+                    if text[i:j] in dictionary:
+                        step = j - i
+                i += step
+                boundaries.append(i)
+            return boundaries
         
-        return tokens
+        boundaries = array('i')
+        if direction == 'backward':
+            boundaries.append(n)
+            i = n
+            while i > 0:
+                # ลองจากยาวไปสั้น คำแรกที่พบจึงยาวที่สุด
+                step = 1
+                for j in range(max(0, i - max_word_length), i):
+                    if text[j:i] in dictionary:
+                        step = i - j
+                        break
+                i -= step
+                boundaries.append(i)
+            boundaries.reverse()
+        return boundaries
     
     def bidirectional_matching(self, text):
         """
@@ -175,17 +197,70 @@ class CustomWordSegmenter:
         
         return score
     
-    def segment_text(self, text, method='bidirectional'):
+    def segment_spans(self, text, method='bidirectional', use_numpy=False):
+        """
+        แยกคำแล้วคืนผลเป็น TokenSpans บนข้อความที่ผ่าน lower().strip() แล้ว
+
+        forward/backward/bidirectional สร้างขอบคำระหว่างเดินข้อความ ส่วน statistical/viterbi
+        ใช้ตำแหน่งเริ่มคำจาก LatticeScorer จึงไม่สร้าง list ของคำเลย
+
+        Returns:
+            TokenSpans
+        """
+        from token_spans import TokenSpans
+
+        text = text.lower().strip()
+        if method in ('forward', 'backward'):
+            boundaries = self.matching_boundaries(text, method)
+        elif method == 'bidirectional':
+            forward = TokenSpans(text, self.matching_boundaries(text, 'forward'))
+            backward = TokenSpans(text, self.matching_boundaries(text, 'backward'))
+            # _calculate_score อ่านคำผ่าน TokenSpans ทีละคำ ได้คะแนนเดียวกับ bidirectional_matching
+            if self._calculate_score(forward) >= self._calculate_score(backward):
+                boundaries = forward.boundaries
+            else:
+                boundaries = backward.boundaries
+        elif method in ('statistical', 'viterbi'):
+            boundaries = self.lattice_scorer().segment_batch_spans([text], method)[0].boundaries
+        else:
+            raise ValueError(f"Unknown method: {method}")
+        return TokenSpans.from_boundaries(text, boundaries, use_numpy=use_numpy)
+
+    def lattice_scorer(self):
+        """ตารางคะแนนแบบ NumPy ของ snapshot นี้ (สร้างครั้งแรกที่เรียก ดู vectorized_scoring)"""
+        if self._lattice_scorer is None:
+            from vectorized_scoring import LatticeScorer
+
+            object.__setattr__(self, '_lattice_scorer', LatticeScorer(self))
+        return self._lattice_scorer
+
+    def segment_batch(self, texts, method='statistical', use_bigrams=True):
+        """
+        แยกคำหลายข้อความพร้อมกันด้วย NumPy ('statistical' ให้ผลเหมือน statistical_segmentation)
+
+        Args:
+            texts (list): ข้อความ
+            method (str): 'statistical' หรือ 'viterbi'
+        """
+        return self.lattice_scorer().segment_batch(texts, method, use_bigrams)
+
+    def segment_text(self, text, method='bidirectional', pretokenize=False):
         """
         แยกคำด้วยวิธีที่เลือก
         
         Args:
             text (str): ข้อความที่ต้องการแยกคำ
-            method (str): 'forward', 'backward', 'bidirectional', 'statistical'
+            method (str): 'forward', 'backward', 'bidirectional', 'statistical', 'viterbi'
+            pretokenize (bool): แบ่งช่วงตามชนิดอักษรก่อน แล้วส่งเฉพาะช่วงภาษาไทยให้ method
+                (คำอังกฤษ ตัวเลข URL และเครื่องหมายเป็นหนึ่งคำทันที ดู script_pretokenizer)
         
         Returns:
             list: รายการคำที่แยกได้
         """
+        if pretokenize:
+            from script_pretokenizer import tokenize
+
+            return tokenize(text.lower().strip(), lambda run: self.segment_text(run, method))
         if method == 'forward':
             return self.maximum_matching(text, 'forward')
         elif method == 'backward':
@@ -195,9 +270,250 @@ class CustomWordSegmenter:
             return result
         elif method == 'statistical':
             return self.statistical_segmentation(text)
+        elif method == 'viterbi':
+            return self.segment_batch([text], 'viterbi')[0]
         else:
             raise ValueError(f"Unknown method: {method}")
 
+
+class CustomWordSegmenter:
+    """
+    Custom Word Segmenter ที่รวมหลายเทคนิค
+
+    การแก้ไขพจนานุกรม/สถิติทำบนข้อมูลฝั่งเขียน แล้ว compile() เป็น SegmenterSnapshot
+    ใหม่และสลับแทน snapshot เดิมในคำสั่งเดียว (atomic) การแยกคำอ่านจาก snapshot
+    ปัจจุบันเท่านั้น จึงไม่ต้องรอ lock และงานที่กำลังทำอยู่จะใช้ snapshot เดิมจนจบ
+    (ถ้าแก้ dictionary/word_frequencies/bigram_frequencies โดยตรง ต้องเรียก compile() เอง)
+    """
+    
+    def __init__(self):
+        self.dictionary = set()
+        self.word_frequencies = defaultdict(int)
+        self.bigram_frequencies = defaultdict(int)
+        self._write_lock = threading.RLock()
+        self._batch_depth = 0
+        self._profiler = None
+        self._snapshot = SegmenterSnapshot((), {}, {})
+
+    @property
+    def snapshot(self):
+        """snapshot ปัจจุบัน (ใช้ตัวเดียวกันตลอดงานหนึ่งชิ้นเพื่อให้ผลสอดคล้องกัน)"""
+        return self._snapshot
+
+    def compile(self):
+        """สร้าง snapshot ใหม่จากข้อมูลฝั่งเขียนแล้วสลับแทนตัวเดิม"""
+        with self._write_lock:
+            snapshot = SegmenterSnapshot(self.dictionary, self.word_frequencies, self.bigram_frequencies)
+            if self._profiler is not None:
+                from segmenter_profiling import ProfilingSnapshot
+
+                snapshot = ProfilingSnapshot.wrap(snapshot, self._profiler)
+            self._snapshot = snapshot
+            return snapshot
+
+    def enable_profiling(self, profiler=None, use_cprofile=False):
+        """
+        เปิดโหมด profiling: นับการค้นพจนานุกรม candidate และเวลาแต่ละช่วง (ดู segmenter_profiling)
+
+        ตอนปิด segmenter ใช้ snapshot ปกติโดยตรง จึงไม่มี overhead
+
+        Args:
+            profiler (SegmenterProfiler): ตัวเก็บสถิติ (None = สร้างใหม่)
+            use_cprofile (bool): เก็บผล cProfile ด้วย (เมื่อสร้าง profiler ใหม่)
+
+        Returns:
+            SegmenterProfiler
+        """
+        from segmenter_profiling import ProfilingSnapshot, SegmenterProfiler
+
+        with self._write_lock:
+            self.disable_profiling()
+            self._profiler = profiler or SegmenterProfiler(use_cprofile=use_cprofile)
+            self._snapshot = ProfilingSnapshot.wrap(self._snapshot, self._profiler)
+            return self._profiler
+
+    def disable_profiling(self):
+        """ปิดโหมด profiling แล้วคืน profiler ที่ใช้อยู่ (None ถ้าไม่ได้เปิด)"""
+        with self._write_lock:
+            profiler = self._profiler
+            if profiler is not None:
+                self._profiler = None
+                self._snapshot = self._snapshot.base
+            return profiler
+
+    @contextmanager
+    def batch_update(self):
+        """รวมการแก้ไขหลายครั้งแล้ว compile ครั้งเดียวเมื่อจบ block"""
+        with self._write_lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.compile()
+
+    def _updated(self):
+        if self._batch_depth == 0:
+            self.compile()
+        
+    def add_words_to_dictionary(self, words):
+        """เพิ่มคำเข้าพจนานุกรม"""
+        if isinstance(words, str):
+            words = [words]
+        with self._write_lock:
+            for word in words:
+                self.dictionary.add(word.lower())
+            self._updated()
+    
+    def train_from_text(self, text, delimiter=' '):
+        """
+        ฝึกโมเดลจากข้อความที่แยกคำแล้ว
+
+        นับทีละบรรทัด (ไม่นับ bigram ข้ามบรรทัด) ผลจึงเหมือน train_from_file กับข้อความเดียวกัน
+        """
+        # ตัวคั่นที่มี \n เอง (เช่นหนึ่งคำต่อบรรทัด) ถือทั้งข้อความเป็นลำดับเดียว
+        lines = [text] if '\n' in delimiter else text.splitlines()
+        
+        with self._write_lock:
+            for line in lines:
+                words = [word.strip().lower() for word in line.split(delimiter)]
+                
+                # นับความถี่ของคำ
+                for word in words:
+                    if word:
+                        self.word_frequencies[word] += 1
+                        self.dictionary.add(word)
+                
+                # นับความถี่ของ bigram
+                for word1, word2 in zip(words, words[1:]):
+                    if word1 and word2:
+                        self.bigram_frequencies[(word1, word2)] += 1
+            self._updated()
+
+    def merge_counts(self, word_counts, bigram_counts):
+        """
+        รวมผลนับความถี่ที่นับมาจากที่อื่น (เช่นจาก worker ของ corpus_reader)
+
+        Args:
+            word_counts (dict): {คำ: ความถี่}
+            bigram_counts (dict): {(คำ1, คำ2): ความถี่}
+        """
+        with self._write_lock:
+            for word, count in word_counts.items():
+                self.word_frequencies[word] += count
+            self.dictionary.update(word_counts)
+            for bigram, count in bigram_counts.items():
+                self.bigram_frequencies[bigram] += count
+            self._updated()
+
+    def train_from_file(self, path, workers=None, delimiter=' '):
+        """
+        ฝึกโมเดลจากไฟล์ขนาดใหญ่ (หนึ่งประโยคต่อบรรทัด) ด้วย mmap และ worker หลายโปรเซส
+        โดยไม่โหลดทั้งไฟล์เป็น str (ดู corpus_reader)
+        """
+        from corpus_reader import train_segmenter_from_file
+
+        return train_segmenter_from_file(self, path, workers=workers, delimiter=delimiter)
+
+    def load_dictionary(self, words):
+        """
+        แทนพจนานุกรมด้วยชุดคำใหม่ (คำที่ได้จาก train_from_text ยังคงอยู่)
+        แล้ว compile และสลับ snapshot
+
+        Returns:
+            str: เวอร์ชันของ snapshot ใหม่
+        """
+        with self._write_lock:
+            self.dictionary = {word.lower() for word in words}
+            self.dictionary.update(self.word_frequencies)
+            if self._batch_depth:
+                return None
+            return self.compile().version
+
+    def watch_dictionary(self, path, interval=1.0):
+        """
+        โหลดพจนานุกรมจากไฟล์และโหลดใหม่อัตโนมัติเมื่อไฟล์เปลี่ยน (ดู dictionary_reload)
+
+        Returns:
+            DictionaryWatcher: ใช้ดู last_reload หรือเรียก stop()
+        """
+        from dictionary_reload import watch_dictionary_file
+
+        return watch_dictionary_file(path, self.load_dictionary, interval)
+
+    @property
+    def dictionary_version(self):
+        """เวอร์ชันของ snapshot ปัจจุบัน (ดู SegmenterSnapshot.version)"""
+        return self._snapshot.version
+    
+    def maximum_matching(self, text, direction='forward'):
+        return self._snapshot.maximum_matching(text, direction)
+    
+    def bidirectional_matching(self, text):
+        return self._snapshot.bidirectional_matching(text)
+    
+    def _calculate_score(self, tokens):
+        return self._snapshot._calculate_score(tokens)
+    
+    def statistical_segmentation(self, text, use_bigrams=True):
+        return self._snapshot.statistical_segmentation(text, use_bigrams)
+    
+    def segment_text(self, text, method='bidirectional', pretokenize=False):
+        """
+        แยกคำด้วยวิธีที่เลือก (ใช้ snapshot ปัจจุบัน)
+        
+        Args:
+            text (str): ข้อความที่ต้องการแยกคำ
+            method (str): 'forward', 'backward', 'bidirectional', 'statistical', 'viterbi'
+            pretokenize (bool): แยกช่วงที่ไม่ใช่ภาษาไทยก่อน (ดู SegmenterSnapshot.segment_text)
+        
+        Returns:
+            list: รายการคำที่แยกได้
+        """
+        return self._snapshot.segment_text(text, method, pretokenize)
+
+    def segment_batch(self, texts, method='statistical', use_bigrams=True):
+        """แยกคำหลายข้อความพร้อมกันด้วย NumPy (ดู SegmenterSnapshot.segment_batch)"""
+        return self._snapshot.segment_batch(texts, method, use_bigrams)
+
+    def segment_many(self, texts, method='bidirectional', cache=None, vectorized=False):
+        """
+        แยกคำหลายข้อความ โดยใช้แคชบนดิสก์ (SegmentationCache) ถ้ากำหนด
+
+        ทุกข้อความใช้ snapshot เดียวกัน เวอร์ชันใน key ของแคชจึงตรงกับผลเสมอ
+
+        Args:
+            texts (list): ข้อความ
+            method (str): วิธีการแยกคำ (ดู segment_text)
+            cache (SegmentationCache): แคชผลการแยกคำ
+            vectorized (bool): method 'statistical'/'viterbi' ที่ไม่ใช้แคช แยกทั้ง batch
+                พร้อมกันด้วย NumPy (segment_batch) แทนทีละข้อความ ('statistical' ให้ผลเหมือนกัน)
+
+        Returns:
+            list: รายการคำของแต่ละข้อความ
+        """
+        snapshot = self._snapshot
+        if cache is None:
+            if vectorized and method in ('statistical', 'viterbi'):
+                return snapshot.segment_batch(list(texts), method)
+            return [snapshot.segment_text(text, method) for text in texts]
+        return cache.tokenize_many(
+            texts,
+            lambda text: snapshot.segment_text(text, method),
+            engine=f'custom:{method}',
+            version=snapshot.version,
+        )
+
+    def segment_spans(self, text, method='bidirectional', use_numpy=False):
+        """
+        แยกคำแล้วคืนผลเป็น TokenSpans (ขอบคำบนข้อความที่ผ่าน lower().strip() แล้ว)
+
+        Returns:
+            TokenSpans: ผลการแยกคำที่สร้าง string ของคำเมื่อเรียกใช้เท่านั้น
+        """
+        return self._snapshot.segment_spans(text, method, use_numpy)
+
 # ตัวอย่างการใช้งาน
 if __name__ == "__main__":
     # สร้าง segmenter
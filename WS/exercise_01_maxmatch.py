@@ -132,9 +132,22 @@ def improved_maximum_matching(text, dictionary, handle_unknown=True):
     tokens = []
     i = 0
     
+    if handle_unknown:
+        from script_pretokenizer import char_classes, run_end
+        
+        # ชนิดอักษรของทุกตำแหน่ง (T ไทย, L ตัวอักษรอื่น, D ตัวเลข, ...)
+        classes = char_classes(text)
+    
     while i < len(text):
         max_word = ""
         
+        if handle_unknown and classes[i] not in 'TL':
+            # ตัวเลข ช่องว่าง และเครื่องหมาย: ใช้ทั้งช่วงเป็นหนึ่งคำโดยไม่ต้องค้นพจนานุกรม
+            end = run_end(classes, i)
+            tokens.append(text[i:end])
+            i = end
+            continue
+        
         # หาคำที่ยาวที่สุด
         for j in range(i, len(text)):
             temp_word = text[i:j+1]
@@ -151,8 +164,10 @@ def improved_maximum_matching(text, dictionary, handle_unknown=True):
                 # 1. ถือว่าตัวอักษรเดี่ยวเป็นคำ
                 # 2. ลองรวมตัวอักษรหลายตัวเป็นคำ
                 # 3. ใช้ heuristics อื่นๆ
-                tokens.append(text[i])  # วิธีพื้นฐาน
-                i += 1
+                # ตัวอย่าง: ตัวอักษรที่ไม่ใช่ภาษาไทยใช้ทั้งช่วงของชนิดเดียวกัน
+                end = i + 1 if classes[i] == 'T' else run_end(classes, i)
+                tokens.append(text[i:end])
+                i = end
             else:
                 tokens.append(text[i])
                 i += 1
@@ -262,31 +262,42 @@ print()
 # ===== แบบฝึกหัดที่ 2.5: โปรเจกต์ขนาดเล็ก =====
 print("=== แบบฝึกหัดที่ 2.5: โปรเจกต์ขนาดเล็ก ===")
 
-def create_word_frequency_report(texts, min_frequency=2):
+def create_word_frequency_report(texts, min_frequency=2, dedup=None):
     """
     สร้างรายงานความถี่ของคำจากข้อความหลายๆ ข้อความ
+
+    dedup: None, 'weighted' หรือ 'collapsed' (แยกคำเฉพาะตัวแทนของข้อความซ้ำ/เกือบซ้ำ ดู dedup.py)
     """
     # TODO: Exercise 2.5 - สร้างรายงานความถี่ของคำ
     from collections import Counter
     
-    all_words = []
+    word_freq = Counter()
+    total_words = 0
+    
+    # ข้อความที่ต้องแยกคำ พร้อมน้ำหนัก (จำนวนครั้งที่นับ)
+    weighted_texts = [(text, 1) for text in texts]
+    if dedup is not None:
+        from dedup import MODES, deduplicate
+        if dedup not in MODES:
+            raise ValueError(f"Unknown dedup mode: {dedup}")
+        deduplication = deduplicate(texts)
+        weighted_texts = [(texts[i], deduplication.weight(i, dedup)) for i in deduplication.representatives]
     
-    # รวบรวมคำจากทุกข้อความ
-    for text in texts:
+    # รวบรวมคำจากทุกข้อความ (นับคำของตัวแทนครั้งเดียวแล้วคูณน้ำหนัก)
+    stopwords = thai_stopwords()
+    for text, weight in weighted_texts:
         tokens = word_tokenize(text, engine='newmm')
         # กรองเฉพาะคำสำคัญ (ไม่รวม stopwords)
-        stopwords = thai_stopwords()
         content_words = [token for token in tokens if token not in stopwords and len(token) > 1]
-        all_words.extend(content_words)
-    
-    # นับความถี่
-    word_freq = Counter(all_words)
+        for word, freq in Counter(content_words).items():
+            word_freq[word] += freq * weight
+        total_words += len(content_words) * weight
     
     # กรองคำที่มีความถี่ต่ำ
     frequent_words = {word: freq for word, freq in word_freq.items() if freq >= min_frequency}
     
     return {
-        'total_words': len(all_words),
+        'total_words': total_words,
         'unique_words': len(word_freq),
         'frequent_words': frequent_words,
         'top_words': word_freq.most_common(10)
@@ -0,0 +1,310 @@
+# ตัวอย่างโค้ด: การแยกคำแบบ Incremental สำหรับเอกสารที่ถูกแก้ไขบ่อย
+
+"""
+เอกสารที่เก็บผลการแยกคำและสถิติไว้ แล้วอัปเดตเฉพาะส่วนที่ถูกแก้ไข
+
+แนวคิด:
+- เก็บรายการคำในรูปแบบ gap buffer (คำก่อนตำแหน่งแก้ไขอยู่ใน _left,
+  คำหลังตำแหน่งแก้ไขอยู่ใน _right แบบกลับลำดับ) การแก้ไขที่อยู่ใกล้กัน
+  จึงย้ายคำเพียงไม่กี่คำ ไม่ต้องคำนวณ offset ของทั้งเอกสารใหม่
+- เมื่อแก้ไข จะแยกคำใหม่เฉพาะ "หน้าต่าง" รอบจุดที่แก้ไข โดยมีคำบริบท
+  ด้านซ้ายและขวา ถ้าคำที่ขอบหน้าต่างยังเหมือนเดิม ถือว่าขอบนั้นเสถียร
+  ถ้าไม่เหมือนเดิมจะขยายหน้าต่างออกไปแล้วแยกคำใหม่
+- สถิติ (จำนวนคำ, Counter ของคำ, คำสำคัญ, stopwords) ถูกปรับแบบ delta
+  คือลบคำเก่าในหน้าต่างออกแล้วเพิ่มคำใหม่เข้าไป
+
+ข้อกำหนด: tokenizer ต้องคืนคำที่ต่อกันแล้วได้ข้อความเดิมครบทุกตัวอักษร
+(เช่น word_tokenize ของ PyThaiNLP ซึ่งเก็บช่องว่างไว้เป็นคำโดยค่าเริ่มต้น)
+"""
+
+import re
+from collections import Counter
+
+
+def _default_tokenizer(engine='newmm'):
+    """สร้าง tokenizer จาก PyThaiNLP (import เมื่อจำเป็นเท่านั้น)"""
+    from pythainlp.tokenize import word_tokenize
+
+    def tokenize(text):
+        return word_tokenize(text, engine=engine)
+
+    return tokenize
+
+
+def _decrement(counter, key):
+    """ลดค่าใน Counter และลบ key ทิ้งเมื่อเหลือ 0 เพื่อให้ len() ถูกต้อง"""
+    remaining = counter[key] - 1
+    if remaining > 0:
+        counter[key] = remaining
+    else:
+        del counter[key]
+
+
+class IncrementalDocument:
+    """
+    เอกสารที่แยกคำแบบ incremental
+
+    Args:
+        text (str): ข้อความเริ่มต้น
+        tokenizer (callable): ฟังก์ชันรับ str คืน list ของคำ
+            (ค่าเริ่มต้นคือ word_tokenize engine='newmm')
+        stopwords (set): ชุด stopwords สำหรับแยกคำสำคัญ
+        context_tokens (int): จำนวนคำบริบทแต่ละด้านของจุดที่แก้ไข
+        max_expansions (int): จำนวนครั้งสูงสุดที่ขยายหน้าต่างเมื่อขอบไม่เสถียร
+    """
+
+    def __init__(self, text='', tokenizer=None, stopwords=None,
+                 context_tokens=2, max_expansions=8):
+        self.tokenizer = tokenizer or _default_tokenizer()
+        self.stopwords = stopwords if stopwords is not None else set()
+        self.context_tokens = max(1, context_tokens)
+        self.max_expansions = max_expansions
+
+        # gap buffer ของคำ
+        self._left = []
+        self._left_chars = 0
+        self._right = []
+        self._right_chars = 0
+
+        # สถิติที่ปรับแบบ delta
+        self._token_counts = Counter()
+        self._content_counts = Counter()
+        self._stopword_counts = Counter()
+        self._token_count = 0
+        self._content_count = 0
+        self._stopword_count = 0
+
+        self.last_window = None  # (start, end, จำนวนคำที่แยกใหม่) ของการแก้ไขล่าสุด
+
+        tokens = self._tokenize(text)
+        self._add_tokens(tokens)
+        self._left.extend(tokens)
+        self._left_chars = len(text)
+
+    # ----- ข้อมูลของเอกสาร -----
+
+    def __len__(self):
+        return self._left_chars + self._right_chars
+
+    @property
+    def tokens(self):
+        """รายการคำทั้งหมดของเอกสาร (สร้างใหม่ทุกครั้ง O(จำนวนคำ))"""
+        return self._left + self._right[::-1]
+
+    @property
+    def text(self):
+        """ข้อความทั้งหมดของเอกสาร"""
+        return ''.join(self._left) + ''.join(reversed(self._right))
+
+    def token_at(self, position):
+        """
+        หาคำที่ครอบคลุมตำแหน่งตัวอักษรที่กำหนด
+
+        Returns:
+            tuple: (ตำแหน่งเริ่มต้น, คำ) หรือ None ถ้าอยู่นอกเอกสาร
+        """
+        if not 0 <= position < len(self):
+            return None
+        self._move_gap(position)
+        return self._left_chars, self._right[-1]
+
+    # ----- การแก้ไข -----
+
+    def insert(self, position, text):
+        """แทรกข้อความที่ตำแหน่งที่กำหนด"""
+        return self.edit(position, position, text)
+
+    def delete(self, start, end):
+        """ลบข้อความช่วง [start, end)"""
+        return self.edit(start, end, '')
+
+    def edit(self, start, end, replacement=''):
+        """
+        แทนที่ข้อความช่วง [start, end) ด้วย replacement แล้วแยกคำใหม่เฉพาะหน้าต่างรอบจุดแก้ไข
+
+        Args:
+            start (int): ตำแหน่งเริ่มต้น
+            end (int): ตำแหน่งสิ้นสุด (ไม่รวม)
+            replacement (str): ข้อความใหม่
+
+        Returns:
+            list: คำใหม่ที่ถูกแยกในหน้าต่าง
+        """
+        if not 0 <= start <= end <= len(self):
+            raise ValueError(f"Invalid edit range: [{start}, {end}) for length {len(self)}")
+
+        self._move_gap(start)
+
+        # ดึงคำบริบทด้านซ้าย
+        window = []
+        left_taken = self._take_left(window, self.context_tokens)
+        window_start = self._left_chars
+
+        # ดึงคำจนครอบคลุมช่วงที่แก้ไข แล้วดึงบริบทด้านขวาเพิ่ม
+        window_end = window_start + sum(len(token) for token in window)
+        while self._right and window_end < end:
+            self._take_right(window, 1)
+            window_end += len(window[-1])
+        right_taken = self._take_right(window, self.context_tokens)
+
+        expansions = 0
+        while True:
+            window_text = ''.join(window)
+            relative_start = start - window_start
+            relative_end = end - window_start
+            new_text = window_text[:relative_start] + replacement + window_text[relative_end:]
+            new_tokens = self._tokenize(new_text)
+
+            # ขอบซ้ายเสถียรถ้าคำแรกของหน้าต่างไม่เปลี่ยน (หรืออยู่ต้นเอกสาร)
+            left_stable = not self._left or (left_taken > 0 and new_tokens[:1] == window[:1])
+            # ขอบขวาเสถียรถ้าคำสุดท้ายของหน้าต่างไม่เปลี่ยน (หรืออยู่ท้ายเอกสาร)
+            right_stable = not self._right or (right_taken > 0 and new_tokens[-1:] == window[-1:])
+
+            if (left_stable and right_stable) or expansions >= self.max_expansions:
+                break
+
+            expansions += 1
+            if not left_stable:
+                before = len(window)
+                left_taken = self._take_left(window, self.context_tokens)
+                taken = window[:len(window) - before]
+                window_start -= sum(len(token) for token in taken)
+            if not right_stable:
+                right_taken = self._take_right(window, self.context_tokens)
+
+        # ปรับสถิติแบบ delta
+        self._remove_tokens(window)
+        self._add_tokens(new_tokens)
+
+        self._left.extend(new_tokens)
+        self._left_chars += len(new_text)
+        self.last_window = (window_start, window_start + len(new_text), len(new_tokens))
+        return new_tokens
+
+    # ----- สถิติ -----
+
+    def statistics(self, include_frequency=True):
+        """
+        สถิติของเอกสารในรูปแบบเดียวกับ ThaiTextAnalysisSystem.calculate_text_statistics
+
+        Args:
+            include_frequency (bool): คัดลอก word_frequency และ stopwords_found
+                (ใช้เวลา O(จำนวนคำไม่ซ้ำ)) หรือไม่
+
+        Note:
+            stopwords_found เรียงตามการนับ ไม่ได้เรียงตามตำแหน่งในเอกสาร
+        """
+        word_count = self._token_count
+        char_count = len(self)
+        stats = {
+            'character_count': char_count,
+            'word_count': word_count,
+            'content_word_count': self._content_count,
+            'stopword_count': self._stopword_count,
+            'unique_words': len(self._token_counts),
+            'unique_content_words': len(self._content_counts),
+            'avg_word_length': char_count / word_count if word_count else 0,
+            'content_ratio': self._content_count / word_count if word_count else 0,
+        }
+        if include_frequency:
+            stats['word_frequency'] = Counter(self._content_counts)
+            stats['stopwords_found'] = list(self._stopword_counts.elements())
+        return stats
+
+    # ----- ส่วนภายใน -----
+
+    def _tokenize(self, text):
+        if not text:
+            return []
+        tokens = self.tokenizer(text)
+        if sum(len(token) for token in tokens) != len(text):
+            raise ValueError("tokenizer ต้องคืนคำที่ต่อกันได้ข้อความเดิมครบทุกตัวอักษร")
+        return tokens
+
+    def _move_gap(self, position):
+        """ย้าย gap ไปยังขอบคำที่อยู่ก่อนหรือตรงกับ position"""
+        left, right = self._left, self._right
+        while left and self._left_chars > position:
+            token = left.pop()
+            self._left_chars -= len(token)
+            right.append(token)
+            self._right_chars += len(token)
+        while right and self._left_chars + len(right[-1]) <= position:
+            token = right.pop()
+            self._right_chars -= len(token)
+            left.append(token)
+            self._left_chars += len(token)
+
+    def _take_left(self, window, count):
+        """ย้ายคำจากท้าย _left ไปไว้ต้น window คืนจำนวนคำที่ย้ายได้"""
+        taken = []
+        while self._left and len(taken) < count:
+            token = self._left.pop()
+            self._left_chars -= len(token)
+            taken.append(token)
+        window[:0] = taken[::-1]
+        return len(taken)
+
+    def _take_right(self, window, count):
+        """ย้ายคำจาก _right ไปต่อท้าย window คืนจำนวนคำที่ย้ายได้"""
+        moved = 0
+        while self._right and moved < count:
+            token = self._right.pop()
+            self._right_chars -= len(token)
+            window.append(token)
+            moved += 1
+        return moved
+
+    def _classify(self, token):
+        """แยกประเภทคำแบบเดียวกับ extract_content_words"""
+        token = token.strip()
+        if not token:
+            return None, token
+        if token in self.stopwords:
+            return 'stopword', token
+        if len(token) > 1 and not re.match(r'^[0-9\W]+$', token):
+            return 'content', token
+        return None, token
+
+    def _add_tokens(self, tokens):
+        for token in tokens:
+            self._token_counts[token] += 1
+            kind, key = self._classify(token)
+            if kind == 'content':
+                self._content_counts[key] += 1
+                self._content_count += 1
+            elif kind == 'stopword':
+                self._stopword_counts[key] += 1
+                self._stopword_count += 1
+        self._token_count += len(tokens)
+
+    def _remove_tokens(self, tokens):
+        for token in tokens:
+            _decrement(self._token_counts, token)
+            kind, key = self._classify(token)
+            if kind == 'content':
+                _decrement(self._content_counts, key)
+                self._content_count -= 1
+            elif kind == 'stopword':
+                _decrement(self._stopword_counts, key)
+                self._stopword_count -= 1
+        self._token_count -= len(tokens)
+
+
+# ตัวอย่างการใช้งาน
+if __name__ == "__main__":
+    document = IncrementalDocument("นักเรียนไปโรงเรียนเพื่อเรียนหนังสือทุกวัน")
+    print(f"เริ่มต้น: {' | '.join(document.tokens)}")
+
+    # พิมพ์เพิ่มทีละตัวอักษรเหมือนการใช้งานใน editor
+    for char in "และเล่นกีฬา":
+        document.insert(len(document), char)
+    print(f"หลังพิมพ์ต่อท้าย: {' | '.join(document.tokens)}")
+    print(f"หน้าต่างล่าสุด: {document.last_window}")
+
+    document.edit(0, len("นักเรียน"), "ครู")
+    print(f"หลังแก้ไขคำแรก: {' | '.join(document.tokens)}")
+
+    stats = document.statistics()
+    print(f"จำนวนคำ: {stats['word_count']}, คำไม่ซ้ำ: {stats['unique_words']}")
+    print(f"ความยาวเฉลี่ยของคำ: {stats['avg_word_length']:.2f}")
@@ -21,6 +21,8 @@ from collections import Counter, defaultdict
 from datetime import datetime
 import re
 
+from analysis_result import AnalysisResult, TextStatistics, extract_content_words, to_serializable
+
 # ติดตั้ง dependencies
 try:
     from pythainlp.tokenize import word_tokenize
@@ -41,11 +43,33 @@ class ThaiTextAnalysisSystem:
     ระบบวิเคราะห์ข้อความภาษาไทยแบบครอบคลุม
     """
     
-    def __init__(self, default_engine='newmm'):
+    def __init__(self, default_engine='newmm', pretokenize=False, index_history=False,
+                 persistent_store=None):
         self.default_engine = default_engine
+        # แบ่งช่วงตามชนิดอักษรก่อน ส่งเฉพาะช่วงภาษาไทยให้ engine (ดู script_pretokenizer)
+        self.pretokenize = pretokenize
         self.stopwords = thai_stopwords()
+        self._frozen_stopwords = (None, frozenset())
         self.analysis_history = []
         
+        # inverted index ของ analysis_history (ดู analysis_index) อัปเดตทุกครั้งที่บันทึกประวัติ
+        self.history_index = None
+        if index_history:
+            self.enable_history_index()
+        
+        # ที่เก็บถาวร (SQLiteAnalysisStore หรือพาธของไฟล์ .db) บันทึกผลแบบต่อท้ายเป็นชุด
+        if isinstance(persistent_store, str):
+            from sqlite_store import SQLiteAnalysisStore
+            persistent_store = SQLiteAnalysisStore(persistent_store)
+        self.persistent_store = persistent_store
+        # จำนวนรายการใน analysis_history ที่บันทึกลงแต่ละไฟล์ .db แล้ว
+        self._saved_history = {}
+        
+        # พจนานุกรมที่กำหนดเอง (Trie ของ PyThaiNLP) None = ใช้พจนานุกรมมาตรฐาน
+        # ถูกแทนทั้งก้อนเมื่อ reload จึงอ่านได้โดยไม่ต้องใช้ lock
+        self.custom_dict = None
+        self.dictionary_watcher = None
+        
         # สถิติระบบ
         self.system_stats = {
             'total_analyses': 0,
@@ -54,6 +78,65 @@ class ThaiTextAnalysisSystem:
             'engines_used': defaultdict(int)
         }
     
+    def _tokenize(self, text, engine):
+        """แยกคำด้วย PyThaiNLP โดยใช้พจนานุกรมที่กำหนดเอง (ถ้ามี)"""
+        custom_dict = self.custom_dict
+        if custom_dict is None:
+            def thai_tokenize(segment):
+                return word_tokenize(segment, engine=engine)
+        else:
+            def thai_tokenize(segment):
+                return word_tokenize(segment, engine=engine, custom_dict=custom_dict)
+        
+        if self.pretokenize:
+            from script_pretokenizer import tokenize
+            
+            return tokenize(text, thai_tokenize)
+        return thai_tokenize(text)
+    
+    def load_custom_dictionary(self, words, include_default=True):
+        """
+        สร้างพจนานุกรมใหม่ (Trie) แล้วสลับแทนตัวเดิม
+        
+        Args:
+            words (iterable): คำที่ต้องการเพิ่ม
+            include_default (bool): รวมคำจากพจนานุกรมมาตรฐานของ PyThaiNLP ด้วย
+        
+        Returns:
+            str: เวอร์ชันของพจนานุกรม
+        """
+        from pythainlp.util import dict_trie
+        from dictionary_reload import FileDictionarySource
+        
+        custom_words = set(words)
+        all_words = custom_words
+        if include_default:
+            from pythainlp.corpus import thai_words
+            all_words = custom_words | thai_words()
+        
+        # สร้าง Trie ให้เสร็จก่อน แล้วสลับในคำสั่งเดียว
+        self.custom_dict = dict_trie(all_words)
+        return FileDictionarySource.version(custom_words)
+    
+    def watch_dictionary(self, path, interval=1.0, include_default=True):
+        """
+        โหลดพจนานุกรมจากไฟล์และโหลดใหม่อัตโนมัติเมื่อไฟล์เปลี่ยน
+        โดยไม่ต้อง restart โปรเซส (ดู dictionary_reload)
+        
+        Returns:
+            DictionaryWatcher: ใช้ดู last_reload หรือเรียก stop()
+        """
+        from dictionary_reload import watch_dictionary_file
+        
+        if self.dictionary_watcher is not None:
+            self.dictionary_watcher.stop()
+        self.dictionary_watcher = watch_dictionary_file(
+            path,
+            lambda words: self.load_custom_dictionary(words, include_default),
+            interval,
+        )
+        return self.dictionary_watcher
+    
     def preprocess_text(self, text):
         """
         ปรับปรุงข้อความก่อนการวิเคราะห์
@@ -80,7 +163,7 @@ class ThaiTextAnalysisSystem:
         
         for engine in engines:
             try:
-                tokens = word_tokenize(text, engine=engine)
+                tokens = self._tokenize(text, engine)
                 results[engine] = {
                     'tokens': tokens,
                     'word_count': len(tokens),
@@ -95,48 +178,84 @@ class ThaiTextAnalysisSystem:
     
     def extract_content_words(self, tokens):
         """
-        สกัดคำสำคัญ (ไม่รวม stopwords และคำที่ไม่สำคัญ)
+        สกัดคำสำคัญ (ไม่รวม stopwords และคำที่ไม่สำคัญ) ดู analysis_result.extract_content_words
         """
-        content_words = []
-        stopwords_found = []
-        
-        for token in tokens:
-            token = token.strip()
-            if not token:
-                continue
-                
-            if token in self.stopwords:
-                stopwords_found.append(token)
-            elif len(token) > 1 and not re.match(r'^[0-9\W]+$', token):
-                content_words.append(token)
-        
-        return content_words, stopwords_found
+        return extract_content_words(tokens, self._stopword_set())
+    
+    def _stopword_set(self):
+        # TextStatistics เก็บ stopwords ไว้อ้างอิงเท่านั้น จึงใช้ frozenset ชุดเดียวร่วมกันทุกผล
+        # (thai_stopwords() คืน frozenset อยู่แล้ว ถ้า self.stopwords ถูกแทนด้วยชุดอื่นจะแปลงครั้งเดียว)
+        stopwords = self.stopwords
+        if isinstance(stopwords, frozenset):
+            return stopwords
+        if self._frozen_stopwords[0] is not stopwords:
+            self._frozen_stopwords = (stopwords, frozenset(stopwords))
+        return self._frozen_stopwords[1]
     
-    def calculate_text_statistics(self, text, tokens):
+    def calculate_text_statistics(self, text, tokens, fields=None):
         """
         คำนวณสถิติต่างๆ ของข้อความ
+
+        Args:
+            fields (list): ชื่อสถิติที่ต้องการ (ดู analysis_result.STATISTICS_FIELDS)
+                None = ทั้งหมด คำนวณเฉพาะค่าที่ขอ
         """
-        content_words, stopwords_found = self.extract_content_words(tokens)
-        
-        stats = {
-            'character_count': len(text),
-            'word_count': len(tokens),
-            'content_word_count': len(content_words),
-            'stopword_count': len(stopwords_found),
-            'unique_words': len(set(tokens)),
-            'unique_content_words': len(set(content_words)),
-            'avg_word_length': sum(len(token) for token in tokens) / len(tokens) if tokens else 0,
-            'content_ratio': len(content_words) / len(tokens) if tokens else 0,
-            'word_frequency': Counter(content_words),
-            'stopwords_found': stopwords_found
-        }
-        
-        return stats
+        return TextStatistics(len(text), tokens, self._stopword_set(), fields).to_dict()
     
-    def analyze_single_text(self, text, engine=None, include_pos=False):
+    def analyze_single_text(self, text, engine=None, include_pos=False, record_history=True, fields=None):
         """
         วิเคราะห์ข้อความเดี่ยวอย่างละเอียด
+
+        Args:
+            record_history (bool): เก็บผลลัพธ์ไว้ใน analysis_history หรือไม่
+                (ปิดได้สำหรับงาน batch ขนาดใหญ่ที่เขียนผลลงไฟล์ทันที)
+            fields (list): สถิติที่ต้องการใน result['statistics'] (None = ทั้งหมด)
+        """
+        analysis = self._analyze(text, engine, include_pos, fields)
+        if not isinstance(analysis, AnalysisResult):
+            return analysis
+        # ประวัติเก็บ AnalysisResult (เหมือน analyze_text) สถิติที่ไม่ได้อยู่ใน fields
+        # ยังอ่านได้ และถูกคำนวณเมื่อดัชนีหรือที่เก็บถาวรต้องการเท่านั้น
+        self._record_result(analysis, record_history)
+        return analysis.to_dict()
+    
+    def tokenize_spans(self, text, engine=None, use_numpy=False):
+        """
+        แยกคำแล้วคืนเป็น TokenSpans บนข้อความที่ผ่าน preprocess_text แล้ว (ดู token_spans)
+        """
+        from token_spans import TokenSpans
+        
+        processed_text = self.preprocess_text(text)
+        tokens = self._tokenize(processed_text, engine or self.default_engine)
+        return TokenSpans.from_tokens(processed_text, tokens, use_numpy=use_numpy)
+    
+    def analyze_text(self, text, engine=None, include_pos=False, record_history=True, fields=None,
+                     spans=False):
         """
+        วิเคราะห์ข้อความเดี่ยว คืน AnalysisResult แทน dict
+
+        AnalysisResult ใช้ __slots__ และคำนวณสถิติแต่ละค่าเมื่อถูกอ่านครั้งแรก
+        เหมาะกับงานปริมาณมากที่อ่านสถิติเพียงไม่กี่ค่า (เช่น result.statistics.word_count)
+        อ่านแบบ dict ได้เหมือนเดิม และ to_dict() คืนผลรูปแบบเดียวกับ analyze_single_text
+
+        Args:
+            fields (list): สถิติที่ต้องการใน to_dict()/การส่งออก (None = ทั้งหมด)
+            spans (bool): เก็บ tokens เป็น TokenSpans (ขอบคำบน processed_text) แทน list ของคำ
+                word_count และ avg_word_length คำนวณจากขอบคำ คำถูกสร้างเมื่ออ่านเท่านั้น
+
+        Returns:
+            AnalysisResult หรือ {'error': ...} ถ้าข้อความว่าง
+
+        analysis_history เก็บ AnalysisResult ตัวเดียวกับที่คืน (ไม่คำนวณสถิติเพิ่ม)
+        แลกกับการที่ผลในประวัติอ้างถึง tokens ไว้ตลอด และสถิติที่ดัชนี (index_history)
+        หรือที่เก็บถาวรอ่าน จะถูกคำนวณและจำไว้ในผลนั้นเมื่อบันทึก
+        """
+        result = self._analyze(text, engine, include_pos, fields, spans)
+        if isinstance(result, AnalysisResult):
+            self._record_result(result, record_history)
+        return result
+    
+    def _analyze(self, text, engine, include_pos, fields, spans=False):
         if engine is None:
             engine = self.default_engine
         
@@ -148,16 +267,20 @@ class ThaiTextAnalysisSystem:
             return {'error': 'ข้อความว่างหรือไม่ถูกต้อง'}
         
         # แยกคำ
-        tokens = word_tokenize(processed_text, engine=engine)
+        tokens = self._tokenize(processed_text, engine)
+        if spans:
+            from token_spans import TokenSpans
+            
+            tokens = TokenSpans.from_tokens(processed_text, tokens)
         
-        # คำนวณสถิติ
-        stats = self.calculate_text_statistics(processed_text, tokens)
+        # สถิติคำนวณเมื่อถูกอ่าน
+        stats = TextStatistics(len(processed_text), tokens, self._stopword_set(), fields)
         
         # วิเคราะห์ POS (ถ้าต้องการ)
         pos_analysis = None
         if include_pos:
             try:
-                pos_tags = pos_tag(tokens, engine='perceptron')
+                pos_tags = pos_tag(list(tokens), engine='perceptron')
                 pos_analysis = {
                     'pos_tags': pos_tags,
                     'pos_distribution': Counter([tag for word, tag in pos_tags])
@@ -165,28 +288,83 @@ class ThaiTextAnalysisSystem:
             except Exception as e:
                 pos_analysis = {'error': str(e)}
         
-        # สร้างผลลัพธ์
-        result = {
-            'timestamp': datetime.now().isoformat(),
-            'original_text': original_text,
-            'processed_text': processed_text,
-            'engine_used': engine,
-            'tokens': tokens,
-            'statistics': stats,
-            'pos_analysis': pos_analysis
-        }
-        
+        return AnalysisResult(datetime.now().isoformat(), original_text, processed_text, engine,
+                              tokens, stats, pos_analysis)
+    
+    def _record_result(self, result, record_history):
         # บันทึกประวัติ
-        self.analysis_history.append(result)
+        if record_history:
+            self.analysis_history.append(result)
+            if self.history_index is not None:
+                self.history_index.add(result, len(self.analysis_history) - 1)
+            if self.persistent_store is not None:
+                self.persistent_store.add(result)
         self.system_stats['total_analyses'] += 1
         self.system_stats['total_texts_processed'] += 1
-        self.system_stats['total_words_processed'] += len(tokens)
+        self.system_stats['total_words_processed'] += len(result['tokens'])
+
+    def enable_history_index(self):
+        """
+        สร้าง inverted index ของ analysis_history (รวมประวัติที่มีอยู่แล้ว)
+
+        Returns:
+            AnalysisIndex
+        """
+        from analysis_index import AnalysisIndex
         
-        return result
+        self.history_index = AnalysisIndex(
+            self.analysis_history,
+            tokenizer=lambda text: self._tokenize(text, self.default_engine),
+        )
+        self.history_index.rebuild()
+        return self.history_index
     
-    def analyze_multiple_texts(self, texts, engine=None):
+    def search_history(self, query, engine=None, since=None, until=None, limit=10):
+        """
+        ค้นหาประวัติการวิเคราะห์ด้วยคำค้นแบบ boolean/วลี เรียงด้วย TF-IDF
+        (ดู AnalysisIndex.search สำหรับรูปแบบคำค้น)
+        
+        Returns:
+            list: (ผลการวิเคราะห์, คะแนน)
+        """
+        if self.history_index is None:
+            self.enable_history_index()
+        hits = self.history_index.search(query, engine=engine, since=since, until=until, limit=limit)
+        return [(self.analysis_history[doc_id], score) for doc_id, score in hits]
+    
+    def create_incremental_document(self, text, engine=None, context_tokens=2):
+        """
+        สร้างเอกสารที่แยกคำแบบ incremental สำหรับงานแก้ไขข้อความ (เช่น editor)
+
+        การแก้ไขแต่ละครั้งจะแยกคำใหม่เฉพาะหน้าต่างรอบจุดที่แก้ไข และปรับสถิติแบบ delta
+        หมายเหตุ: ไม่ผ่าน preprocess_text เพื่อให้ตำแหน่งตัวอักษรตรงกับข้อความใน editor
+        """
+        from incremental_document import IncrementalDocument
+
+        if engine is None:
+            engine = self.default_engine
+
+        def tokenize(segment):
+            return self._tokenize(segment, engine)
+
+        self.system_stats['engines_used'][engine] += 1
+        return IncrementalDocument(text, tokenizer=tokenize, stopwords=self.stopwords,
+                                   context_tokens=context_tokens)
+
+    def analyze_multiple_texts(self, texts, engine=None, dedup=None, dedup_options=None):
         """
         วิเคราะห์ข้อความหลายข้อความพร้อมกัน
+
+        Args:
+            dedup (str): ตัดข้อความซ้ำ/เกือบซ้ำก่อนวิเคราะห์ (ดู dedup)
+                None = วิเคราะห์ทุกข้อความ
+                'weighted' = นับสถิติของตัวแทนตามจำนวนข้อความในกลุ่ม
+                'collapsed' = นับแต่ละกลุ่มครั้งเดียว
+                ทั้งสองโหมดคืน individual_results ครบทุกข้อความ ข้อความซ้ำได้ผลของตัวแทน
+                พร้อม duplicate_of = index ของตัวแทน และ representative_text = ข้อความของตัวแทน
+                ข้อความที่เกือบซ้ำ (ไม่ซ้ำทุกตัวอักษร) มี processed_text และ tokens เป็น None
+                เพราะไม่ได้แยกคำข้อความนั้นเอง statistics เป็นของตัวแทน
+            dedup_options (dict): พารามิเตอร์ของ NearDuplicateIndex (เช่น threshold)
         """
         results = []
         combined_stats = {
@@ -197,14 +375,42 @@ class ThaiTextAnalysisSystem:
             'engine_comparison': {}
         }
         
-        for i, text in enumerate(texts):
+        if dedup is None:
+            groups = [(text, 1) for text in texts]
+        else:
+            from dedup import MODES, deduplicate, exact_key
+            
+            if dedup not in MODES:
+                raise ValueError(f"Unknown dedup mode: {dedup}")
+            deduplication = deduplicate(texts, **(dedup_options or {}))
+            groups = [(texts[i], deduplication.weight(i, dedup)) for i in deduplication.representatives]
+            combined_stats['deduplication'] = {'mode': dedup, **deduplication.stats}
+        
+        for text, weight in groups:
             result = self.analyze_single_text(text, engine)
             results.append(result)
             
             if 'error' not in result:
-                combined_stats['total_words'] += result['statistics']['word_count']
-                combined_stats['total_content_words'] += result['statistics']['content_word_count']
-                combined_stats['combined_word_frequency'].update(result['statistics']['word_frequency'])
+                stats = result['statistics']
+                combined_stats['total_words'] += stats['word_count'] * weight
+                combined_stats['total_content_words'] += stats['content_word_count'] * weight
+                if weight == 1:
+                    combined_stats['combined_word_frequency'].update(stats['word_frequency'])
+                else:
+                    for word, freq in stats['word_frequency'].items():
+                        combined_stats['combined_word_frequency'][word] += freq * weight
+        
+        if dedup is not None:
+            fanned_out = deduplication.fan_out(results)
+            results = []
+            for i, (result, representative) in enumerate(zip(fanned_out, deduplication.assignment)):
+                if representative != i:
+                    result = dict(result, original_text=texts[i], duplicate_of=representative,
+                                  representative_text=texts[representative])
+                    if 'error' not in result and exact_key(texts[i]) != exact_key(texts[representative]):
+                        # ข้อความเกือบซ้ำ: ข้อความหลังปรับปรุงและคำของตัวแทนไม่ใช่ของข้อความนี้
+                        result['processed_text'] = result['tokens'] = None
+                results.append(result)
         
         # เปรียบเทียบ engine (ถ้ามีข้อความมากกว่า 1 ข้อความ)
         if len(texts) > 0 and 'error' not in results[0]:
@@ -217,6 +423,53 @@ class ThaiTextAnalysisSystem:
             'combined_statistics': combined_stats,
             'top_words': combined_stats['combined_word_frequency'].most_common(20)
         }
+
+    def iter_analyze_texts(self, texts, engine=None, record_history=True):
+        """
+        วิเคราะห์ข้อความทีละข้อความแบบ generator (คืนผลลัพธ์ทันทีที่วิเคราะห์เสร็จ)
+        """
+        for text in texts:
+            yield self.analyze_single_text(text, engine, record_history=record_history)
+
+    def export_multiple_texts(self, texts, exporters, engine=None, record_history=False):
+        """
+        วิเคราะห์ข้อความหลายข้อความแล้วเขียนผลแต่ละรายการลง exporter ทันที
+
+        ไม่เก็บผลลัพธ์รายข้อความไว้ในหน่วยความจำ จึงเหมาะกับงาน batch ขนาดใหญ่
+
+        Args:
+            texts (iterable): ข้อความ (เป็น generator ได้)
+            exporters: exporter หรือ list ของ exporter จาก result_exporters
+                (เช่น NDJSONExporter, CSVSummaryExporter)
+            record_history (bool): เก็บผลลัพธ์ไว้ใน analysis_history หรือไม่
+
+        Returns:
+            dict: สถิติรวมแบบเดียวกับ combined_statistics ของ analyze_multiple_texts
+        """
+        if not isinstance(exporters, (list, tuple)):
+            exporters = [exporters]
+
+        combined_stats = {
+            'total_texts': 0,
+            'total_words': 0,
+            'total_content_words': 0,
+            'combined_word_frequency': Counter()
+        }
+
+        for result in self.iter_analyze_texts(texts, engine, record_history=record_history):
+            combined_stats['total_texts'] += 1
+            for exporter in exporters:
+                exporter.write(result)
+
+            if 'error' not in result:
+                combined_stats['total_words'] += result['statistics']['word_count']
+                combined_stats['total_content_words'] += result['statistics']['content_word_count']
+                combined_stats['combined_word_frequency'].update(result['statistics']['word_frequency'])
+
+        return {
+            'combined_statistics': combined_stats,
+            'top_words': combined_stats['combined_word_frequency'].most_common(20)
+        }
     
     def generate_report(self, analysis_result, format='text'):
         """
@@ -225,7 +478,7 @@ class ThaiTextAnalysisSystem:
         if format == 'text':
             return self._generate_text_report(analysis_result)
         elif format == 'json':
-            return json.dumps(analysis_result, ensure_ascii=False, indent=2)
+            return json.dumps(analysis_result, ensure_ascii=False, indent=2, default=to_serializable)
         else:
             raise ValueError(f"Unsupported format: {format}")
     
@@ -246,14 +499,20 @@ class ThaiTextAnalysisSystem:
         report.append(f"'{result['original_text']}'")
         report.append("")
         
-        if result['processed_text'] != result['original_text']:
+        if 'duplicate_of' in result:
+            report.append(f"ผลการแยกคำและสถิติมาจากข้อความตัวแทน (ข้อความที่ {result['duplicate_of']}):")
+            report.append(f"'{result['representative_text']}'")
+            report.append("")
+        
+        if result['processed_text'] is not None and result['processed_text'] != result['original_text']:
             report.append("ข้อความหลังปรับปรุง:")
             report.append(f"'{result['processed_text']}'")
             report.append("")
         
-        report.append("ผลการแยกคำ:")
-        report.append(" | ".join(result['tokens']))
-        report.append("")
+        if result['tokens'] is not None:
+            report.append("ผลการแยกคำ:")
+            report.append(" | ".join(result['tokens']))
+            report.append("")
         
         stats = result['statistics']
         report.append("สถิติ:")
@@ -289,16 +548,40 @@ class ThaiTextAnalysisSystem:
             'system_stats': self.system_stats,
             'history_count': len(self.analysis_history),
             'available_engines': ['newmm', 'longest', 'icu', 'attacut'],
-            'last_analysis': self.analysis_history[-1]['timestamp'] if self.analysis_history else None
+            'last_analysis': self.analysis_history[-1]['timestamp'] if self.analysis_history else None,
+            'dictionary': self.dictionary_watcher.stats() if self.dictionary_watcher else None
         }
     
+    def close(self):
+        """หยุด thread ที่ตรวจไฟล์พจนานุกรม และเขียนผลที่ค้างอยู่ลงที่เก็บถาวร"""
+        if self.dictionary_watcher is not None:
+            self.dictionary_watcher.stop()
+        if self.persistent_store is not None:
+            self.persistent_store.close()
+    
     def save_analysis_history(self, filename):
         """
         บันทึกประวัติการวิเคราะห์ลงไฟล์
+
+        ไฟล์ .db/.sqlite ใช้ SQLiteAnalysisStore: ต่อท้ายเฉพาะรายการที่ยังไม่เคยบันทึกลงไฟล์นั้น
+        ไฟล์อื่นเขียนเป็น JSON ทั้งหมดใหม่ (สถิติของแต่ละผลตาม fields ที่ใช้ตอนวิเคราะห์)
         """
+        if filename.endswith(('.db', '.sqlite', '.sqlite3')):
+            from sqlite_store import SQLiteAnalysisStore
+            
+            try:
+                start = self._saved_history.get(filename, 0)
+                new_results = self.analysis_history[start:]
+                with SQLiteAnalysisStore(filename) as store:
+                    store.add_many(new_results)
+                self._saved_history[filename] = len(self.analysis_history)
+                return f"บันทึกประวัติเพิ่ม {len(new_results)} รายการลงไฟล์ {filename}"
+            except Exception as e:
+                return f"ข้อผิดพลาดในการบันทึก: {e}"
+        
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.analysis_history, f, ensure_ascii=False, indent=2)
+                json.dump(self.analysis_history, f, ensure_ascii=False, indent=2, default=to_serializable)
             return f"บันทึกประวัติ {len(self.analysis_history)} รายการลงไฟล์ {filename}"
         except Exception as e:
             return f"ข้อผิดพลาดในการบันทึก: {e}"
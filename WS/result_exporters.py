@@ -0,0 +1,194 @@
+# เครื่องมือ: เขียนผลการวิเคราะห์แบบ Streaming (NDJSON / CSV / TSV)
+
+"""
+Exporter สำหรับเขียนผลการวิเคราะห์ทีละข้อความทันทีที่วิเคราะห์เสร็จ
+
+แทนการสร้างผลลัพธ์ทั้งหมดในหน่วยความจำแล้ว json.dumps ทีเดียว
+exporter จะเขียน (และ flush) ทีละรายการ ทำให้:
+- หน่วยความจำสูงสุดไม่เพิ่มตามจำนวนข้อความ
+- ได้ผลลัพธ์รายการแรกทันทีที่วิเคราะห์ข้อความแรกเสร็จ
+
+รองรับการบีบอัด gzip (กำหนด compress=True หรือใช้ชื่อไฟล์ลงท้าย .gz)
+และการตัดฟิลด์ขนาดใหญ่ออก เช่น 'statistics.stopwords_found'
+"""
+
+import csv
+import gzip
+import json
+import sys
+
+from analysis_result import to_serializable
+
+# ฟิลด์ที่มีขนาดใหญ่และมักไม่จำเป็นในงาน batch
+HEAVY_FIELDS = (
+    'original_text',
+    'statistics.stopwords_found',
+    'statistics.word_frequency',
+    'pos_analysis',
+)
+
+# ไฟล์ gzip: flush แต่ละครั้งเป็น sync flush ที่ตัด block การบีบอัด ถ้า flush ทุกรายการ
+# อัตราการบีบอัดจะแย่มาก จึง flush ห่างกว่าไฟล์ธรรมดา
+COMPRESSED_FLUSH_EVERY = 1000
+
+
+def _is_compressed(output, compress=False):
+    return not hasattr(output, 'write') and output != '-' and (compress or str(output).endswith('.gz'))
+
+
+def _flush_interval(output, compress, flush_every):
+    """flush_every=None: ทุกรายการสำหรับไฟล์ธรรมดา, ทุก COMPRESSED_FLUSH_EVERY รายการสำหรับ gzip"""
+    if flush_every is None:
+        flush_every = COMPRESSED_FLUSH_EVERY if _is_compressed(output, compress) else 1
+    return max(1, flush_every)
+
+
+def _open_output(output, compress=False):
+    """
+    เปิดปลายทางสำหรับเขียน
+
+    Returns:
+        tuple: (file object, ต้องปิดเองหรือไม่)
+    """
+    if hasattr(output, 'write'):
+        return output, False
+    if output == '-':
+        return sys.stdout, False
+    if _is_compressed(output, compress):
+        return gzip.open(output, 'wt', encoding='utf-8', newline=''), True
+    return open(output, 'w', encoding='utf-8', newline=''), True
+
+
+def drop_fields(result, fields):
+    """
+    คืนสำเนาของผลลัพธ์ที่ตัดฟิลด์ออก (ไม่แก้ไข dict ต้นฉบับ)
+
+    Args:
+        result (dict): ผลการวิเคราะห์
+        fields (iterable): ชื่อฟิลด์ ใช้จุดคั่นสำหรับฟิลด์ย่อย เช่น 'statistics.stopwords_found'
+    """
+    if not fields:
+        return result
+    # AnalysisResult: to_dict() ให้ statistics เป็น dict ธรรมดาด้วย
+    result = result.to_dict() if hasattr(result, 'to_dict') else dict(result)
+    for field in fields:
+        parts = field.split('.')
+        target = result
+        for part in parts[:-1]:
+            child = target.get(part)
+            if not isinstance(child, dict):
+                target = None
+                break
+            # คัดลอกเฉพาะ dict ที่อยู่บนเส้นทางของฟิลด์ที่ต้องตัด
+            child = dict(child)
+            target[part] = child
+            target = child
+        if target is not None:
+            target.pop(parts[-1], None)
+    return result
+
+
+class NDJSONExporter:
+    """
+    เขียนผลการวิเคราะห์เป็น NDJSON (หนึ่ง JSON ต่อบรรทัด)
+
+    Args:
+        output (str | file): พาธไฟล์, '-' สำหรับ stdout หรือ file object
+        compress (bool): บีบอัดด้วย gzip
+        drop (iterable): ฟิลด์ที่ต้องการตัดออก (ดู HEAVY_FIELDS)
+        flush_every (int): flush ทุกกี่รายการ (1 = เขียนออกทันทีทุกรายการ)
+            None = 1 สำหรับไฟล์ธรรมดา หรือ COMPRESSED_FLUSH_EVERY เมื่อบีบอัด
+    """
+
+    def __init__(self, output, compress=False, drop=(), flush_every=None):
+        self.file, self._owns_file = _open_output(output, compress)
+        self.drop = tuple(drop)
+        self.flush_every = _flush_interval(output, compress, flush_every)
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, result):
+        """เขียนผลลัพธ์หนึ่งรายการ"""
+        record = drop_fields(result, self.drop)
+        self.file.write(json.dumps(record, ensure_ascii=False, default=to_serializable))
+        self.file.write('\n')
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.file.flush()
+
+    def close(self):
+        self.file.flush()
+        if self._owns_file:
+            self.file.close()
+
+
+class CSVSummaryExporter:
+    """
+    เขียนสรุปผลการวิเคราะห์เป็น CSV/TSV หนึ่งแถวต่อข้อความ
+
+    Args:
+        output (str | file): พาธไฟล์, '-' สำหรับ stdout หรือ file object
+        compress (bool): บีบอัดด้วย gzip
+        delimiter (str): ',' สำหรับ CSV หรือ '\\t' สำหรับ TSV
+        include_text (bool): ใส่ข้อความหลังปรับปรุงในคอลัมน์ 'text'
+        top_n (int): จำนวนคำที่พบบ่อยในคอลัมน์ 'top_words'
+        flush_every (int): flush ทุกกี่รายการ (None = เหมือน NDJSONExporter)
+    """
+
+    STAT_COLUMNS = [
+        'character_count', 'word_count', 'content_word_count', 'stopword_count',
+        'unique_words', 'unique_content_words', 'avg_word_length', 'content_ratio',
+    ]
+
+    def __init__(self, output, compress=False, delimiter=',', include_text=False,
+                 top_n=5, flush_every=None):
+        self.file, self._owns_file = _open_output(output, compress)
+        self.include_text = include_text
+        self.top_n = top_n
+        self.flush_every = _flush_interval(output, compress, flush_every)
+        self.count = 0
+
+        self.columns = ['index', 'timestamp', 'engine_used'] + self.STAT_COLUMNS + ['top_words', 'error']
+        if include_text:
+            self.columns.append('text')
+        self.writer = csv.writer(self.file, delimiter=delimiter)
+        self.writer.writerow(self.columns)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, result):
+        """เขียนสรุปผลลัพธ์หนึ่งแถว"""
+        row = {'index': self.count}
+        if 'error' in result:
+            row['error'] = result['error']
+        else:
+            stats = result['statistics']
+            row['timestamp'] = result['timestamp']
+            row['engine_used'] = result['engine_used']
+            for column in self.STAT_COLUMNS:
+                value = stats[column]
+                row[column] = round(value, 4) if isinstance(value, float) else value
+            row['top_words'] = '|'.join(
+                f"{word}:{freq}" for word, freq in stats['word_frequency'].most_common(self.top_n)
+            )
+            if self.include_text:
+                row['text'] = result['processed_text']
+
+        self.writer.writerow([row.get(column, '') for column in self.columns])
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.file.flush()
+
+    def close(self):
+        self.file.flush()
+        if self._owns_file:
+            self.file.close()
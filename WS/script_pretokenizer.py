@@ -0,0 +1,184 @@
+# เครื่องมือ: แบ่งข้อความผสมไทย/อังกฤษ/ตัวเลขเป็นช่วงตามชนิดอักษรก่อนแยกคำ
+
+"""
+Pre-tokenizer สำหรับข้อความผสมหลายภาษา (เช่นข้อความจากโซเชียลมีเดีย)
+
+ตัวแยกคำแบบพจนานุกรมจะลองจับคู่ทุกตำแหน่ง แม้เป็นตัวเลข คำภาษาอังกฤษ หรือเครื่องหมาย
+แล้วได้ผลเป็นตัวอักษรทีละตัว ("abc123def" -> a|b|c|1|2|3|d|e|f)
+
+ขั้นตอนแรกนี้แบ่งข้อความเป็นช่วง (run) ในรอบเดียว:
+1. แปลงทุกตัวอักษรเป็นรหัสชนิดด้วย str.translate กับตาราง code point -> ชนิด
+   (คำนวณไว้ล่วงหน้าสำหรับ ASCII และอักษรไทย ตัวอื่นคำนวณครั้งแรกที่พบแล้วเก็บไว้)
+2. ใช้ regular expression กับสตริงของรหัสชนิดเพื่อหาช่วงของชนิดเดียวกัน
+3. URL, อีเมล, @mention และ #hashtag ถูกหาจากข้อความจริงก่อนและเป็นหนึ่ง token
+
+เฉพาะช่วงภาษาไทยเท่านั้นที่ส่งต่อให้ตัวแยกคำ (newmm, maximum matching ฯลฯ)
+ช่วงอื่นเป็น token ทันที
+"""
+
+import re
+import unicodedata
+from collections import namedtuple
+
+# ชนิดของช่วง
+THAI = 'thai'
+WORD = 'word'
+NUMBER = 'number'
+SPACE = 'space'
+PUNCT = 'punct'
+URL = 'url'
+EMAIL = 'email'
+TAG = 'tag'
+
+Run = namedtuple('Run', ['kind', 'text', 'start'])
+
+# รหัสชนิดของตัวอักษร (หนึ่งตัวอักษรต่อ code point)
+# T ไทย, L ตัวอักษรอื่น, D ตัวเลข, S ช่องว่าง, Q apostrophe, N ตัวคั่นตัวเลข, P เครื่องหมาย/อื่นๆ
+_THAI_DIGITS = range(0x0E50, 0x0E5A)
+_THAI_PUNCT = (0x0E4F, 0x0E5A, 0x0E5B)
+
+
+def _classify(char):
+    code = ord(char)
+    if 0x0E00 <= code <= 0x0E7F:
+        if code in _THAI_DIGITS:
+            return 'D'
+        return 'P' if code in _THAI_PUNCT else 'T'
+    if char in "'’":
+        return 'Q'
+    if char in '.,':
+        return 'N'
+    if char.isspace():
+        return 'S'
+    category = unicodedata.category(char)
+    if category == 'Nd':
+        return 'D'
+    if category[0] in 'LM':
+        return 'L'
+    return 'P'
+
+
+class _ClassTable(dict):
+    """ตาราง code point -> รหัสชนิด สำหรับ str.translate (เติมเองเมื่อพบตัวอักษรใหม่)"""
+
+    def __missing__(self, code):
+        value = self[code] = _classify(chr(code))
+        return value
+
+
+_CLASS_TABLE = _ClassTable((code, _classify(chr(code)))
+                           for code in [*range(128), *range(0x0E00, 0x0E80)])
+
+_RUN_PATTERN = re.compile(
+    r"(?P<thai>T+)"
+    r"|(?P<word>L+(?:QL+)*)"
+    r"|(?P<number>D+(?:ND+)*)"
+    r"|(?P<space>S+)"
+    r"|(?P<punct>[PQN]+)"
+)
+
+_SPECIAL_PATTERN = re.compile(
+    r"(?P<url>(?:https?://|www\.)[^\s<>\"]+)"
+    r"|(?P<email>[\w.+-]+@[\w-]+(?:\.[\w-]+)+)"
+    r"|(?P<tag>(?<![\w@#])[@#][\w\u0E31\u0E34-\u0E3A\u0E47-\u0E4E]+)"
+)
+
+# เครื่องหมายท้าย URL ที่มักเป็นเครื่องหมายของประโยค
+_URL_TRAILING = '.,;:!?)]}\'"'
+
+
+def char_classes(text):
+    """สตริงรหัสชนิดของแต่ละตัวอักษร (ยาวเท่ากับ text)"""
+    return text.translate(_CLASS_TABLE)
+
+
+def _iter_runs(text, classes, start, end):
+    for match in _RUN_PATTERN.finditer(classes, start, end):
+        yield Run(match.lastgroup, text[match.start():match.end()], match.start())
+
+
+def pretokenize(text, special=True):
+    """
+    แบ่งข้อความเป็นช่วงตามชนิดอักษร
+
+    Args:
+        text (str): ข้อความ
+        special (bool): แยก URL, อีเมล, @mention และ #hashtag เป็นหนึ่ง token
+
+    Returns:
+        list: Run(kind, text, start) ต่อกันแล้วได้ข้อความเดิมครบ
+    """
+    classes = char_classes(text)
+    if not special or not any(marker in text for marker in ('://', 'www.', '@', '#')):
+        return list(_iter_runs(text, classes, 0, len(text)))
+
+    runs = []
+    position = 0
+    for match in _SPECIAL_PATTERN.finditer(text):
+        start, end = match.span()
+        if start < position:
+            continue
+        if match.lastgroup == URL:
+            end -= len(match.group()) - len(match.group().rstrip(_URL_TRAILING))
+        runs.extend(_iter_runs(text, classes, position, start))
+        runs.append(Run(match.lastgroup, text[start:end], start))
+        position = end
+    runs.extend(_iter_runs(text, classes, position, len(text)))
+    return runs
+
+
+def run_end(classes, position):
+    """
+    ตำแหน่งสิ้นสุดของช่วงชนิดเดียวกันที่เริ่มที่ position
+
+    Args:
+        classes (str): ผลของ char_classes(text) (คำนวณครั้งเดียวต่อข้อความ)
+        position (int): ตำแหน่งเริ่ม
+    """
+    match = _RUN_PATTERN.match(classes, position)
+    return match.end() if match else position
+
+
+def tokenize(text, thai_tokenizer, keep_whitespace=True, special=True):
+    """
+    แยกคำโดยส่งเฉพาะช่วงภาษาไทยให้ thai_tokenizer
+
+    Args:
+        text (str): ข้อความ
+        thai_tokenizer (callable): รับ str ภาษาไทยคืน list ของคำ
+        keep_whitespace (bool): เก็บช่วงช่องว่างเป็น token หรือไม่
+        special (bool): แยก URL, อีเมล, @mention และ #hashtag เป็นหนึ่ง token
+
+    Returns:
+        list: รายการคำ
+    """
+    tokens = []
+    for run in pretokenize(text, special):
+        if run.kind == THAI:
+            tokens.extend(thai_tokenizer(run.text))
+        elif run.kind != SPACE or keep_whitespace:
+            tokens.append(run.text)
+    return tokens
+
+
+# ตัวอย่างการใช้งาน
+if __name__ == "__main__":
+    samples = [
+        "abc123def",
+        "hello-world",
+        "ราคา 1,250.50 บาท ดูที่ https://example.com/promo?id=7. ด่วน!!!",
+        "ติดต่อ support@example.co.th หรือ @shop_th #ลดราคา don't miss ๒๕๖๘",
+    ]
+    for sample in samples:
+        print(sample)
+        print("  ", [(run.kind, run.text) for run in pretokenize(sample) if run.kind != SPACE])
+
+    try:
+        from pythainlp.tokenize import word_tokenize
+    except ImportError:
+        word_tokenize = None
+
+    if word_tokenize is not None:
+        text = samples[2]
+        print(word_tokenize(text))
+        print(tokenize(text, word_tokenize))
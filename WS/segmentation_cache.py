@@ -0,0 +1,295 @@
+# เครื่องมือ: แคชผลการแยกคำบนดิสก์ (Content-addressed) สำหรับการรันคลังข้อความซ้ำ
+
+"""
+แคชผลการแยกคำแบบถาวรด้วย SQLite (ไฟล์เดียว ไม่ต้องติดตั้งอะไรเพิ่ม)
+
+- key คือ hash ของ (engine/method, เวอร์ชันของพจนานุกรมหรือโมเดล, ข้อความ)
+  ข้อความเดิมกับการตั้งค่าเดิมจึงได้ผลจากแคชเสมอ
+- รองรับการอ่าน/เขียนแบบ bulk สำหรับ batch
+- จำกัดขนาดด้วยการลบรายการที่ถูกใช้ล่าสุดนานที่สุด (LRU) เมื่อเกิน max_entries
+  นับจำนวนรายการแบบสะสมในหน่วยความจำ (COUNT(*) เฉพาะตอนจะลบ) และลบลงเหลือ
+  EVICT_TO ของ max_entries ครั้งเดียว ไม่ต้องลบทุก batch
+- เวลาใช้งานล่าสุดของรายการที่อ่านเจอถูกพักไว้ แล้วเขียนเป็นชุดพร้อม put_many/evict/close
+- เวอร์ชันเป็นส่วนหนึ่งของ key segmenter หลายตัว (พจนานุกรมต่างกัน) ใช้ไฟล์แคชร่วมกันได้
+  รายการของเวอร์ชันเก่าหมดไปเองตาม LRU หรือลบทันทีด้วย purge_stale / invalidate
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+
+# SQLite จำกัดจำนวนพารามิเตอร์ต่อคำสั่ง จึงแบ่งคำขอเป็นชุด
+_CHUNK_SIZE = 500
+
+# เมื่อเกิน max_entries ลบลงเหลือสัดส่วนนี้ของ max_entries
+EVICT_TO = 0.9
+
+# จำนวนการอ่านเจอที่พักไว้ก่อนเขียน last_access ลงดิสก์
+TOUCH_BATCH_SIZE = 10_000
+
+
+class SegmentationCache:
+    """
+    แคชผลการแยกคำบนดิสก์
+
+    Args:
+        path (str): ไฟล์ฐานข้อมูล SQLite
+        max_entries (int): จำนวนรายการสูงสุด (None = ไม่จำกัด)
+    """
+
+    def __init__(self, path='segmentation_cache.db', max_entries=1_000_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # key -> เวลาที่อ่านเจอ ที่ยังไม่ได้เขียนลงดิสก์
+        self._touched = {}
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS segments (
+                key TEXT PRIMARY KEY,
+                engine TEXT NOT NULL,
+                version TEXT NOT NULL,
+                tokens TEXT NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_segments_access ON segments(last_access);
+            CREATE INDEX IF NOT EXISTS idx_segments_engine ON segments(engine, version);
+        ''')
+        self.conn.commit()
+        # จำนวนรายการโดยประมาณ (โปรเซสอื่นอาจเขียนไฟล์เดียวกัน จึงนับจริงอีกครั้งก่อนลบ)
+        self._count = self._count_entries()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @staticmethod
+    def make_key(text, engine, version):
+        """สร้าง key จาก hash ของ (engine, version, text)"""
+        digest = hashlib.sha256()
+        digest.update(engine.encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(str(version).encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    # ----- bulk get/put -----
+
+    def get_many(self, texts, engine, version):
+        """
+        อ่านผลการแยกคำของหลายข้อความ
+
+        Returns:
+            list: รายการคำของแต่ละข้อความ หรือ None ถ้าไม่มีในแคช
+        """
+        keys = [self.make_key(text, engine, version) for text in texts]
+        found = {}
+        for start in range(0, len(keys), _CHUNK_SIZE):
+            chunk = keys[start:start + _CHUNK_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f'SELECT key, tokens FROM segments WHERE key IN ({placeholders})', chunk
+            )
+            for key, tokens in rows:
+                found[key] = tokens
+
+        if found:
+            now = time.time()
+            self._touched.update(dict.fromkeys(found, now))
+            if len(self._touched) >= TOUCH_BATCH_SIZE:
+                self._flush_touches()
+                self.conn.commit()
+
+        results = [json.loads(found[key]) if key in found else None for key in keys]
+        hit_count = len([key for key in keys if key in found])
+        self.hits += hit_count
+        self.misses += len(keys) - hit_count
+        return results
+
+    def put_many(self, texts, token_lists, engine, version):
+        """บันทึกผลการแยกคำของหลายข้อความ"""
+        now = time.time()
+        rows = [
+            (self.make_key(text, engine, version), engine, str(version),
+             json.dumps(tokens, ensure_ascii=False), now)
+            for text, tokens in zip(texts, token_lists)
+        ]
+        self._flush_touches()
+        # key เดียวกันให้ผลเดียวกันเสมอ (content-addressed) รายการที่มีอยู่แล้วจึงไม่ต้องเขียนทับ
+        cursor = self.conn.executemany(
+            'INSERT OR IGNORE INTO segments (key, engine, version, tokens, last_access) '
+            'VALUES (?, ?, ?, ?, ?)',
+            rows
+        )
+        self.conn.commit()
+        self._count += max(cursor.rowcount, 0)
+        if self.max_entries is not None and self._count > self.max_entries:
+            self.evict()
+
+    def get(self, text, engine, version):
+        return self.get_many([text], engine, version)[0]
+
+    def put(self, text, tokens, engine, version):
+        self.put_many([text], [tokens], engine, version)
+
+    def tokenize_many(self, texts, tokenize, engine, version):
+        """
+        แยกคำหลายข้อความโดยอ่านจากแคชก่อน แล้วคำนวณเฉพาะข้อความที่ไม่มีในแคช
+
+        Args:
+            texts (list): ข้อความ
+            tokenize (callable): ฟังก์ชันรับ str คืน list ของคำ
+            engine (str): ชื่อ engine/method
+            version (str): เวอร์ชันของพจนานุกรมหรือโมเดล
+
+        Returns:
+            list: รายการคำของแต่ละข้อความ (ลำดับเดียวกับ texts)
+        """
+        texts = list(texts)
+        results = self.get_many(texts, engine, version)
+
+        missing = {}
+        for i, (text, tokens) in enumerate(zip(texts, results)):
+            if tokens is None:
+                missing.setdefault(text, []).append(i)
+
+        if missing:
+            missing_texts = list(missing)
+            computed = [tokenize(text) for text in missing_texts]
+            for text, tokens in zip(missing_texts, computed):
+                for i in missing[text]:
+                    results[i] = tokens
+            self.put_many(missing_texts, computed, engine, version)
+
+        return results
+
+    # ----- การจัดการขนาดและเวอร์ชัน -----
+
+    def evict(self):
+        """
+        ถ้าจำนวนรายการเกิน max_entries ลบรายการที่ถูกใช้ล่าสุดนานที่สุด
+        จนเหลือ EVICT_TO ของ max_entries
+
+        Returns:
+            int: จำนวนรายการที่ลบ
+        """
+        if self.max_entries is None:
+            return 0
+        self._flush_touches()
+        self._count = self._count_entries()
+        if self._count <= self.max_entries:
+            self.conn.commit()
+            return 0
+        excess = self._count - int(self.max_entries * EVICT_TO)
+        self.conn.execute(
+            'DELETE FROM segments WHERE key IN '
+            '(SELECT key FROM segments ORDER BY last_access LIMIT ?)',
+            (excess,)
+        )
+        self.conn.commit()
+        self._count -= excess
+        return excess
+
+    def invalidate(self, engine=None, version=None):
+        """ลบรายการของ engine ที่กำหนด (เฉพาะเวอร์ชัน version ถ้ากำหนด) หรือทั้งหมดถ้าไม่กำหนด"""
+        if engine is None:
+            self.conn.execute('DELETE FROM segments')
+        elif version is None:
+            self.conn.execute('DELETE FROM segments WHERE engine = ?', (engine,))
+        else:
+            self.conn.execute('DELETE FROM segments WHERE engine = ? AND version = ?',
+                              (engine, str(version)))
+        self.conn.commit()
+        self._touched.clear()
+        self._count = self._count_entries()
+
+    def purge_stale(self, engine, version):
+        """
+        ลบรายการของ engine ที่ไม่ใช่เวอร์ชัน version (เรียกเองเมื่อแน่ใจว่าไม่มี segmenter
+        ที่ใช้เวอร์ชันเก่ากับไฟล์นี้แล้ว)
+
+        Returns:
+            int: จำนวนรายการที่ลบ
+        """
+        cursor = self.conn.execute(
+            'DELETE FROM segments WHERE engine = ? AND version != ?', (engine, str(version))
+        )
+        self.conn.commit()
+        self._count = self._count_entries()
+        return cursor.rowcount
+
+    def _count_entries(self):
+        return self.conn.execute('SELECT COUNT(*) FROM segments').fetchone()[0]
+
+    def _flush_touches(self):
+        """เขียน last_access ที่พักไว้ (ไม่ commit เอง ผู้เรียก commit)"""
+        if self._touched:
+            touched, self._touched = self._touched, {}
+            self.conn.executemany(
+                'UPDATE segments SET last_access = ? WHERE key = ?',
+                [(access, key) for key, access in touched.items()]
+            )
+
+    def stats(self):
+        """สถิติการใช้งานแคช"""
+        entries = self._count_entries()
+        total = self.hits + self.misses
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0,
+        }
+
+    def close(self):
+        self._flush_touches()
+        self.conn.commit()
+        self.conn.close()
+
+
+def cached_word_tokenize(texts, cache, engine='newmm'):
+    """
+    แยกคำด้วย PyThaiNLP โดยใช้แคช (เวอร์ชันคือเวอร์ชันของ PyThaiNLP)
+
+    Args:
+        texts (list): ข้อความ
+        cache (SegmentationCache): แคช
+        engine (str): engine ของ word_tokenize
+    """
+    import pythainlp
+    from pythainlp.tokenize import word_tokenize
+
+    return cache.tokenize_many(
+        texts,
+        lambda text: word_tokenize(text, engine=engine),
+        engine=f'pythainlp:{engine}',
+        version=pythainlp.__version__,
+    )
+
+
+# ตัวอย่างการใช้งาน
+if __name__ == "__main__":
+    from example_03_custom_segmenter import CustomWordSegmenter
+
+    segmenter = CustomWordSegmenter()
+    segmenter.add_words_to_dictionary(["hello", "world", "python", "programming"])
+
+    texts = ["helloworld", "pythonprogramming", "helloworld"]
+    with SegmentationCache('segmentation_cache.db', max_entries=10_000) as cache:
+        print("รอบแรก:", segmenter.segment_many(texts, cache=cache))
+        print("รอบสอง:", segmenter.segment_many(texts, cache=cache))
+        print("สถิติแคช:", cache.stats())
+
+        # เพิ่มคำใหม่ -> เวอร์ชันพจนานุกรมเปลี่ยน -> key ใหม่ (รายการเก่ายังอยู่จนถูกลบ)
+        segmenter.add_words_to_dictionary("pro")
+        print("หลังเปลี่ยนพจนานุกรม:", segmenter.segment_many(texts, cache=cache))
+        print("ลบรายการเวอร์ชันเก่า:", cache.purge_stale('custom:bidirectional', segmenter.dictionary_version))
+        print("สถิติแคช:", cache.stats())
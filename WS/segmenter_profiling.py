@@ -0,0 +1,357 @@
+# เครื่องมือ: โหมด profiling ของ CustomWordSegmenter (นับงานและจับเวลาแยกตามช่วง)
+
+"""
+Profiling สำหรับหาสาเหตุที่การแยกคำช้า
+
+เปิดด้วย CustomWordSegmenter.enable_profiling() แล้ว segmenter จะใช้ ProfilingSnapshot
+ซึ่งห่อ snapshot เดิมด้วยพจนานุกรมและตารางความถี่ที่นับการเข้าถึง และจับเวลาแต่ละช่วง
+เมื่อปิด segmenter กลับไปใช้ snapshot เดิมโดยตรง เส้นทางปกติจึงไม่มีโค้ดเพิ่มเลย
+
+ค่าที่นับต่อการเรียกหนึ่งครั้ง:
+- probes: จำนวนครั้งที่ค้นพจนานุกรม (word in dictionary)
+- lookups: จำนวนครั้งที่อ่านตารางความถี่คำ/bigram
+- edges: จำนวน candidate ใน lattice (การค้นพจนานุกรมระหว่าง matching + candidate ที่ให้คะแนน)
+- substrings: จำนวน substring ที่สร้าง (หนึ่งต่อ candidate และหนึ่งต่อตัวอักษร fallback)
+- scores: จำนวนครั้งที่เรียกฟังก์ชันให้คะแนน
+- fallback_chars: ตัวอักษรเดี่ยวที่ไม่อยู่ในพจนานุกรมในผลลัพธ์
+
+เวลาแยกเป็น 3 ช่วง (ไม่ซ้อนกัน):
+- match: หา candidate และค้นพจนานุกรม (maximum_matching, ลูปของ statistical_segmentation)
+- score: _calculate_score และ _calculate_word_score
+- decide: ส่วนที่เหลือ เช่นการเลือกระหว่างผล forward/backward
+"""
+
+import cProfile
+import pstats
+import threading
+import time
+from collections import deque
+
+from example_03_custom_segmenter import SegmenterSnapshot
+
+COUNTERS = ('probes', 'lookups', 'edges', 'substrings', 'scores', 'fallback_chars')
+PHASES = ('match', 'score', 'decide')
+
+
+class _CountingSet:
+    """ห่อ frozenset ของพจนานุกรมเพื่อนับการค้น"""
+
+    __slots__ = ('_words', '_profiler')
+
+    def __init__(self, words, profiler):
+        self._words = words
+        self._profiler = profiler
+
+    def __contains__(self, word):
+        self._profiler._count_probe()
+        return word in self._words
+
+    def __iter__(self):
+        return iter(self._words)
+
+    def __len__(self):
+        return len(self._words)
+
+
+class _CountingMapping:
+    """ห่อตารางความถี่ (อ่านอย่างเดียว) เพื่อนับการอ่าน"""
+
+    __slots__ = ('_mapping', '_profiler')
+
+    def __init__(self, mapping, profiler):
+        self._mapping = mapping
+        self._profiler = profiler
+
+    def get(self, key, default=None):
+        self._profiler._count('lookups')
+        return self._mapping.get(key, default)
+
+    def __getitem__(self, key):
+        self._profiler._count('lookups')
+        return self._mapping[key]
+
+    def __contains__(self, key):
+        self._profiler._count('lookups')
+        return key in self._mapping
+
+    def __iter__(self):
+        return iter(self._mapping)
+
+    def __len__(self):
+        return len(self._mapping)
+
+    def items(self):
+        return self._mapping.items()
+
+    def values(self):
+        return self._mapping.values()
+
+
+class _CallRecord:
+    __slots__ = ('method', 'text_length', 'tokens', 'counts', 'phase_seconds',
+                 'total_seconds', '_phases', '_phase_start')
+
+    def __init__(self, method, text_length):
+        self.method = method
+        self.text_length = text_length
+        self.tokens = 0
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.total_seconds = 0.0
+        self._phases = ['decide']
+        self._phase_start = time.perf_counter()
+
+    def enter(self, phase):
+        now = time.perf_counter()
+        self.phase_seconds[self._phases[-1]] += now - self._phase_start
+        self._phases.append(phase)
+        self._phase_start = now
+
+    def leave(self):
+        now = time.perf_counter()
+        self.phase_seconds[self._phases.pop()] += now - self._phase_start
+        self._phase_start = now
+
+    def to_dict(self):
+        return {
+            'method': self.method,
+            'text_length': self.text_length,
+            'tokens': self.tokens,
+            **self.counts,
+            'phase_seconds': dict(self.phase_seconds),
+            'total_seconds': self.total_seconds,
+        }
+
+
+class SegmenterProfiler:
+    """
+    เก็บสถิติการแยกคำแยกตาม method
+
+    Args:
+        use_cprofile (bool): เปิด cProfile ระหว่างการแยกคำแต่ละครั้งด้วย
+            (ดูผลด้วย pstats() หรือบันทึกด้วย dump_stats())
+        keep_calls (int): จำนวนการเรียกล่าสุดที่เก็บรายละเอียดไว้ใน recent_calls
+    """
+
+    def __init__(self, use_cprofile=False, keep_calls=100):
+        self.methods = {}
+        self.recent_calls = deque(maxlen=keep_calls)
+        self._cprofile = cProfile.Profile() if use_cprofile else None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    # ----- การนับ (เรียกจาก ProfilingSnapshot และตัวห่อ) -----
+
+    def _record(self):
+        return getattr(self._local, 'record', None)
+
+    def _count(self, name, amount=1):
+        record = self._record()
+        if record is not None:
+            record.counts[name] += amount
+
+    def _count_probe(self):
+        record = self._record()
+        if record is not None:
+            record.counts['probes'] += 1
+            if record._phases[-1] == 'match':
+                # candidate หนึ่งตัว = หนึ่ง substring
+                record.counts['edges'] += 1
+                record.counts['substrings'] += 1
+
+    def _enter(self, phase):
+        record = self._record()
+        if record is not None:
+            record.enter(phase)
+        return record
+
+    def _begin(self, method, text):
+        if self._record() is not None:
+            return None
+        record = self._local.record = _CallRecord(method, len(text))
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        return record
+
+    def _end(self, record, tokens, dictionary):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        record.leave()
+        record.total_seconds = sum(record.phase_seconds.values())
+        record.tokens = len(tokens)
+        fallback = sum(1 for token in tokens if len(token) == 1 and token not in dictionary)
+        record.counts['fallback_chars'] = fallback
+        record.counts['substrings'] += fallback
+        self._local.record = None
+
+        with self._lock:
+            summary = self.methods.get(record.method)
+            if summary is None:
+                summary = self.methods[record.method] = {
+                    'calls': 0, 'characters': 0, 'tokens': 0,
+                    **dict.fromkeys(COUNTERS, 0),
+                    'phase_seconds': dict.fromkeys(PHASES, 0.0),
+                    'total_seconds': 0.0,
+                }
+            summary['calls'] += 1
+            summary['characters'] += record.text_length
+            summary['tokens'] += record.tokens
+            for name in COUNTERS:
+                summary[name] += record.counts[name]
+            for phase in PHASES:
+                summary['phase_seconds'][phase] += record.phase_seconds[phase]
+            summary['total_seconds'] += record.total_seconds
+            self.recent_calls.append(record.to_dict())
+
+    # ----- รายงาน -----
+
+    def reset(self):
+        with self._lock:
+            self.methods.clear()
+            self.recent_calls.clear()
+            if self._cprofile is not None:
+                self._cprofile = cProfile.Profile()
+
+    def summary(self):
+        """สถิติรวมแยกตาม method (คัดลอกแล้ว ปลอดภัยต่อการแก้ไข)"""
+        with self._lock:
+            result = {}
+            for method, summary in self.methods.items():
+                result[method] = {**summary, 'phase_seconds': dict(summary['phase_seconds'])}
+                characters = summary['characters'] or 1
+                result[method]['probes_per_char'] = summary['probes'] / characters
+                result[method]['edges_per_char'] = summary['edges'] / characters
+            return result
+
+    def report(self):
+        """รายงานแบบข้อความ"""
+        lines = ["=== Segmenter profile ==="]
+        for method, summary in sorted(self.summary().items()):
+            total = summary['total_seconds'] or 1e-12
+            lines.append(f"{method}: {summary['calls']} ครั้ง, {summary['characters']} ตัวอักษร, "
+                         f"{summary['tokens']} คำ, {summary['total_seconds'] * 1000:.2f} ms")
+            lines.append("  " + ", ".join(f"{name}={summary[name]}" for name in COUNTERS))
+            lines.append(f"  probes/ตัวอักษร={summary['probes_per_char']:.1f}, "
+                         f"edges/ตัวอักษร={summary['edges_per_char']:.1f}")
+            lines.append("  เวลา: " + ", ".join(
+                f"{phase} {100 * summary['phase_seconds'][phase] / total:.0f}%" for phase in PHASES))
+        return "\n".join(lines)
+
+    def pstats(self, sort='cumulative'):
+        """ผลของ cProfile เป็น pstats.Stats (ต้องสร้างด้วย use_cprofile=True)"""
+        if self._cprofile is None:
+            raise ValueError("สร้าง SegmenterProfiler(use_cprofile=True) เพื่อเก็บผล cProfile")
+        return pstats.Stats(self._cprofile).sort_stats(sort)
+
+    def dump_stats(self, path):
+        """บันทึกผล cProfile เป็นไฟล์ (เปิดด้วย pstats, snakeviz ฯลฯ)"""
+        self.pstats().dump_stats(path)
+
+
+class ProfilingSnapshot(SegmenterSnapshot):
+    """
+    SegmenterSnapshot ที่นับการเข้าถึงและจับเวลาแต่ละช่วง (ใช้เฉพาะตอนเปิด profiling)
+    """
+
+    __slots__ = ('base', 'profiler')
+
+    @classmethod
+    def wrap(cls, snapshot, profiler):
+        """ห่อ snapshot เดิมโดยไม่คัดลอกพจนานุกรม"""
+        self = object.__new__(cls)
+        setattr_ = object.__setattr__
+        setattr_(self, 'base', snapshot)
+        setattr_(self, 'profiler', profiler)
+        setattr_(self, 'dictionary', _CountingSet(snapshot.dictionary, profiler))
+        setattr_(self, 'word_frequencies', _CountingMapping(snapshot.word_frequencies, profiler))
+        setattr_(self, 'bigram_frequencies', _CountingMapping(snapshot.bigram_frequencies, profiler))
+        setattr_(self, 'max_word_length', snapshot.max_word_length)
+        setattr_(self, '_version', snapshot.version)
+        setattr_(self, '_lattice_scorer', None)
+        return self
+
+    def lattice_scorer(self):
+        # เส้นทาง vectorized ไม่ผ่านตัวนับ
+        return self.base.lattice_scorer()
+
+    def segment_text(self, text, method='bidirectional', pretokenize=False):
+        record = self.profiler._begin(method, text)
+        if record is None:
+            return super().segment_text(text, method, pretokenize)
+        tokens = []
+        try:
+            tokens = super().segment_text(text, method, pretokenize)
+            return tokens
+        finally:
+            self.profiler._end(record, tokens, self.base.dictionary)
+
+    def maximum_matching(self, text, direction='forward'):
+        record = self.profiler._enter('match')
+        try:
+            return super().maximum_matching(text, direction)
+        finally:
+            if record is not None:
+                record.leave()
+
+    def statistical_segmentation(self, text, use_bigrams=True):
+        record = self.profiler._enter('match')
+        try:
+            return super().statistical_segmentation(text, use_bigrams)
+        finally:
+            if record is not None:
+                record.leave()
+
+    def _calculate_score(self, tokens):
+        record = self.profiler._enter('score')
+        try:
+            return super()._calculate_score(tokens)
+        finally:
+            if record is not None:
+                record.counts['scores'] += 1
+                record.leave()
+
+    def _calculate_word_score(self, word, previous_tokens, use_bigrams=True):
+        record = self.profiler._enter('score')
+        try:
+            return super()._calculate_word_score(word, previous_tokens, use_bigrams)
+        finally:
+            if record is not None:
+                record.counts['scores'] += 1
+                record.counts['edges'] += 1
+                record.counts['substrings'] += 1
+                record.leave()
+
+
+# ตัวอย่างการใช้งาน
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import timeit
+
+    from example_03_custom_segmenter import CustomWordSegmenter
+
+    segmenter = CustomWordSegmenter()
+    segmenter.add_words_to_dictionary(["this", "is", "insane", "the", "cat", "in", "hat", "hello",
+                                       "world", "python", "programming", "natural", "language"])
+    segmenter.train_from_text("hello world python programming natural language")
+    texts = ["thisisinsane", "helloworld", "pythonprogramming", "naturallanguage123!!"] * 50
+
+    def run():
+        for text in texts:
+            for method in ('bidirectional', 'statistical'):
+                segmenter.segment_text(text, method)
+
+    before = min(timeit.repeat(run, number=3, repeat=5))
+
+    profiler = segmenter.enable_profiling(use_cprofile=True)
+    run()
+    segmenter.disable_profiling()
+    print(profiler.report())
+    print("ตัวอย่างการเรียก:", profiler.recent_calls[-1])
+
+    path = os.path.join(tempfile.mkdtemp(), 'segmenter.prof')
+    profiler.dump_stats(path)
+    profiler.pstats().print_stats(5)
+
+    after = min(timeit.repeat(run, number=3, repeat=5))
+    print(f"ปิด profiling: ก่อน {before * 1000:.1f} ms, หลัง {after * 1000:.1f} ms")
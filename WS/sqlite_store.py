@@ -0,0 +1,353 @@
+# เครื่องมือ: เก็บผลการวิเคราะห์ลง SQLite แบบต่อท้าย (หลายโปรเซสเขียนพร้อมกันได้)
+
+"""
+ที่เก็บผลการวิเคราะห์แบบถาวรด้วย sqlite3 (standard library)
+
+- ตารางแบบ normalized: analyses (หนึ่งแถวต่อผล), words (คำศัพท์), tokens (ลำดับคำของแต่ละผล)
+  และ frequencies (ความถี่ของคำสำคัญของแต่ละผล)
+- บันทึกแบบต่อท้ายเป็นชุด (executemany ในหนึ่ง transaction) ไม่ต้องเขียนประวัติทั้งหมดใหม่
+- WAL mode: ผู้อ่านไม่บล็อกผู้เขียน และหลายโปรเซสเขียนไฟล์เดียวกันได้
+  (แต่ละชุดใช้ BEGIN IMMEDIATE จึงรอคิวกันด้วย busy timeout แทนการชนกัน)
+- index บน timestamp และ engine สำหรับ query สถิติรวมตามช่วงเวลา/engine
+"""
+
+import json
+import sqlite3
+import threading
+from collections import Counter
+
+# SQLite จำกัดจำนวนพารามิเตอร์ต่อคำสั่ง จึงแบ่งคำขอเป็นชุด
+_CHUNK_SIZE = 500
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS analyses (
+        id INTEGER PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        engine TEXT NOT NULL,
+        original_text TEXT NOT NULL,
+        processed_text TEXT NOT NULL,
+        character_count INTEGER NOT NULL,
+        word_count INTEGER NOT NULL,
+        content_word_count INTEGER NOT NULL,
+        stopword_count INTEGER NOT NULL,
+        unique_words INTEGER NOT NULL,
+        unique_content_words INTEGER NOT NULL,
+        avg_word_length REAL NOT NULL,
+        content_ratio REAL NOT NULL,
+        stopwords_found TEXT NOT NULL,
+        pos_analysis TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_analyses_timestamp ON analyses(timestamp);
+    CREATE INDEX IF NOT EXISTS idx_analyses_engine ON analyses(engine, timestamp);
+    CREATE TABLE IF NOT EXISTS words (
+        id INTEGER PRIMARY KEY,
+        word TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS tokens (
+        analysis_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        word_id INTEGER NOT NULL,
+        PRIMARY KEY (analysis_id, position)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS frequencies (
+        analysis_id INTEGER NOT NULL,
+        word_id INTEGER NOT NULL,
+        frequency INTEGER NOT NULL,
+        PRIMARY KEY (analysis_id, word_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_frequencies_word ON frequencies(word_id);
+'''
+
+_STAT_COLUMNS = ('character_count', 'word_count', 'content_word_count', 'stopword_count',
+                 'unique_words', 'unique_content_words', 'avg_word_length', 'content_ratio')
+
+
+def _json_default(value):
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class SQLiteAnalysisStore:
+    """
+    ที่เก็บผลการวิเคราะห์บน SQLite
+
+    Args:
+        path (str): ไฟล์ฐานข้อมูล
+        batch_size (int): จำนวนผลที่พักไว้ก่อนเขียนลงดิสก์หนึ่งครั้ง
+        timeout (float): เวลารอ lock ของโปรเซสอื่นสูงสุด (วินาที)
+    """
+
+    def __init__(self, path='analysis_history.db', batch_size=500, timeout=30.0):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = []
+        self._word_ids = {}
+        self._lock = threading.Lock()
+
+        # isolation_level=None: ควบคุม transaction เอง (BEGIN IMMEDIATE)
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                    check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            for statement in _SCHEMA.split(';'):
+                if statement.strip():
+                    self.conn.execute(statement)
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    # ----- การเขียน -----
+
+    def add(self, result):
+        """พักผลการวิเคราะห์ไว้ แล้วเขียนเมื่อครบ batch_size"""
+        if 'error' in result:
+            return
+        with self._lock:
+            self._pending.append(result)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def add_many(self, results):
+        """เขียนผลหลายรายการ (แบ่งเป็นชุดละ batch_size)"""
+        for result in results:
+            self.add(result)
+        self.flush()
+
+    def flush(self):
+        """เขียนผลที่พักไว้ทั้งหมดลงดิสก์"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        conn = self.conn
+        conn.execute('BEGIN IMMEDIATE')
+        results, self._pending = self._pending, []
+        try:
+            word_ids = self._resolve_words(
+                {token for result in results for token in result['tokens']}
+                | {word for result in results for word in result['statistics']['word_frequency']}
+            )
+            # ได้ lock สำหรับเขียนแล้ว จึงกำหนด id เองได้โดยไม่ชนกับโปรเซสอื่น
+            next_id = conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM analyses').fetchone()[0]
+
+            analysis_rows = []
+            token_rows = []
+            frequency_rows = []
+            for analysis_id, result in enumerate(results, next_id):
+                stats = result['statistics']
+                analysis_rows.append((
+                    analysis_id, result['timestamp'], result['engine_used'],
+                    result['original_text'], result['processed_text'],
+                    *(stats[column] for column in _STAT_COLUMNS),
+                    json.dumps(stats['stopwords_found'], ensure_ascii=False),
+                    json.dumps(result['pos_analysis'], ensure_ascii=False, default=_json_default)
+                    if result.get('pos_analysis') is not None else None,
+                ))
+                token_rows.extend((analysis_id, position, word_ids[token])
+                                  for position, token in enumerate(result['tokens']))
+                frequency_rows.extend((analysis_id, word_ids[word], freq)
+                                      for word, freq in stats['word_frequency'].items())
+
+            placeholders = ', '.join('?' * (7 + len(_STAT_COLUMNS)))
+            conn.executemany(f'INSERT INTO analyses VALUES ({placeholders})', analysis_rows)
+            conn.executemany('INSERT INTO tokens VALUES (?, ?, ?)', token_rows)
+            conn.executemany('INSERT INTO frequencies VALUES (?, ?, ?)', frequency_rows)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            # id ของคำที่เพิ่งเพิ่มถูกยกเลิกไปพร้อม transaction
+            self._word_ids.clear()
+            # เก็บไว้เขียนใหม่ครั้งถัดไป
+            self._pending[:0] = results
+            raise
+
+    def _resolve_words(self, words):
+        """id ของคำ (เพิ่มคำใหม่ลงตาราง words) ต้องเรียกภายใน transaction"""
+        missing = [word for word in words if word not in self._word_ids]
+        if missing:
+            self.conn.executemany('INSERT OR IGNORE INTO words (word) VALUES (?)',
+                                  [(word,) for word in missing])
+            for start in range(0, len(missing), _CHUNK_SIZE):
+                chunk = missing[start:start + _CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self.conn.execute(
+                    f'SELECT word, id FROM words WHERE word IN ({placeholders})', chunk)
+                self._word_ids.update(rows)
+        return self._word_ids
+
+    # ----- การ query -----
+
+    @staticmethod
+    def _where(engine=None, since=None, until=None, alias='a'):
+        clauses = []
+        params = []
+        if engine is not None:
+            clauses.append(f'{alias}.engine = ?')
+            params.append(engine)
+        if since is not None:
+            clauses.append(f'{alias}.timestamp >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append(f'{alias}.timestamp < ?')
+            params.append(until)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _query(self, sql, params=()):
+        self.flush()
+        return self.conn.execute(sql, params)
+
+    def count(self, engine=None, since=None, until=None):
+        where, params = self._where(engine, since, until)
+        return self._query(f'SELECT COUNT(*) FROM analyses a{where}', params).fetchone()[0]
+
+    def aggregate(self, engine=None, since=None, until=None):
+        """
+        สถิติรวมของผลที่ตรงกับ engine/ช่วงเวลา
+
+        Returns:
+            dict: จำนวนผล, จำนวนคำรวม, ค่าเฉลี่ยต่อผล และจำนวนผลแยกตาม engine
+        """
+        where, params = self._where(engine, since, until)
+        row = self._query(
+            'SELECT COUNT(*), COALESCE(SUM(word_count), 0), COALESCE(SUM(content_word_count), 0), '
+            'AVG(word_count), AVG(avg_word_length), AVG(content_ratio), MIN(timestamp), MAX(timestamp) '
+            f'FROM analyses a{where}', params).fetchone()
+        engines = dict(self._query(
+            f'SELECT engine, COUNT(*) FROM analyses a{where} GROUP BY engine', params))
+        return {
+            'analyses': row[0],
+            'total_words': row[1],
+            'total_content_words': row[2],
+            'avg_word_count': row[3] or 0,
+            'avg_word_length': row[4] or 0,
+            'avg_content_ratio': row[5] or 0,
+            'first_timestamp': row[6],
+            'last_timestamp': row[7],
+            'engines': engines,
+        }
+
+    def top_words(self, n=20, engine=None, since=None, until=None):
+        """คำสำคัญที่พบบ่อยที่สุด"""
+        where, params = self._where(engine, since, until)
+        join = ' JOIN analyses a ON a.id = f.analysis_id' if where else ''
+        rows = self._query(
+            'SELECT w.word, SUM(f.frequency) AS total FROM frequencies f '
+            f'JOIN words w ON w.id = f.word_id{join}{where} '
+            'GROUP BY f.word_id ORDER BY total DESC, w.word LIMIT ?', [*params, n])
+        return [(word, total) for word, total in rows]
+
+    def find_texts(self, word, limit=20):
+        """ผลที่มีคำนี้เป็นคำสำคัญ (ล่าสุดก่อน) คืน (id, timestamp, ข้อความ)"""
+        rows = self._query(
+            'SELECT a.id, a.timestamp, a.original_text FROM frequencies f '
+            'JOIN words w ON w.id = f.word_id JOIN analyses a ON a.id = f.analysis_id '
+            'WHERE w.word = ? ORDER BY a.timestamp DESC LIMIT ?', (word, limit))
+        return rows.fetchall()
+
+    def iter_results(self, engine=None, since=None, until=None):
+        """
+        อ่านผลการวิเคราะห์กลับเป็น dict รูปแบบเดียวกับ analyze_single_text
+
+        อ่าน analyses ทีละ _CHUNK_SIZE แถว แล้วดึง tokens และ frequencies ของทั้งชุด
+        ด้วยคำสั่งละหนึ่งครั้ง (ไม่ query ต่อแถว)
+        """
+        where, params = self._where(engine, since, until)
+        columns = ('id', 'timestamp', 'engine', 'original_text', 'processed_text',
+                   *_STAT_COLUMNS, 'stopwords_found', 'pos_analysis')
+        cursor = self._query(f'SELECT {", ".join(columns)} FROM analyses a{where} ORDER BY id',
+                             params)
+        while True:
+            rows = cursor.fetchmany(_CHUNK_SIZE)
+            if not rows:
+                break
+            ids = [row[0] for row in rows]
+            placeholders = ','.join('?' * len(ids))
+            tokens = {analysis_id: [] for analysis_id in ids}
+            for analysis_id, word in self.conn.execute(
+                    'SELECT t.analysis_id, w.word FROM tokens t JOIN words w ON w.id = t.word_id '
+                    f'WHERE t.analysis_id IN ({placeholders}) ORDER BY t.analysis_id, t.position', ids):
+                tokens[analysis_id].append(word)
+            frequencies = {analysis_id: Counter() for analysis_id in ids}
+            for analysis_id, word, freq in self.conn.execute(
+                    'SELECT f.analysis_id, w.word, f.frequency FROM frequencies f '
+                    f'JOIN words w ON w.id = f.word_id WHERE f.analysis_id IN ({placeholders})', ids):
+                frequencies[analysis_id][word] = freq
+            for row in rows:
+                yield self._build_result(dict(zip(columns, row)), tokens, frequencies)
+
+    @staticmethod
+    def _build_result(record, tokens, frequencies):
+        stats = {column: record[column] for column in _STAT_COLUMNS}
+        stats['word_frequency'] = frequencies[record['id']]
+        stats['stopwords_found'] = json.loads(record['stopwords_found'])
+        return {
+            'timestamp': record['timestamp'],
+            'original_text': record['original_text'],
+            'processed_text': record['processed_text'],
+            'engine_used': record['engine'],
+            'tokens': tokens[record['id']],
+            'statistics': stats,
+            'pos_analysis': json.loads(record['pos_analysis']) if record['pos_analysis'] else None,
+        }
+
+
+# ตัวอย่างการใช้งาน: หลายโปรเซสเขียนไฟล์เดียวกันพร้อมกัน
+# (ฟังก์ชันของโปรเซสลูกอยู่ระดับโมดูล เพื่อให้ใช้กับ start method แบบ spawn ได้)
+def _demo_result(worker, i):
+    tokens = ['นักเรียน', 'ไป', 'โรงเรียน', str(i % 7)]
+    return {
+        'timestamp': f'2026-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}',
+        'original_text': ''.join(tokens), 'processed_text': ''.join(tokens),
+        'engine_used': 'newmm' if worker % 2 else 'longest',
+        'tokens': tokens,
+        'statistics': {
+            'character_count': 20, 'word_count': 4, 'content_word_count': 3,
+            'stopword_count': 1, 'unique_words': 4, 'unique_content_words': 3,
+            'avg_word_length': 5.0, 'content_ratio': 0.75,
+            'word_frequency': Counter(tokens[:1] + tokens[2:]), 'stopwords_found': ['ไป'],
+        },
+        'pos_analysis': None,
+    }
+
+
+def _demo_write(path, worker):
+    with SQLiteAnalysisStore(path, batch_size=200) as store:
+        store.add_many(_demo_result(worker, i) for i in range(2000))
+    return worker
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    import os
+    import tempfile
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import repeat
+
+    path = os.path.join(tempfile.mkdtemp(), 'analysis.db')
+
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=4, mp_context=multiprocessing.get_context('spawn')) as executor:
+        list(executor.map(_demo_write, repeat(path), range(4)))
+    print(f"4 โปรเซส x 2000 ผล: {time.perf_counter() - start_time:.2f}s")
+
+    with SQLiteAnalysisStore(path) as store:
+        print(store.aggregate())
+        print(store.top_words(3, engine='newmm'))
+        print(next(store.iter_results())['tokens'])
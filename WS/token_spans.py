@@ -0,0 +1,210 @@
+# ตัวอย่างโค้ด: การเก็บผลการแยกคำเป็นตำแหน่ง (Span) แทนรายการ string
+
+"""
+TokenSpans: ผลการแยกคำแบบ zero-copy
+
+แทนที่จะเก็บ list ของ string (คัดลอกทุกคำออกจากข้อความต้นฉบับ)
+TokenSpans เก็บข้อความต้นฉบับหนึ่งชุด กับ array ของตำแหน่งขอบคำ
+boundaries = [0, b1, b2, ..., len(text)] ขนาด 4 ไบต์ต่อคำ
+
+- คำแต่ละคำถูกสร้างเป็น string เฉพาะเมื่อเรียกใช้ (lazy)
+- สถิติอย่าง word_count และ avg_word_length คำนวณจาก offset โดยตรง
+- ได้ตำแหน่งตัวอักษรสำหรับ highlight ข้อความโดยไม่ต้องคำนวณเพิ่ม
+
+ข้อกำหนด: คำต้องต่อกันแล้วได้ข้อความเดิมครบ (ไม่มีตัวอักษรที่ถูกข้าม)
+"""
+
+from array import array
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TokenSpans:
+    """
+    ผลการแยกคำในรูปแบบขอบคำบนข้อความต้นฉบับ
+
+    Args:
+        text (str): ข้อความต้นฉบับ
+        boundaries: array('i') หรือ NumPy int32 array ของขอบคำ (จำนวนคำ + 1 ค่า)
+    """
+
+    __slots__ = ('text', 'boundaries')
+
+    def __init__(self, text, boundaries):
+        self.text = text
+        self.boundaries = boundaries
+
+    @classmethod
+    def from_boundaries(cls, text, boundaries, use_numpy=False):
+        """
+        สร้าง TokenSpans จากขอบคำที่ segmenter คำนวณไว้แล้ว (array('i') หรือ NumPy array)
+
+        Args:
+            use_numpy (bool): เก็บเป็น NumPy int32 array (False = array('i'))
+        """
+        if use_numpy:
+            if np is None:
+                raise ImportError("กรุณาติดตั้ง numpy: pip install numpy")
+            if isinstance(boundaries, array):
+                boundaries = np.frombuffer(boundaries, dtype=np.int32)
+            else:
+                boundaries = np.asarray(boundaries, dtype=np.int32)
+        elif np is not None and isinstance(boundaries, np.ndarray):
+            boundaries = array('i', boundaries.astype(np.int32).tobytes())
+        elif not isinstance(boundaries, array):
+            boundaries = array('i', boundaries)
+        return cls(text, boundaries)
+
+    @classmethod
+    def from_tokens(cls, text, tokens, use_numpy=False):
+        """
+        สร้าง TokenSpans จากรายการคำที่ต่อกันได้ข้อความเดิม
+
+        ใช้กับ segmenter ที่คืนได้เฉพาะ string (เช่น PyThaiNLP) segmenter ใน WS/ ที่รู้ขอบคำอยู่แล้ว
+        ควรใช้ from_boundaries แทน (ดู SegmenterSnapshot.segment_spans)
+
+        Args:
+            text (str): ข้อความต้นฉบับ
+            tokens (iterable): รายการคำ (เป็น generator ได้)
+            use_numpy (bool): เก็บขอบคำเป็น NumPy int32 array แทน array('i')
+        """
+        boundaries = array('i', [0])
+        boundaries.extend(accumulate(len(token) for token in tokens))
+        if boundaries[-1] != len(text):
+            raise ValueError("tokens ต้องต่อกันแล้วได้ข้อความเดิมครบทุกตัวอักษร")
+        if use_numpy:
+            if np is None:
+                raise ImportError("กรุณาติดตั้ง numpy: pip install numpy")
+            boundaries = np.frombuffer(boundaries, dtype=np.int32)
+        return cls(text, boundaries)
+
+    # ----- การเข้าถึงคำแบบ lazy -----
+
+    def __len__(self):
+        return len(self.boundaries) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        return self.text[self.boundaries[index]:self.boundaries[index + 1]]
+
+    def __iter__(self):
+        text = self.text
+        boundaries = self.boundaries
+        for i in range(len(boundaries) - 1):
+            yield text[boundaries[i]:boundaries[i + 1]]
+
+    def __repr__(self):
+        return f"TokenSpans({len(self)} tokens over {len(self.text)} chars)"
+
+    def span(self, index):
+        """ตำแหน่ง (start, end) ของคำที่ index"""
+        return int(self.boundaries[index]), int(self.boundaries[index + 1])
+
+    def spans(self):
+        """ตำแหน่ง (start, end) ของทุกคำ สำหรับการ highlight"""
+        boundaries = self.boundaries
+        for i in range(len(boundaries) - 1):
+            yield int(boundaries[i]), int(boundaries[i + 1])
+
+    def to_list(self):
+        """แปลงเป็น list ของ string (คัดลอกทุกคำ)"""
+        return list(self)
+
+    def as_numpy(self):
+        """ขอบคำเป็น NumPy int32 array (ไม่คัดลอกข้อมูลถ้าเป็น array('i'))"""
+        if np is None:
+            raise ImportError("กรุณาติดตั้ง numpy: pip install numpy")
+        if isinstance(self.boundaries, array):
+            return np.frombuffer(self.boundaries, dtype=np.int32)
+        return self.boundaries
+
+    # ----- สถิติจาก offset โดยตรง -----
+
+    def lengths(self):
+        """ความยาวของแต่ละคำ"""
+        if np is not None and not isinstance(self.boundaries, array):
+            return np.diff(self.boundaries)
+        boundaries = self.boundaries
+        return array('i', (boundaries[i + 1] - boundaries[i] for i in range(len(boundaries) - 1)))
+
+    @property
+    def word_count(self):
+        return len(self)
+
+    @property
+    def character_count(self):
+        return len(self.text)
+
+    @property
+    def avg_word_length(self):
+        """ความยาวเฉลี่ยของคำ = (ขอบสุดท้าย - ขอบแรก) / จำนวนคำ"""
+        count = len(self)
+        if not count:
+            return 0
+        return (int(self.boundaries[-1]) - int(self.boundaries[0])) / count
+
+
+def span_statistics(spans):
+    """
+    สถิติพื้นฐานที่คำนวณจากขอบคำโดยไม่สร้าง string ของคำ
+
+    Args:
+        spans (TokenSpans): ผลการแยกคำ
+
+    Returns:
+        dict: character_count, word_count, avg_word_length, single_char_count, max_word_length
+    """
+    lengths = spans.lengths()
+    if np is not None and not isinstance(lengths, array):
+        single_char_count = int(np.count_nonzero(lengths == 1))
+        max_word_length = int(lengths.max()) if len(lengths) else 0
+    else:
+        single_char_count = lengths.count(1)
+        max_word_length = max(lengths) if lengths else 0
+
+    return {
+        'character_count': spans.character_count,
+        'word_count': spans.word_count,
+        'avg_word_length': spans.avg_word_length,
+        'single_char_count': single_char_count,
+        'max_word_length': max_word_length,
+    }
+
+
+def word_tokenize_spans(text, engine='newmm', use_numpy=False):
+    """
+    แยกคำด้วย PyThaiNLP แล้วคืนผลเป็น TokenSpans
+
+    word_tokenize คืนได้เฉพาะ list ของ string จึงต้องแปลงจากความยาวคำ (list ถูกทิ้งทันที)
+    ใช้ CustomWordSegmenter.segment_spans ถ้าต้องการขอบคำโดยไม่สร้าง string ของคำเลย
+
+    Args:
+        text (str): ข้อความภาษาไทย
+        engine (str): engine ของ word_tokenize
+        use_numpy (bool): เก็บขอบคำเป็น NumPy array
+    """
+    from pythainlp.tokenize import word_tokenize
+
+    tokens = word_tokenize(text, engine=engine, keep_whitespace=True)
+    return TokenSpans.from_tokens(text, tokens, use_numpy=use_numpy)
+
+
+# ตัวอย่างการใช้งาน
+if __name__ == "__main__":
+    text = "นักเรียนไปโรงเรียนเพื่อเรียนหนังสือ"
+    spans = TokenSpans.from_tokens(text, ["นักเรียน", "ไป", "โรงเรียน", "เพื่อ", "เรียน", "หนังสือ"])
+
+    print(spans)
+    print(f"ขอบคำ: {list(spans.boundaries)}")
+    for (start, end), token in zip(spans.spans(), spans):
+        print(f"  [{start:2}, {end:2}) {token}")
+    print(f"สถิติ: {span_statistics(spans)}")